@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Benchmark the streaming .aux parser against the previous whole-file implementation.
+
+Generates a synthetic .aux file of the requested size, then reports throughput (MB/s)
+and peak Python heap usage (tracemalloc) for:
+
+  legacy   whole-file read + one regex scan per dimension + list-building normalization
+  stream   AuxSnapshot.read (line-by-line, one combined tokenizer, incremental digest)
+
+Usage: python benchmarks/bench_aux_parser.py [--size-mb 50] [--repeat 3]
+"""
+
+import argparse
+import hashlib
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from pytexmk.aux_snapshot import AuxSnapshot  # noqa: E402
+
+# ---- previous implementation, kept verbatim as the reference ----
+BIBER_PATTERN = re.compile(r"\\abx@aux@refcontext")
+BIBTEX_BIB_PATTERN = re.compile(r"\\bibdata\{(.*)\}")
+BIBER_CITE_PATTERN = re.compile(r"\\abx@aux@cite{.*?}\{(.*)\}")
+BIBTEX_CITE_PATTERN = re.compile(r"\\citation\{(.*)\}")
+THEBIB_CITE_PATTERN = re.compile(r"\\bibcite\{(.*?)\}")
+GLOSSARY_PATTERN = re.compile(r"\\@newglossary\{(.*)\}\{.*\}\{(.*)\}\{(.*)\}")
+LABEL_PATTERN = re.compile(r"\\newlabel\{(.*?)\}\{(.*)\}")
+AUX_INPUT_PATTERN = re.compile(r"\\@input\{(.*?\.aux)\}")
+IGNORED_LINE_PATTERNS = [
+    re.compile(r"\\bookmarksetup\{.*\}"),
+    re.compile(r"\\@outlinefile\s*\{.*\}"),
+    re.compile(r"\\[gx]def\s*\\@abspage@last\{.*\}"),
+    re.compile(r"\\global\\\@namedef\{ver@.*\}\{.*\}"),
+]
+
+
+def legacy_normalize(content: str) -> str:
+    stripped_lines = []
+    for raw_line in content.splitlines():
+        line = raw_line.strip()
+        if not line or line.startswith("%"):
+            continue
+        comment_idx = -1
+        for i, ch in enumerate(line):
+            if ch == "%" and (i == 0 or line[i - 1] != "\\"):
+                comment_idx = i
+                break
+        if comment_idx >= 0:
+            line = line[:comment_idx].strip()
+            if not line:
+                continue
+        if line in ("\\relax", "\\relax{}"):
+            continue
+        if any(pattern.fullmatch(line) for pattern in IGNORED_LINE_PATTERNS):
+            continue
+        stripped_lines.append(line)
+    return "\n".join(stripped_lines)
+
+
+def legacy_parse(path: Path):
+    content = path.read_text(encoding="utf-8", errors="replace")
+    counter = defaultdict(int)
+    for pattern in (BIBER_CITE_PATTERN, BIBTEX_CITE_PATTERN, THEBIB_CITE_PATTERN):
+        for match in pattern.finditer(content):
+            counter[match.group(1)] += 1
+    biber = BIBER_PATTERN.search(content) is not None
+    bibdata = BIBTEX_BIB_PATTERN.search(content)
+    glossaries = GLOSSARY_PATTERN.findall(content)
+    labels = dict(LABEL_PATTERN.findall(content))
+    children = AUX_INPUT_PATTERN.findall(content)
+    digest = hashlib.sha256(legacy_normalize(content).encode("utf-8")).hexdigest()
+    return counter, biber, bibdata, glossaries, labels, children, digest
+
+
+def stream_parse(path: Path):
+    return AuxSnapshot.read(path.name, str(path.parent))
+
+
+# ---- synthetic input ----
+def write_aux(path: Path, size_mb: float):
+    block = []
+    for i in range(200):
+        block.append(f"\\abx@aux@cite{{0}}{{key{i % 150}}}\n")
+        block.append(f"\\abx@aux@segm{{0}}{{0}}{{key{i % 150}}}\n")
+        block.append(f"\\newlabel{{sec:{i}}}{{{{{i}}}{{{i // 3}}}{{Section {i}}}{{section.{i}}}{{}}}}\n")
+        block.append(f"\\@writefile{{toc}}{{\\contentsline {{section}}{{\\numberline {{{i}}}Section {i}}}{{{i}}}{{section.{i}}}}}%\n")
+        if i % 20 == 0:
+            block.append("\\bookmarksetup{startatroot}\n\\relax\n% comment line\n")
+    chunk = "\\relax\n\\abx@aux@refcontext{nty/global//global/global}\n" + "".join(block)
+    target = int(size_mb * 1024 * 1024)
+    with open(path, "w", encoding="utf-8") as fobj:
+        written = 0
+        while written < target:
+            fobj.write(chunk)
+            written += len(chunk)
+
+
+def measure(fn, path: Path, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(path)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn(path)
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=float, default=50, help="synthetic .aux size in MB (default: 50)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per parser, best is reported (default: 3)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "main.aux"
+        write_aux(path, args.size_mb)
+        size_mb = path.stat().st_size / (1024 * 1024)
+
+        legacy = legacy_parse(path)
+        snapshot = stream_parse(path)
+        assert dict(legacy[0]) == dict(snapshot.citations["main.aux"]), "citation counts differ"
+        assert legacy[4] == snapshot.labels, "labels differ"
+        assert legacy[6] == snapshot.file_digests["main.aux"], "normalized digests differ"
+
+        print(f"synthetic .aux: {size_mb:.1f} MB, best of {args.repeat}")
+        print(f"{'parser':<8} {'time (s)':>10} {'MB/s':>10} {'peak heap (MB)':>16}")
+        for name, fn in (("legacy", legacy_parse), ("stream", stream_parse)):
+            seconds, peak = measure(fn, path, args.repeat)
+            print(f"{name:<8} {seconds:>10.3f} {size_mb / seconds:>10.1f} {peak / (1024 * 1024):>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
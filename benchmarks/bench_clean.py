@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Benchmark: --clean-any on a synthetic large tree, per-pattern rglob vs. the single-walk cleaner.
+
+The tree imitates a LaTeX project inside a monorepo: --files files in directories of --per-dir
+files, a .git directory holding --git-share of them (packed objects, refs) and --aux-share aux
+files (.aux / .log / .toc / .synctex.gz ...) scattered over the source directories. Each mode
+cleans a fresh tree with the --clean-any patterns of cli_workflow:
+
+  legacy        one Path.rglob("*") per pattern (about 40), regex compiled per pattern,
+                .git filtered only after the walk has descended into it (the cleaner before)
+  single-walk   FileMoveRemoveManager.remove_matched_files: one os.scandir walk that skips
+                .git / .github, one combined regex, unlink in a thread pool
+  dry-run       the same walk with --dry-run (scan only)
+
+Tree generation is not timed. Both cleaners must remove the same files.
+
+Usage: python benchmarks/bench_clean.py [--files 100000] [--repeat 3] [--jobs N]
+"""
+
+import argparse
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from bench_scaling import CLEAN_PATTERNS  # noqa: E402
+
+from pytexmk.file_ops import FileMoveRemoveManager  # noqa: E402
+
+SOURCE_SUFFIXES = (".tex", ".bib", ".py", ".c", ".h", ".md", ".json", ".png")
+AUX_SUFFIXES = (".aux", ".log", ".toc", ".out", ".bbl", ".blg", ".fls", ".synctex.gz", ".xdv", ".idx", ".run.xml")
+
+
+def legacy_clean(patterns, folder):
+    """The cleaner before the single walk: a full rglob per pattern."""
+    removed = 0
+    for pattern in patterns:
+        compiled_pattern = re.compile(pattern)
+        for filepath in Path(folder).rglob("*"):
+            if ".git" in filepath.parts or ".github" in filepath.parts:
+                continue
+            if filepath.is_file() and compiled_pattern.match(filepath.name):
+                filepath.unlink()
+                removed += 1
+    return removed
+
+
+def generate(root: Path, args) -> int:
+    """Write the synthetic tree, return the number of aux files a clean must remove."""
+    git_files = int(args.files * args.git_share)
+    aux_every = max(1, round(1 / args.aux_share)) if args.aux_share > 0 else 0
+    aux_count = 0
+    for i in range(args.files):
+        if i < git_files:
+            # .git/objects/ab/cdef... — names that match the patterns too, like packed logs
+            name = f".git/objects/{i % 256:02x}/{i:038x}" + (".log" if i % 50 == 0 else "")
+        else:
+            j = i - git_files
+            directory = f"src/pkg{j // (args.per_dir * 20)}/mod{j // args.per_dir}"
+            if aux_every and j % aux_every == 0:
+                name = f"{directory}/file{j}{AUX_SUFFIXES[j % len(AUX_SUFFIXES)]}"
+                aux_count += 1
+            else:
+                name = f"{directory}/file{j}{SOURCE_SUFFIXES[j % len(SOURCE_SUFFIXES)]}"
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+    return aux_count
+
+
+def measure(mode: str, args, scratch: Path) -> tuple[float, int, int]:
+    best, removed, expected = float("inf"), 0, 0
+    repeat = 1 if mode == "legacy" and args.legacy_once else args.repeat
+    for _ in range(repeat):
+        tree = scratch / "tree"
+        shutil.rmtree(tree, ignore_errors=True)
+        expected = generate(tree, args)
+        cwd = os.getcwd()
+        os.chdir(tree)
+        try:
+            start = time.perf_counter()
+            if mode == "legacy":
+                removed = legacy_clean(CLEAN_PATTERNS, ".")
+            else:
+                removed = len(FileMoveRemoveManager().remove_matched_files(
+                    CLEAN_PATTERNS, ".", dry_run=mode == "dry-run", jobs=args.jobs,
+                ))
+            best = min(best, time.perf_counter() - start)
+        finally:
+            os.chdir(cwd)
+    return best, removed, expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=100_000, help="files in the tree (default: 100000)")
+    parser.add_argument("--per-dir", type=int, default=100, help="files per source directory (default: 100)")
+    parser.add_argument("--git-share", type=float, default=0.4, help="share of the files under .git (default: 0.4)")
+    parser.add_argument("--aux-share", type=float, default=0.05, help="share of the source files that are aux files (default: 0.05)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per mode on fresh trees, best is reported (default: 3)")
+    parser.add_argument("--legacy-once", action="store_true", help="time the slow legacy cleaner only once")
+    parser.add_argument("--jobs", type=int, help="unlink threads of the single-walk cleaner (default: its own default)")
+    parser.add_argument("--dir", help="scratch directory, e.g. on a network mount (default: a temporary directory)")
+    args = parser.parse_args()
+
+    print(f"{args.files} files, {args.git_share:.0%} under .git, {len(CLEAN_PATTERNS)} patterns, best of {args.repeat}")
+    print(f"{'mode':<12} {'time (s)':>9} {'removed':>8}")
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="pytexmk-clean-", dir=args.dir) as tmp:
+        for mode in ("legacy", "single-walk", "dry-run"):
+            seconds, removed, expected = measure(mode, args, Path(tmp))
+            if removed != expected:
+                sys.exit(f"{mode}: removed {removed} files, expected {expected}")
+            results[mode] = seconds
+            print(f"{mode:<12} {seconds:>9.3f} {removed:>8}")
+    print(f"single-walk {results['legacy'] / results['single-walk']:.1f}x faster than legacy")
+
+
+if __name__ == "__main__":
+    main()
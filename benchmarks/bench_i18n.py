@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: translation lookups in one detection round, uncached vs. the translation registry.
+
+CompilationDetector fetches its translation function with set_language("detection") at the
+top of most detection methods. Before the registry, every such call resolved the system
+locale and ran gettext.translation (a .mo file search) again. This script builds a synthetic
+project with gen_project.py and the stub toolchain, then times run_full_detection:
+
+  uncached   set_language re-resolves the locale and reloads the catalog on every call
+             (the behaviour before the registry)
+  registry   language.set_language: locale resolved once, one cached catalog per domain
+
+and reports the set_language calls per round and the time spent in them. The result depends on
+the locale: zh_* never loads a catalog, so --lang defaults to en_US.UTF-8.
+
+Usage: python benchmarks/bench_i18n.py [--chapters 10] [--rounds 200] [--repeat 5] [--lang en_US.UTF-8]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import gen_project  # noqa: E402
+
+from pytexmk import detection, language  # noqa: E402
+from pytexmk.detection import CompilationDetector  # noqa: E402
+from pytexmk.file_ops import FileMoveRemoveManager  # noqa: E402
+
+
+def uncached_set_language(lang_file):
+    """What set_language did before the registry: resolve the locale and load the catalog on every call."""
+    language.reset_translations()
+    return language.load_translation(lang_file)
+
+
+def counting(fn, stats):
+    def wrapper(lang_file):
+        start = time.perf_counter()
+        try:
+            return fn(lang_file)
+        finally:
+            stats["calls"] += 1
+            stats["seconds"] += time.perf_counter() - start
+    return wrapper
+
+
+def detection_round(project: Path):
+    detector = CompilationDetector("main", "XeLaTeX", ["main.pdf"], ["main.aux"], "./Build/", "./Auxiliary/", False, FileMoveRemoveManager())
+    cite_counter, toc_file, index_old = detector.prepare_LaTeX_output_files()
+    aux_digest, out_content = detector.prepare_aux_out_snapshots()
+    return lambda: detector.run_full_detection(
+        cite_counter_old=cite_counter, toc_file_old=toc_file, index_aux_content_old=index_old,
+        aux_digest_old=aux_digest, out_content_old=out_content,
+    )
+
+
+def measure(mode: str, run, args) -> dict:
+    stats = {"calls": 0, "seconds": 0.0}
+    detection.set_language = counting(uncached_set_language if mode == "uncached" else language.set_language, stats)
+    try:
+        language.reset_translations()
+        run()  # warm-up: page cache, first catalog load
+        best = float("inf")
+        for _ in range(args.repeat):
+            stats.update(calls=0, seconds=0.0)
+            start = time.perf_counter()
+            for _ in range(args.rounds):
+                run()
+            best = min(best, time.perf_counter() - start)
+            lookups = dict(stats)
+    finally:
+        detection.set_language = language.set_language
+    return {
+        "round_us": best / args.rounds * 1e6,
+        "calls": lookups["calls"] / args.rounds,
+        "lookup_us": lookups["seconds"] / args.rounds * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chapters", type=int, default=10, help="project size, see gen_project.py (default: 10)")
+    parser.add_argument("--rounds", type=int, default=200, help="detection rounds per timed run (default: 200)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per mode, best is reported (default: 5)")
+    parser.add_argument("--lang", default="en_US.UTF-8", help="locale to resolve, sets LC_ALL (default: en_US.UTF-8)")
+    args = parser.parse_args()
+    os.environ["LC_ALL"] = args.lang
+
+    size = gen_project.fill_defaults(argparse.Namespace(
+        chapters=args.chapters, citations=None, glossary=None, figures=None, paragraphs=10, log_lines=None,
+    ))
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="pytexmk-i18n-") as tmp:
+        project = Path(tmp) / "book"
+        gen_project.generate(project, size)
+        gen_project.build(project, size.log_lines)
+        os.chdir(project)
+        try:
+            run = detection_round(project)
+            results = {mode: measure(mode, run, args) for mode in ("uncached", "registry")}
+        finally:
+            os.chdir(cwd)
+
+    language.reset_translations()
+    print(f"locale {args.lang} -> catalogs searched for {list(language._locale_settings()[1]) or 'none (zh)'}")
+    print(f"{args.chapters} chapters, best of {args.repeat} x {args.rounds} rounds")
+    print(f"{'mode':<10} {'round (us)':>11} {'set_language calls':>19} {'in set_language (us)':>21}")
+    for mode, result in results.items():
+        print(f"{mode:<10} {result['round_us']:>11.1f} {result['calls']:>19.0f} {result['lookup_us']:>21.1f}")
+    before, after = results["uncached"]["round_us"], results["registry"]["round_us"]
+    print(f"detection round {before / after:.2f}x faster, {before - after:.1f} us saved per round")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""Measure PyTeXMK's own orchestration overhead on the test fixtures, using the stub TeX toolchain.
+
+Each fixture in tests/ is copied into a fresh directory and built with the stub engines of
+stub_tex.py on PATH (no TeX installation needed), in two modes:
+
+  run        compile_engine.RUN: the pass loop, detection and bibliography / index scheduling
+  workflow   cli_workflow.run_workflow: adds main file discovery, config loading, build state,
+             file moves, the log pipeline and the runtime tables
+
+Overhead is the build's wall time minus the wall time of the external (stub) processes, taken
+from the resource usage records, i.e. the time PyTeXMK itself spends between and around the
+tools. The median of --repeat builds is reported. Console output goes to os.devnull.
+
+--save FILE writes the results as a JSON baseline. --compare FILE exits with status 1 when a
+fixture's overhead exceeds the baseline by more than --tolerance (relative) plus --slack-ms, or
+when its LaTeX pass count differs from the baseline.
+
+Usage: python benchmarks/bench_orchestrator.py [--repeat 5] [--save FILE | --compare FILE]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import stub_tex  # noqa: E402
+
+FIXTURES = ("bibtex-test", "biblatex-test", "glossaries-test", "nomencl-test", "makeidx-test", "contents-test")
+BASELINE_FORMAT = 1
+# same suffix lists as cli_workflow
+SUFFIXES_OUT = [".pdf", ".synctex.gz"]
+SUFFIXES_AUX = [
+    ".log", ".blg", ".ilg", ".aux", ".bbl", ".xml", ".toc", ".lof", ".lot", ".out", ".bcf", ".idx", ".ind",
+    ".nlo", ".nls", ".ist", ".glo", ".gls", ".bak", ".spl", ".ent-x", ".tmp", ".ltx", ".los", ".lol", ".loc",
+    ".listing", ".gz", ".userbak", ".nav", ".snm", ".vrb", ".fls", ".xdv", ".fdb_latexmk", ".run.xml",
+]
+
+
+def prepare(workdir: Path, fixture: str):
+    shutil.rmtree(workdir, ignore_errors=True)
+    workdir.mkdir(parents=True)
+    shutil.copy(ROOT / "tests" / f"{fixture}.tex", workdir)
+    for bib in (ROOT / "tests").glob("*.bib"):
+        shutil.copy(bib, workdir)
+
+
+def build_run(fixture: str, engine: str, non_quiet: bool, workdir: Path) -> tuple[int, float]:
+    from pytexmk.compile_engine import RUN
+    from pytexmk.resource_usage import take_usage_records
+
+    rounds = []
+    RUN(
+        {}, fixture, engine, [fixture + s for s in SUFFIXES_OUT], [fixture + s for s in SUFFIXES_AUX],
+        "./Build/", "./Auxiliary/", non_quiet, False, round_log=rounds,
+    )
+    return len(rounds), sum(record.wall_s for record in take_usage_records())
+
+
+def build_workflow(fixture: str, engine: str, non_quiet: bool, workdir: Path) -> tuple[int, float]:
+    from pytexmk.cli.cli_args import parse_args
+    from pytexmk.cli.cli_workflow import run_workflow
+
+    usage_json = workdir.parent / f"{fixture}.usage.json"
+    flag = {"XeLaTeX": "-x", "PdfLaTeX": "-p", "LuaLaTeX": "-l"}[engine]
+    argv = sys.argv
+    sys.argv = ["pytexmk", fixture, flag, "--usage-json", str(usage_json)] + (["-nq"] if non_quiet else [])
+    try:
+        run_workflow(parse_args())
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            raise
+    finally:
+        sys.argv = argv
+    tools = json.loads(usage_json.read_text(encoding="utf-8"))["tools"]
+    passes = sum(1 for tool in tools if tool["program"] == engine)
+    return passes, sum(tool["wall_s"] for tool in tools)
+
+
+def measure(build, fixture: str, args, scratch: Path) -> dict:
+    workdir = scratch / fixture
+    walls, tools, passes = [], [], set()
+    cwd = os.getcwd()
+    for _ in range(args.repeat):
+        prepare(workdir, fixture)
+        os.chdir(workdir)
+        try:
+            with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull), \
+                    contextlib.redirect_stderr(devnull):
+                start = time.perf_counter()
+                run_passes, tool_seconds = build(fixture, args.engine, args.non_quiet, workdir)
+                walls.append(time.perf_counter() - start)
+        finally:
+            os.chdir(cwd)
+        tools.append(tool_seconds)
+        passes.add(run_passes)
+    if len(passes) != 1:
+        raise RuntimeError(f"{fixture}: pass count differs between runs: {sorted(passes)}")
+    overheads = [wall - tool for wall, tool in zip(walls, tools)]
+    return {
+        "passes": passes.pop(),
+        "wall_ms": round(statistics.median(walls) * 1000, 1),
+        "tools_ms": round(statistics.median(tools) * 1000, 1),
+        "overhead_ms": round(statistics.median(overheads) * 1000, 1),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float, slack_ms: float) -> list[str]:
+    failures = []
+    for name, base in baseline["results"].items():
+        current = results.get(name)
+        if current is None:
+            continue
+        if current["passes"] != base["passes"]:
+            failures.append(f"{name}: {current['passes']} LaTeX passes, baseline {base['passes']}")
+        limit = base["overhead_ms"] * (1 + tolerance) + slack_ms
+        if current["overhead_ms"] > limit:
+            failures.append(
+                f"{name}: overhead {current['overhead_ms']:.1f} ms > {limit:.1f} ms (baseline {base['overhead_ms']:.1f} ms)"
+            )
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="builds per fixture and mode, median is reported (default: 5)")
+    parser.add_argument("--fixtures", nargs="+", default=list(FIXTURES), choices=FIXTURES, metavar="NAME", help="fixtures to build (default: all)")
+    parser.add_argument("--modes", nargs="+", default=["run", "workflow"], choices=["run", "workflow"], help="entry points to drive (default: both)")
+    parser.add_argument("--engine", default="XeLaTeX", choices=["XeLaTeX", "PdfLaTeX", "LuaLaTeX"], help="LaTeX engine (default: XeLaTeX)")
+    parser.add_argument("--non-quiet", action="store_true", help="run the engines in nonstopmode and render their output")
+    parser.add_argument("--engine-latency", type=float, default=0.05, help="seconds per stub LaTeX pass (default: 0.05)")
+    parser.add_argument("--tool-latency", type=float, default=0.01, help="seconds per stub biber / bibtex / makeindex / dvipdfmx run (default: 0.01)")
+    parser.add_argument("--log-lines", type=int, default=300, help="package-loading lines per stub .log (default: 300)")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--save", metavar="FILE", help="write the results as a JSON baseline")
+    group.add_argument("--compare", metavar="FILE", help="compare against a JSON baseline, exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative overhead increase (default: 0.25)")
+    parser.add_argument("--slack-ms", type=float, default=20, help="allowed absolute overhead increase in ms (default: 20)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="pytexmk-bench-") as tmp:
+        scratch = Path(tmp)
+        # config, build history and version cache go to the scratch directory, not the user's own
+        os.environ.update({
+            "PATH": f"{stub_tex.install(scratch / 'bin')}{os.pathsep}{os.environ.get('PATH', '')}",
+            "XDG_CONFIG_HOME": str(scratch / "config"),
+            "XDG_CACHE_HOME": str(scratch / "cache"),
+            "STUB_TEX_LATENCY": str(args.engine_latency),
+            "STUB_TOOL_LATENCY": str(args.tool_latency),
+            "STUB_TEX_LOG_LINES": str(args.log_lines),
+        })
+        from pytexmk.config import ConfigParser
+
+        ConfigParser.update_check_enabled = lambda self: False  # no network access
+
+        builds = {"run": build_run, "workflow": build_workflow}
+        results = {}
+        print(f"{args.engine}, stub latency {args.engine_latency * 1000:.0f}/{args.tool_latency * 1000:.0f} ms, median of {args.repeat}")
+        print(f"{'build':<26} {'passes':>6} {'wall (ms)':>10} {'tools (ms)':>11} {'overhead (ms)':>14}")
+        for mode in args.modes:
+            for fixture in args.fixtures:
+                name = f"{mode}/{fixture}"
+                results[name] = result = measure(builds[mode], fixture, args, scratch)
+                print(
+                    f"{name:<26} {result['passes']:>6} {result['wall_ms']:>10.1f} {result['tools_ms']:>11.1f}"
+                    f" {result['overhead_ms']:>14.1f}"
+                )
+
+    data = {
+        "format": BASELINE_FORMAT,
+        "engine": args.engine,
+        "engine_latency": args.engine_latency,
+        "tool_latency": args.tool_latency,
+        "log_lines": args.log_lines,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if args.save:
+        Path(args.save).write_text(json.dumps(data, indent=1) + "\n", encoding="utf-8")
+        print(f"baseline written to {args.save}")
+    elif args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        failures = compare(results, baseline, args.tolerance, args.slack_ms)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        if failures:
+            sys.exit(1)
+        print(f"no regressions against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
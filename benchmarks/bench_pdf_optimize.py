@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Benchmark: -po on a report that includes the same figures many times.
+
+The synthetic report has --pages pages. Each page draws one of --figures distinct images
+(--image-kb KiB of raw RGB each) and carries a --content-kb content stream. Every inclusion embeds
+its own copy of the image, as an engine does when one figure is included from different files or
+through different paths. Images and content are written uncompressed, like figure PDFs from some
+plotting tools.
+
+PdfFileOperation.pdf_optimize runs --repeat times on fresh copies. The best time is reported with
+the size before and after; the result must keep the page count and pass the structure check.
+qpdf is used when it is on PATH (--no-qpdf hides it).
+
+Usage: python benchmarks/bench_pdf_optimize.py [--pages 200] [--figures 5] [--linearize]
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from pypdf import PdfReader, PdfWriter  # noqa: E402
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject, NumberObject  # noqa: E402
+
+from pytexmk import pdf_tools  # noqa: E402
+from pytexmk.pdf_tools import PdfFileOperation, check_pdf_structure  # noqa: E402
+from pytexmk.resource_usage import format_bytes  # noqa: E402
+
+
+def generate(path: Path, args):
+    side = int((args.image_kb * 1024 / 3) ** 0.5)
+    images = [os.urandom(side * side * 3) for _ in range(args.figures)]
+    line = b"0 0 m 72 72 l S\n"
+    writer = PdfWriter()
+    for i in range(args.pages):
+        page = writer.add_blank_page(width=595, height=842)
+        image = DecodedStreamObject()
+        image.set_data(images[i % args.figures])
+        image.update({
+            NameObject("/Type"): NameObject("/XObject"), NameObject("/Subtype"): NameObject("/Image"),
+            NameObject("/Width"): NumberObject(side), NameObject("/Height"): NumberObject(side),
+            NameObject("/ColorSpace"): NameObject("/DeviceRGB"), NameObject("/BitsPerComponent"): NumberObject(8),
+        })
+        xobjects = DictionaryObject({NameObject("/Im0"): writer._add_object(image)})
+        page[NameObject("/Resources")] = DictionaryObject({NameObject("/XObject"): xobjects})
+        content = DecodedStreamObject()
+        content.set_data(b"q 400 0 0 400 100 300 cm /Im0 Do Q\n" + line * (args.content_kb * 1024 // len(line)))
+        page[NameObject("/Contents")] = writer._add_object(content)
+    with open(path, "wb") as fobj:
+        writer.write(fobj)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=200, help="pages, one figure inclusion each (default: 200)")
+    parser.add_argument("--figures", type=int, default=5, help="distinct figures (default: 5)")
+    parser.add_argument("--image-kb", type=int, default=256, help="raw image size in KiB (default: 256)")
+    parser.add_argument("--content-kb", type=int, default=16, help="content stream size per page in KiB (default: 16)")
+    parser.add_argument("--linearize", action="store_true", help="also linearize (needs qpdf)")
+    parser.add_argument("--no-qpdf", action="store_true", help="run without qpdf even if it is installed")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs on fresh copies, best is reported (default: 3)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    if args.no_qpdf:
+        pdf_tools.shutil.which = lambda _name: None
+    qpdf = pdf_tools.shutil.which("qpdf")
+    with tempfile.TemporaryDirectory(prefix="pytexmk-pdf-optimize-") as tmp:
+        source = Path(tmp) / "source.pdf"
+        generate(source, args)
+        build = Path(tmp) / "Build"
+        build.mkdir()
+        best, sizes = float("inf"), (0, 0)
+        for _ in range(args.repeat):
+            shutil.copy(source, build / "main.pdf")
+            start = time.perf_counter()
+            sizes = PdfFileOperation().pdf_optimize("main", str(build), str(Path(tmp) / "Auxiliary"), linearize=args.linearize)
+            best = min(best, time.perf_counter() - start)
+        result = build / "main.pdf"
+        if check_pdf_structure(result) is not None or len(PdfReader(result).pages) != args.pages:
+            sys.exit("optimized PDF is broken")
+
+    before, after = sizes
+    print(f"{args.pages} pages, {args.figures} figures x {args.image_kb} KiB, qpdf: {qpdf or 'not used'}, best of {args.repeat}")
+    print(f"{'before':>10} {'after':>10} {'saved':>7} {'time (s)':>9}")
+    print(f"{format_bytes(before):>10} {format_bytes(after):>10} {1 - after / before:>7.1%} {best:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
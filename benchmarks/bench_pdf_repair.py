@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Benchmark: -pr on a figure-heavy project, rewrite-everything vs. the checked, cached repair.
+
+The project holds --files figure PDFs of --pages pages each (a template written once with pypdf,
+every page with a --content-kb content stream); --broken-share of them get their xref offsets
+shifted, the corruption behind "invalid X X R object" warnings. Each mode runs on a fresh copy:
+
+  legacy   one pypdf read + rewrite per file, one after another (the repair before)
+  cold     PdfFileOperation.pdf_repair with an empty check cache: structure check in a process
+           pool of --jobs workers, only broken files rewritten
+  warm     the same run again with the cache of the cold run (no file changed)
+
+Tree generation is not timed. After every mode all files must pass the structure check.
+
+Usage: python benchmarks/bench_pdf_repair.py [--files 600] [--jobs N] [--repeat 3]
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from pypdf import PdfReader, PdfWriter  # noqa: E402
+from pypdf.generic import ContentStream, DecodedStreamObject, NameObject  # noqa: E402
+
+from pytexmk import pdf_tools  # noqa: E402
+from pytexmk.pdf_tools import PdfFileOperation, check_pdf_structure  # noqa: E402
+
+
+def legacy_repair(folder: Path) -> int:
+    """The repair before: rewrite every PDF with pypdf, one after another."""
+    repaired = 0
+    for pdf_file in sorted(folder.rglob("*.pdf")):
+        reader = PdfReader(pdf_file)
+        writer = PdfWriter()
+        for page in reader.pages:
+            writer.add_page(page)
+        with open(pdf_file, "wb") as f:
+            writer.write(f)
+        repaired += 1
+    return repaired
+
+
+def template(args) -> bytes:
+    writer = PdfWriter()
+    line = b"0 0 m 72 72 l S\n"
+    for _ in range(args.pages):
+        page = writer.add_blank_page(width=595, height=842)
+        stream = DecodedStreamObject()
+        stream.set_data(line * (args.content_kb * 1024 // len(line)))
+        page[NameObject("/Contents")] = writer._add_object(ContentStream(stream, writer))
+    path = Path(tempfile.mkstemp(suffix=".pdf")[1])
+    try:
+        with open(path, "wb") as fobj:
+            writer.write(fobj)
+        return path.read_bytes()
+    finally:
+        path.unlink()
+
+
+def generate(root: Path, data: bytes, args) -> int:
+    """Write the figure PDFs, return how many are broken."""
+    header_end = data.index(b"\n") + 1
+    broken_data = data[:header_end] + b"%" + b"x" * 40 + b"\n" + data[header_end:]
+    broken_every = max(1, round(1 / args.broken_share)) if args.broken_share > 0 else 0
+    broken = 0
+    for i in range(args.files):
+        path = root / "figures" / f"chapter{i // 50}" / f"fig{i}.pdf"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        is_broken = broken_every and i % broken_every == 0
+        path.write_bytes(broken_data if is_broken else data)
+        broken += bool(is_broken)
+    return broken
+
+
+def run_mode(mode: str, project: Path, args) -> tuple[float, dict]:
+    cwd = os.getcwd()
+    os.chdir(project)
+    try:
+        start = time.perf_counter()
+        if mode == "legacy":
+            counts = {"repaired": legacy_repair(Path("."))}
+        else:
+            counts = PdfFileOperation().pdf_repair("main", ".", "./Build/", cache_dir="Auxiliary", jobs=args.jobs)
+        seconds = time.perf_counter() - start
+    finally:
+        os.chdir(cwd)
+    bad = [p for p in project.rglob("*.pdf") if check_pdf_structure(p) is not None]
+    if bad:
+        sys.exit(f"{mode}: {len(bad)} files still broken, e.g. {bad[0]}")
+    return seconds, counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=600, help="figure PDFs (default: 600)")
+    parser.add_argument("--pages", type=int, default=2, help="pages per figure PDF (default: 2)")
+    parser.add_argument("--content-kb", type=int, default=64, help="content stream size per page in KiB (default: 64)")
+    parser.add_argument("--broken-share", type=float, default=0.05, help="share of broken files (default: 0.05)")
+    parser.add_argument("--jobs", type=int, help="repair processes (default: the CPU count)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per mode on fresh copies, best is reported (default: 3)")
+    args = parser.parse_args()
+
+    logging.getLogger("pypdf").setLevel(logging.ERROR)  # the broken files are expected
+    pdf_tools.print = lambda *a, **k: None  # keep the per-run summary lines out of the table
+    data = template(args)
+    print(f"{args.files} PDFs x {len(data) // 1024} KiB, {args.broken_share:.0%} broken, jobs {args.jobs or os.cpu_count()}, best of {args.repeat}")
+    print(f"{'mode':<8} {'time (s)':>9} {'rewritten':>10}")
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="pytexmk-pdf-repair-") as tmp:
+        pristine = Path(tmp) / "pristine"
+        generate(pristine, data, args)
+        for mode in ("legacy", "cold", "warm"):
+            best, counts = float("inf"), {}
+            for _ in range(args.repeat):
+                project = Path(tmp) / "project"
+                if mode != "warm":  # warm reuses the repaired copy and check cache of the last cold run
+                    shutil.rmtree(project, ignore_errors=True)
+                    shutil.copytree(pristine, project)
+                seconds, counts = run_mode(mode, project, args)
+                best = min(best, seconds)
+            results[mode] = best
+            print(f"{mode:<8} {best:>9.3f} {counts.get('repaired', 0):>10}")
+    print(f"cold {results['legacy'] / results['cold']:.1f}x, warm {results['legacy'] / results['warm']:.1f}x faster than legacy")
+
+
+if __name__ == "__main__":
+    main()
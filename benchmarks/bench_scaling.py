@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""Scaling benchmark: how detection, .aux normalization, cleaning and flattening grow with project size.
+
+For each --chapters size, gen_project.py generates a book (20 citations, 5 glossary entries and
+5 figures per chapter by default) and builds it with the stub toolchain, so the project has the
+.aux / .toc / .log files of a converged build. Then, best of --repeat, it measures time and peak
+Python heap (tracemalloc, measured in a separate run) of:
+
+  detection   CompilationDetector.run_full_detection after a build that changed nothing
+  normalize   aux_snapshot.normalize_aux_like over the main and all chapter .aux files
+  clean       FileMoveRemoveManager.remove_matched_files with the --clean-any patterns,
+              on a fresh copy of the built project
+  flatten     LaTeXDiff_Aux.flatten_Latex of main.tex and every \\include'd chapter
+
+The last column of the summary is the growth exponent k (time ~ size^k) between the smallest
+and largest size. --json FILE writes all results. --plot FILE draws time and memory against
+size (needs matplotlib).
+
+Usage: python benchmarks/bench_scaling.py [--chapters 10 25 50 100 200] [--repeat 3] [--plot scaling.png]
+"""
+
+import argparse
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import gen_project  # noqa: E402
+
+from pytexmk.aux_snapshot import normalize_aux_like  # noqa: E402
+from pytexmk.detection import CompilationDetector  # noqa: E402
+from pytexmk.file_ops import FileMoveRemoveManager  # noqa: E402
+from pytexmk.latexdiff import LaTeXDiff_Aux  # noqa: E402
+
+# the --clean-any patterns of cli_workflow
+CLEAN_PATTERNS = [
+    f".*\\{suffix}"
+    for suffix in (
+        ".log", ".blg", ".ilg", ".aux", ".bbl", ".xml", ".toc", ".lof", ".lot", ".out", ".bcf", ".idx", ".ind",
+        ".nlo", ".nls", ".ist", ".glo", ".gls", ".bak", ".spl", ".ent-x", ".tmp", ".ltx", ".los", ".lol", ".loc",
+        ".listing", ".gz", ".userbak", ".nav", ".snm", ".vrb", ".fls", ".xdv", ".fdb_latexmk", ".run.xml",
+    )
+]
+FUNCTIONS = ("detection", "normalize", "clean", "flatten")
+
+
+def detection(project: Path):
+    detector = CompilationDetector("main", "XeLaTeX", ["main.pdf"], ["main.aux"], "./Build/", "./Auxiliary/", False, FileMoveRemoveManager())
+    cite_counter, toc_file, index_old = detector.prepare_LaTeX_output_files()
+    aux_digest, out_content = detector.prepare_aux_out_snapshots()
+
+    def run():
+        detector.run_full_detection(
+            cite_counter_old=cite_counter, toc_file_old=toc_file, index_aux_content_old=index_old,
+            aux_digest_old=aux_digest, out_content_old=out_content,
+        )
+    return run
+
+
+def normalize(project: Path):
+    content = "\n".join(path.read_text(encoding="utf-8") for path in [project / "main.aux", *sorted(project.glob("chapters/*.aux"))])
+    return lambda: normalize_aux_like(content)
+
+
+def clean(project: Path):
+    copy = project.parent / f"{project.name}-clean"
+
+    def setup():
+        shutil.rmtree(copy, ignore_errors=True)
+        shutil.copytree(project, copy)
+
+    return lambda: FileMoveRemoveManager().remove_matched_files(CLEAN_PATTERNS, str(copy)), setup
+
+
+def flatten(project: Path):
+    return lambda: LaTeXDiff_Aux("./Build/", [".pdf"], [".aux"], "./Auxiliary/").flatten_Latex("main")
+
+
+def measure(fn, repeat: int, setup=None) -> tuple[float, int]:
+    best = float("inf")
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    if setup:
+        setup()
+    tracemalloc.start()
+    fn()
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def run_size(chapters: int, args, scratch: Path) -> dict:
+    project = scratch / f"book-{chapters}"
+    size = gen_project.fill_defaults(argparse.Namespace(
+        chapters=chapters, citations=None, glossary=None, figures=None, paragraphs=args.paragraphs, log_lines=None,
+    ))
+    gen_project.generate(project, size)
+    gen_project.build(project, size.log_lines)
+    aux_bytes = sum(path.stat().st_size for path in [project / "main.aux", *project.glob("chapters/*.aux")])
+    result = {
+        "chapters": chapters,
+        "files": sum(1 for path in project.rglob("*") if path.is_file()),
+        "aux_kb": round(aux_bytes / 1024, 1),
+        "log_kb": round((project / "main.log").stat().st_size / 1024, 1),
+    }
+    cwd = os.getcwd()
+    os.chdir(project)
+    try:
+        for name in FUNCTIONS:
+            prepared = globals()[name](project)
+            fn, setup = prepared if isinstance(prepared, tuple) else (prepared, None)
+            seconds, peak = measure(fn, args.repeat, setup)
+            result[name] = {"ms": round(seconds * 1000, 2), "peak_kb": round(peak / 1024, 1)}
+    finally:
+        os.chdir(cwd)
+    return result
+
+
+def growth(results: list[dict], name: str) -> float:
+    first, last = results[0], results[-1]
+    if last["chapters"] == first["chapters"] or first[name]["ms"] <= 0:
+        return float("nan")
+    return math.log(last[name]["ms"] / first[name]["ms"]) / math.log(last["chapters"] / first["chapters"])
+
+
+def plot(results: list[dict], path: str):
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    sizes = [result["chapters"] for result in results]
+    fig, (ax_time, ax_mem) = plt.subplots(1, 2, figsize=(11, 4.5))
+    for name in FUNCTIONS:
+        ax_time.plot(sizes, [result[name]["ms"] for result in results], marker="o", label=name)
+        ax_mem.plot(sizes, [result[name]["peak_kb"] / 1024 for result in results], marker="o", label=name)
+    for ax, label in ((ax_time, "time (ms)"), (ax_mem, "peak heap (MB)")):
+        ax.set_xscale("log")
+        ax.set_yscale("log")
+        ax.set_xlabel("chapters")
+        ax.set_ylabel(label)
+        ax.grid(True, which="both", alpha=0.3)
+        ax.legend()
+    fig.tight_layout()
+    fig.savefig(path, dpi=120)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chapters", type=int, nargs="+", default=[10, 25, 50, 100, 200], help="project sizes (default: 10 25 50 100 200)")
+    parser.add_argument("--paragraphs", type=int, default=40, help="paragraphs per chapter, about 8 pages (default: 40)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per function, best is reported (default: 3)")
+    parser.add_argument("--json", metavar="FILE", help="write the results as JSON")
+    parser.add_argument("--plot", metavar="FILE", help="plot time and memory against size (needs matplotlib)")
+    args = parser.parse_args()
+    if args.plot:
+        try:
+            import matplotlib  # noqa: F401
+        except ImportError:
+            parser.error("--plot needs matplotlib (pip install matplotlib)")
+
+    results = []
+    header = f"{'chapters':>8} {'files':>6} {'aux (KB)':>9} {'log (KB)':>9}" + "".join(f" {name + ' ms/KB':>20}" for name in FUNCTIONS)
+    print(header)
+    with tempfile.TemporaryDirectory(prefix="pytexmk-scaling-") as tmp:
+        for chapters in sorted(args.chapters):
+            result = run_size(chapters, args, Path(tmp))
+            results.append(result)
+            cells = "".join(f" {result[name]['ms']:>10.2f}/{result[name]['peak_kb']:>9.0f}" for name in FUNCTIONS)
+            print(f"{chapters:>8} {result['files']:>6} {result['aux_kb']:>9.0f} {result['log_kb']:>9.0f}{cells}")
+    print("growth exponent k (time ~ chapters^k): " + ", ".join(f"{name} {growth(results, name):.2f}" for name in FUNCTIONS))
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({"format": 1, "results": results}, indent=1) + "\n", encoding="utf-8")
+    if args.plot:
+        plot(results, args.plot)
+        print(f"plot written to {args.plot}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Measure per-pass output-handling overhead of MySubProcess.run_command.
+
+A stub engine prints --lines lines (roughly what a long document emits with -nq) and exits.
+Overhead is the run_command wall time minus the time of the same process with output
+discarded by the OS (stdout=DEVNULL).
+
+  legacy      previous loop: readline + unbounded list + one rich console.print per line
+  tty         OutputPipeline, rendering to a (forced) terminal in batched prints
+  no-tty      OutputPipeline, stdout not a terminal: ring buffer only
+  quiet       quiet mode: output written straight to a temporary file descriptor
+
+Usage: python benchmarks/bench_subprocess_output.py [--lines 20000] [--repeat 3]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from rich.console import Console  # noqa: E402
+
+from pytexmk.subprocess_runner import MySubProcess  # noqa: E402
+from pytexmk.ui_theme import console, custom_theme  # noqa: E402
+
+
+def stub_engine(lines: int) -> list[str]:
+    text = "(/usr/share/texlive/texmf-dist/tex/latex/base/size10.clo) Overfull \\\\hbox (1.2pt too wide) [%d]"
+    return [sys.executable, "-c", f"for i in range({lines}): print({text!r} % i)"]
+
+
+def use_console(terminal: bool, devnull):
+    console.__dict__ = Console(
+        theme=custom_theme, file=devnull, force_terminal=terminal, width=120, legacy_windows=False
+    ).__dict__
+
+
+def legacy_run(command):
+    """The pre-pipeline read loop, kept verbatim as the reference."""
+    stdout_lines = []
+    process = subprocess.Popen(
+        command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1, encoding="utf-8"
+    )
+    with console.status("[status]running..."):
+        while True:
+            output = process.stdout.readline()
+            if not output and process.poll() is not None:
+                break
+            if output:
+                stdout_lines.append(output)
+                console.print(f"[dim]{output.strip()}[/]")
+    return process.returncode
+
+
+def best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=20000, help="lines printed by the stub engine (default: 20000)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per mode, best is reported (default: 3)")
+    args = parser.parse_args()
+
+    command = stub_engine(args.lines)
+    baseline = best_of(args.repeat, lambda: subprocess.run(command, stdout=subprocess.DEVNULL, check=True))
+    loud = MySubProcess("./Build/", "./Auxiliary/", "bench")
+    quiet = MySubProcess("./Build/", "./Auxiliary/", "bench", quiet=True)
+
+    modes = [
+        ("legacy", True, lambda: legacy_run(command)),
+        ("tty", True, lambda: loud.run_command(command, [], [], "bench")),
+        ("no-tty", False, lambda: loud.run_command(command, [], [], "bench")),
+        ("quiet", True, lambda: quiet.run_command(command, [], [], "bench")),
+    ]
+    print(f"stub engine: {args.lines} lines, best of {args.repeat}, process alone {baseline * 1000:.0f} ms")
+    print(f"{'mode':<8} {'pass (ms)':>10} {'overhead (ms)':>14}")
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+        original = console.__dict__
+        try:
+            for name, terminal, fn in modes:
+                use_console(terminal, devnull)
+                seconds = best_of(args.repeat, fn)
+                print(f"{name:<8} {seconds * 1000:>10.0f} {(seconds - baseline) * 1000:>14.0f}", file=sys.__stdout__)
+        finally:
+            console.__dict__ = original
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""Generate a synthetic large LaTeX project for scaling tests.
+
+The project is a book with --chapters chapters pulled in with \\include (one child .aux each),
+--citations bibliography entries all cited across the chapters, --glossary glossary entries,
+an index, cross-references between sections, and --figures placeholder figure files. With
+--build the stub toolchain of stub_tex.py (no TeX needed) compiles it to a converged state, leaving
+the large .aux / .toc / .log / .glo / .idx / .bbl files a real build of such a document produces.
+
+  main.tex  chapters/chNNN.tex  refs.bib  figures/figNNNN.pdf
+
+Usage: python benchmarks/gen_project.py OUTDIR [--chapters 50] [--citations 1000] [--glossary 250] [--build]
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import stub_tex  # noqa: E402
+
+SECTIONS_PER_CHAPTER = 5
+WORDS = (
+    "the convergence of the iterative scheme depends on the spectral radius of the operator and on the "
+    "choice of the initial guess which we discuss below in terms of the residual norm"
+).split()
+
+
+def paragraph(seed: int, words: int = 90) -> str:
+    return " ".join(WORDS[(seed + i * 7) % len(WORDS)] for i in range(words))
+
+
+def chapter_source(number: int, args, cite_keys: list[str]) -> str:
+    lines = [f"\\chapter{{Chapter {number}}}\\label{{ch:{number}}}", ""]
+    paragraphs = args.paragraphs
+    for section in range(1, SECTIONS_PER_CHAPTER + 1):
+        lines.append(f"\\section{{Section {number}.{section}}}\\label{{sec:{number}.{section}}}")
+        for p in range(paragraphs // SECTIONS_PER_CHAPTER):
+            seed = number * 1000 + section * 100 + p
+            extras = []
+            if cite_keys:
+                extras.append(f"\\cite{{{cite_keys[seed % len(cite_keys)]}}}")
+            if args.glossary:
+                extras.append(f"\\gls{{g{seed % args.glossary}}}")
+            extras.append(f"\\index{{term {seed % 97}}}")
+            if section > 1:
+                extras.append(f"see Section~\\ref{{sec:{number}.{section - 1}}}")
+            lines.append(paragraph(seed) + " " + " ".join(extras) + ".")
+            lines.append("")
+        if args.figures:
+            figure = (number * SECTIONS_PER_CHAPTER + section) % args.figures
+            lines.append(f"\\begin{{figure}}\\includegraphics{{figures/fig{figure:04d}}}\\caption{{Figure}}\\end{{figure}}")
+    return "\n".join(lines) + "\n"
+
+
+def generate(root: Path, args) -> Path:
+    """Write the project sources into root and return the path of main.tex."""
+    (root / "chapters").mkdir(parents=True, exist_ok=True)
+    keys = [f"key{i:05d}" for i in range(args.citations)]
+    (root / "refs.bib").write_text(
+        "".join(
+            f"@article{{{key},\n  author = {{Author {i}}},\n  title = {{Title {i}}},\n  journal = {{Journal}},\n  year = {{{1950 + i % 70}}},\n}}\n\n"
+            for i, key in enumerate(keys)
+        ),
+        encoding="utf-8",
+    )
+    if args.figures:
+        (root / "figures").mkdir(exist_ok=True)
+        pdf = stub_tex.minimal_pdf(1)
+        for i in range(args.figures):
+            (root / "figures" / f"fig{i:04d}.pdf").write_bytes(pdf)
+
+    for number in range(1, args.chapters + 1):
+        # each chapter cites its own slice of the bibliography, so every entry is cited
+        share = keys[(number - 1) * len(keys) // args.chapters: number * len(keys) // args.chapters] or keys
+        (root / "chapters" / f"ch{number:03d}.tex").write_text(chapter_source(number, args, share), encoding="utf-8")
+
+    preamble = [
+        "\\documentclass{book}",
+        "\\usepackage{graphicx}",
+        "\\usepackage[colorlinks]{hyperref}",
+        "\\usepackage{makeidx}",
+        "\\usepackage{glossaries}",
+        "\\makeindex",
+    ]
+    if args.glossary:
+        preamble.append("\\makeglossaries")
+        preamble += [f"\\newglossaryentry{{g{i}}}{{name={{term {i}}},description={{entry {i}}}}}" for i in range(args.glossary)]
+    body = ["\\begin{document}", "\\tableofcontents"]
+    body += [f"\\include{{chapters/ch{number:03d}}}" for number in range(1, args.chapters + 1)]
+    if args.glossary:
+        body.append("\\printglossaries")
+    body += ["\\bibliographystyle{plain}", "\\bibliography{refs}", "\\printindex", "\\end{document}"]
+    main = root / "main.tex"
+    main.write_text("\n".join(preamble + [""] + body) + "\n", encoding="utf-8")
+    return main
+
+
+def build(root: Path, log_lines: int):
+    """Compile with the stub toolchain until converged: LaTeX, bibtex, makeindex (glossary and index), LaTeX twice."""
+    env = {"STUB_TEX_LATENCY": "0", "STUB_TOOL_LATENCY": "0", "STUB_TEX_LOG_LINES": str(log_lines)}
+    saved = {key: os.environ.get(key) for key in env}
+    os.environ.update(env)
+    cwd = os.getcwd()
+    engine = ["xelatex", "-interaction=batchmode", "-synctex=1", "-no-pdf", "-recorder", "main.tex"]
+    try:
+        os.chdir(root)
+        with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull), \
+                contextlib.redirect_stderr(devnull):
+            stub_tex.main(engine)
+            stub_tex.main(["bibtex", "main"])
+            if Path("main.glo").exists():
+                stub_tex.main(["makeindex", "-s", "main.ist", "-o", "main.gls", "main.glo"])
+            stub_tex.main(["makeindex", "main.idx"])
+            stub_tex.main(engine)
+            stub_tex.main(engine)
+            stub_tex.main(["dvipdfmx", "-q", "-V", "2.0", "main"])
+    finally:
+        os.chdir(cwd)
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--chapters", type=int, default=50, help="number of \\include'd chapters (default: 50)")
+    parser.add_argument("--citations", type=int, default=None, help="bibliography entries, all cited (default: 20 per chapter)")
+    parser.add_argument("--glossary", type=int, default=None, help="glossary entries (default: 5 per chapter)")
+    parser.add_argument("--figures", type=int, default=None, help="placeholder figure files (default: 5 per chapter)")
+    parser.add_argument("--paragraphs", type=int, default=40, help="paragraphs per chapter, about 8 pages (default: 40)")
+    parser.add_argument("--log-lines", type=int, default=None, help="package-loading lines in the .log (default: 50 per chapter)")
+
+
+def fill_defaults(args: argparse.Namespace) -> argparse.Namespace:
+    """Scale the unset sizes with the chapter count."""
+    for name, per_chapter in (("citations", 20), ("glossary", 5), ("figures", 5), ("log_lines", 50)):
+        if getattr(args, name) is None:
+            setattr(args, name, per_chapter * args.chapters)
+    return args
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("outdir", type=Path, help="directory to write the project into")
+    add_arguments(parser)
+    parser.add_argument("--build", action="store_true", help="also compile it with the stub toolchain")
+    args = fill_defaults(parser.parse_args())
+
+    generate(args.outdir, args)
+    if args.build:
+        build(args.outdir, args.log_lines)
+    sizes = {suffix: (args.outdir / f"main{suffix}").stat().st_size for suffix in (".aux", ".toc", ".log") if (args.outdir / f"main{suffix}").exists()}
+    children = sum(path.stat().st_size for path in (args.outdir / "chapters").glob("*.aux"))
+    print(f"{args.chapters} chapters, {args.citations} citations, {args.glossary} glossary entries, {args.figures} figures")
+    for suffix, size in sizes.items():
+        print(f"main{suffix}: {size / 1024:.0f} KB")
+    if children:
+        print(f"chapters/*.aux: {children / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""Stand-in TeX toolchain for benchmarks: xelatex / pdflatex / lualatex, biber, bibtex, makeindex, dvipdfmx.
+
+The stubs do not typeset anything. They read the document the way LaTeX would and write the same kinds
+of files a real toolchain produces, so PyTeXMK's detection, rerun logic, file moves and log
+pipeline all see realistic inputs:
+
+  engine     .aux (citations, labels, toc lines, glossaries, \\@input of \\include'd children),
+             .bcf for biblatex, .toc, .out (hyperref), .idx / .nlo / .glo / .ist, .fls (-recorder),
+             .synctex.gz, .log with "No file", undefined reference / citation and
+             "Label(s) may have changed" warnings, .xdv (-no-pdf) or .pdf
+  biber      .bcf -> .bbl / .blg        bibtex     .aux -> .bbl / .blg
+  makeindex  .idx / .nlo / .glo -> .ind / .nls / .gls and .ilg
+  dvipdfmx   .xdv -> .pdf (a small but valid PDF)
+
+-output-directory=DIR makes the engines read and write their generated files in DIR (the source
+files are still read from the working directory); dvipdfmx takes -o OUT and an .xdv path.
+
+\errmessage{text} in a document makes the engine write a "! text." error to the log and exit 1,
+after writing its other files, as LaTeX does in nonstop / batch mode.
+
+Rerun behaviour follows LaTeX: labels and \\bibcite entries are resolved from the previous .aux, so a
+document with cross-references needs two passes and a bibtex document needs three.
+
+Latency per run is taken from STUB_TEX_LATENCY (engines, default 0.05 s) and STUB_TOOL_LATENCY
+(other tools, default 0.01 s). STUB_TEX_LOG_LINES (default 300) sets how many package-loading
+lines the engines write to the log.
+
+Usage: stub_tex.py TOOL [ARGS...]. install(bin_dir) writes one wrapper script per tool name.
+"""
+
+import gzip
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+ENGINES = ("xelatex", "pdflatex", "lualatex")
+TOOLS = ENGINES + ("biber", "bibtex", "makeindex", "dvipdfmx")
+TEXMF = "/usr/share/texlive/texmf-dist/tex/latex"
+
+COMMAND_PATTERN = re.compile(
+    r"\\(?P<cmd>input|include|cite|nocite|label|ref|eqref|pageref|section|subsection|subsubsection|chapter"
+    r"|addbibresource|bibliography|index|nomenclature|gls|Gls|glspl|newpage|clearpage|begin|end"
+    r"|usepackage|makeindex|makenomenclature|makeglossaries|tableofcontents|printindex|printnomenclature"
+    r"|printglossaries|printglossary|printbibliography|bibliographystyle|errmessage)(?![A-Za-z])\*?(?:\[[^\]]*\])?(?:\{(?P<arg>[^{}]*(?:\{[^{}]*\}[^{}]*)*)\})?"
+)
+BIB_ENTRY_PATTERN = re.compile(r"@(\w+)\s*\{\s*([^,\s]+)\s*,")
+AUX_LABEL_PATTERN = re.compile(r"\\(newlabel|bibcite)\{(.*?)\}\{(.*)\}")
+COMMENT_PATTERN = re.compile(r"(?<!\\)%.*")
+CHARS_PER_PAGE = 2500
+
+
+def _sleep(engine: bool):
+    time.sleep(float(os.environ.get("STUB_TEX_LATENCY" if engine else "STUB_TOOL_LATENCY", "0.05" if engine else "0.01")))
+
+
+def _read(path: Path) -> str:
+    try:
+        return path.read_text(encoding="utf-8", errors="replace")
+    except OSError:
+        return ""
+
+
+def _tex_path(name: str) -> Path:
+    path = Path(name)
+    return path if path.suffix == ".tex" else path.with_name(path.name + ".tex")
+
+
+def minimal_pdf(pages: int) -> bytes:
+    """A valid PDF with the given number of empty pages."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>"]
+    kids = " ".join(f"{3 + i} 0 R" for i in range(pages))
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode())
+    objects += [b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] >>"] * pages
+    out = bytearray(b"%PDF-1.5\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+class Document:
+    """What one LaTeX pass learns from the sources, plus the previous pass's .aux."""
+
+    def __init__(self, jobname: str):
+        self.jobname = jobname
+        self.inputs: list[str] = []
+        self.packages: set[str] = set()
+        self.flags: set[str] = set()
+        self.units: dict[str, list[str]] = {jobname: []}  # aux file stem -> aux lines
+        self.cites: list[tuple[str, int, int]] = []  # key, page, line
+        self.refs: list[tuple[str, int, int]] = []
+        self.labels: dict[str, str] = {}
+        self.toc: list[str] = []
+        self.bookmarks: list[str] = []
+        self.index: list[str] = []
+        self.nomenclature: list[str] = []
+        self.glossary: list[str] = []
+        self.bib_files: list[str] = []
+        self.transcript: list[str] = []  # file and page markers, as TeX writes them to the log
+        self.errors: list[tuple[str, int]] = []  # \errmessage text, line
+        self.chars = 0
+        self.page_breaks = 0
+        self.sections = [0, 0, 0, 0]  # chapter, section, subsection, subsubsection
+        self.equations = 0
+        self.in_equation = False
+        self.current_label = ""
+
+    @property
+    def page(self) -> int:
+        return 1 + self.page_breaks + self.chars // CHARS_PER_PAGE
+
+    def scan(self, path: Path, unit: str):
+        self.inputs.append(path.as_posix())
+        for line_no, raw in enumerate(_read(path).splitlines(), 1):
+            line = COMMENT_PATTERN.sub("", raw)
+            self.chars += len(line)
+            for match in COMMAND_PATTERN.finditer(line):
+                self._command(match["cmd"], match["arg"] or "", unit, line_no, path.parent)
+
+    def _command(self, cmd: str, arg: str, unit: str, line_no: int, base: Path):
+        aux = self.units[unit]
+        if cmd == "input":
+            child = _tex_path(str(base / arg))
+            if child.exists():
+                self.scan(child, unit)
+        elif cmd == "include":
+            child = _tex_path(str(base / arg))
+            if child.exists():
+                stem = child.with_suffix("").as_posix()
+                self.units[stem] = []
+                self.units[self.jobname].append(f"\\@input{{{stem}.aux}}")
+                self.page_breaks += 1
+                first_page = self.page
+                self.transcript.append(f"(./{child.as_posix()}")
+                self.scan(child, stem)
+                markers = [f"[{page}]" for page in range(first_page, self.page + 1)]
+                self.transcript += [" ".join(markers[i:i + 10]) for i in range(0, len(markers), 10)]
+                self.transcript[-1] += ")"
+        elif cmd in ("cite", "nocite"):
+            for key in filter(None, (k.strip() for k in arg.split(","))):
+                self.cites.append((key, self.page, line_no))
+                if "biblatex" in self.packages:
+                    aux.append(f"\\abx@aux@cite{{0}}{{{key}}}")
+                    aux.append(f"\\abx@aux@segm{{0}}{{0}}{{{key}}}")
+                else:
+                    aux.append(f"\\citation{{{key}}}")
+        elif cmd in ("ref", "eqref", "pageref"):
+            self.refs.append((arg, self.page, line_no))
+        elif cmd == "label":
+            anchor = f"equation.{self.equations}" if self.in_equation else self.current_label
+            number = str(self.equations) if self.in_equation else ".".join(str(n) for n in self.sections if n) or "0"
+            value = f"{{{number}}}{{{self.page}}}{{}}{{{anchor}}}{{}}" if "hyperref" in self.packages else f"{{{number}}}{{{self.page}}}"
+            self.labels[arg] = value
+            aux.append(f"\\newlabel{{{arg}}}{{{value}}}")
+        elif cmd in ("chapter", "section", "subsection", "subsubsection"):
+            level = ("chapter", "section", "subsection", "subsubsection").index(cmd)
+            if cmd == "chapter":
+                self.page_breaks += 1
+            self.sections[level] += 1
+            self.sections[level + 1:] = [0] * (3 - level)
+            number = ".".join(str(n) for n in self.sections if n)
+            self.current_label = f"{cmd}.{number}"
+            entry = f"\\contentsline {{{cmd}}}{{\\numberline {{{number}}}{arg}}}{{{self.page}}}{{{self.current_label}}}%"
+            aux.append(f"\\@writefile{{toc}}{{{entry}}}")
+            self.toc.append(entry)
+            self.bookmarks.append(f"\\BOOKMARK [{level + 1}][-]{{{self.current_label}}}{{{arg}}}{{}}% {len(self.bookmarks) + 1}")
+        elif cmd == "begin" and arg in ("equation", "align"):
+            self.in_equation = True
+            self.equations += 1
+        elif cmd == "end" and arg in ("equation", "align"):
+            self.in_equation = False
+        elif cmd in ("newpage", "clearpage"):
+            self.page_breaks += 1
+        elif cmd == "usepackage":
+            self.packages.update(p.strip() for p in arg.split(","))
+        elif cmd in ("addbibresource", "bibliography"):
+            self.bib_files += [b.strip() for b in arg.split(",") if b.strip()]
+            if cmd == "bibliography":
+                aux.append(f"\\bibdata{{{arg}}}")
+        elif cmd == "bibliographystyle":
+            aux.append(f"\\bibstyle{{{arg}}}")
+        elif cmd == "index":
+            self.index.append(f"\\indexentry{{{arg}}}{{{self.page}}}")
+        elif cmd == "nomenclature":
+            self.nomenclature.append(f"\\nomenclatureentry{{a{arg}@[{{{arg}}}]\\begingroup\\nompageref{{{self.page}}}}}{{{self.page}}}")
+        elif cmd == "errmessage":
+            self.errors.append((arg, line_no))
+        elif cmd in ("gls", "Gls", "glspl"):
+            self.glossary.append(f"\\glossaryentry{{{arg}?\\glossentry{{{arg}}}|setentrycounter[]{{page}}\\glsnumberformat}}{{{self.page}}}")
+        else:
+            self.flags.add(cmd)
+
+
+def previous_labels(jobname: str, out: Path = Path(".")) -> dict[str, str]:
+    labels = {}
+    pending = [out / f"{jobname}.aux"]
+    while pending:
+        content = _read(pending.pop())
+        labels.update((f"{kind}:{name}", value) for kind, name, value in AUX_LABEL_PATTERN.findall(content))
+        pending += [out / child for child in re.findall(r"\\@input\{(.*?)\}", content)]
+    return labels
+
+
+def bbl_keys(jobname: str, out: Path = Path(".")) -> list[str]:
+    return re.findall(r"\\(?:bibitem|entry)\{(.*?)\}", _read(out / f"{jobname}.bbl"))
+
+
+def engine(program: str, args: list[str]) -> int:
+    tex_file = next((a for a in args if a.endswith(".tex")), args[-1] if args else "texput.tex")
+    jobname = Path(tex_file).stem
+    batchmode = "-interaction=batchmode" in args
+    out = Path(next((a.split("=", 1)[1] for a in args if a.startswith("-output-directory=")), "."))
+    outputs, read_back, log = [], [], []
+
+    def gen(name: str) -> Path:
+        """A generated file, in the output directory."""
+        return out / name
+
+    doc = Document(jobname)
+    doc.scan(_tex_path(tex_file), jobname)
+    biblatex = "biblatex" in doc.packages
+    old_labels = previous_labels(jobname, out)
+    if gen(f"{jobname}.aux").exists():
+        read_back.append(gen(f"{jobname}.aux").as_posix())
+    _sleep(engine=True)
+
+    banner = {"xelatex": "XeTeX, Version 3.141592653-2.6-0.999995", "pdflatex": "pdfTeX, Version 3.141592653-2.6-1.40.25",
+              "lualatex": "LuaHBTeX, Version 1.17.0"}[program]
+    log.append(f"This is {banner} (TeX Live 2023) (preloaded format={program} 2023.5.1)  1 JAN 2024 12:00")
+    log.append("entering extended mode")
+    log.append(f"**{tex_file}")
+    log.append(f"({tex_file}")
+    filler = int(os.environ.get("STUB_TEX_LOG_LINES", "300"))
+    packages = sorted(doc.packages) or ["base"]
+    for i in range(filler):
+        package = packages[i % len(packages)]
+        log.append(f"({TEXMF}/{package}/{package}.sty" if i % 3 == 0 else f"\\c@{package}@count{i}=\\count{180 + i % 90}")
+
+    log += doc.transcript
+
+    # bibtex citations resolve through \bibcite in the previous .aux, biblatex ones straight from the .bbl
+    bib_aux = doc.units[jobname]
+    bbl = gen(f"{jobname}.bbl")
+    if doc.bib_files or biblatex:
+        if bbl.exists():
+            read_back.append(bbl.as_posix())
+            keys = bbl_keys(jobname, out)
+            if not biblatex:
+                bib_aux += [f"\\bibcite{{{key}}}{{{n}}}" for n, key in enumerate(keys, 1)]
+            resolved = set(keys) if biblatex else {name.split(":", 1)[1] for name in old_labels if name.startswith("bibcite:")}
+        else:
+            log.append(f"No file {jobname}.bbl.")
+            resolved = set()
+        undefined_cites = [(k, p, n) for k, p, n in doc.cites if k not in resolved and k != "*"]
+        for key, page, line_no in undefined_cites:
+            quote = "'" if biblatex else "`"
+            log.append(f"LaTeX Warning: Citation {quote}{key}' on page {page} undefined on input line {line_no}.")
+        if biblatex:
+            bib_aux.insert(0, "\\abx@aux@refcontext{nty/global//global/global}")
+            datasources = "\n".join(
+                f'  <bcf:datasource type="file" datatype="bibtex" glob="false">{name}</bcf:datasource>' for name in doc.bib_files
+            )
+            citekeys = "\n".join(f'  <bcf:citekey order="{n}" intorder="1">{k}</bcf:citekey>' for n, (k, _p, _l) in enumerate(doc.cites, 1))
+            gen(f"{jobname}.bcf").write_text(
+                f'<?xml version="1.0" encoding="UTF-8"?>\n<bcf:controlfile version="3.10" bltxversion="3.19">\n'
+                f'<bcf:bibdata section="0">\n{datasources}\n</bcf:bibdata>\n<bcf:section number="0">\n{citekeys}\n'
+                "</bcf:section>\n</bcf:controlfile>\n",
+                encoding="utf-8",
+            )
+            outputs.append(gen(f"{jobname}.bcf").as_posix())
+            if undefined_cites or not bbl.exists():
+                log.append(f"Package biblatex Warning: Please (re)run Biber on the file:\n(biblatex)                {jobname}\n(biblatex)                and rerun LaTeX afterwards.")
+    else:
+        undefined_cites = []
+
+    undefined_refs = [(r, p, n) for r, p, n in doc.refs if f"newlabel:{r}" not in old_labels]
+    for ref, page, line_no in undefined_refs:
+        log.append(f"LaTeX Warning: Reference `{ref}' on page {page} undefined on input line {line_no}.")
+
+    def optional_input(suffix: str, needed: bool):
+        if not needed:
+            return
+        if gen(f"{jobname}{suffix}").exists():
+            read_back.append(gen(f"{jobname}{suffix}").as_posix())
+        else:
+            log.append(f"No file {jobname}{suffix}.")
+
+    optional_input(".toc", "tableofcontents" in doc.flags)
+    optional_input(".ind", "printindex" in doc.flags)
+    optional_input(".nls", "printnomenclature" in doc.flags)
+    optional_input(".gls", bool(doc.flags & {"printglossaries", "printglossary"}))
+
+    def write(name: str, text: str):
+        gen(name).write_text(text, encoding="utf-8")
+        outputs.append(gen(name).as_posix())
+
+    if "makeglossaries" in doc.flags:
+        doc.units[jobname][:0] = ["\\@newglossary{main}{glg}{gls}{glo}", f"\\@istfilename{{{jobname}.ist}}", "\\@glsorder{word}"]
+        write(f"{jobname}.glo", "".join(f"{entry}\n" for entry in doc.glossary))
+        write(f"{jobname}.ist", '% makeindex style file created by the glossaries package\nactual \'?\'\nencap \'|\'\nlevel \'!\'\n')
+    if "makeindex" in doc.flags:
+        write(f"{jobname}.idx", "".join(f"{entry}\n" for entry in doc.index))
+    if "makenomenclature" in doc.flags:
+        write(f"{jobname}.nlo", "".join(f"{entry}\n" for entry in doc.nomenclature))
+    if "tableofcontents" in doc.flags:
+        write(f"{jobname}.toc", "".join(f"{entry}\n" for entry in doc.toc))
+    if "hyperref" in doc.packages:
+        write(f"{jobname}.out", "".join(f"{entry}\n" for entry in doc.bookmarks))
+
+    pages = doc.page
+    for stem, lines in doc.units.items():
+        tail = [f"\\gdef \\@abspage@last{{{pages}}}"] if stem == jobname else []
+        write(f"{stem}.aux", "\\relax \n" + "".join(f"{line}\n" for line in lines + tail))
+
+    new_labels = {f"newlabel:{name}": value for name, value in doc.labels.items()}
+    new_labels.update(
+        (f"bibcite:{m[0]}", m[1]) for line in bib_aux for m in re.findall(r"\\bibcite\{(.*?)\}\{(.*?)\}", line)
+    )
+    if new_labels != old_labels and new_labels:
+        log.append("LaTeX Warning: Label(s) may have changed. Rerun to get cross-references right.")
+    if undefined_refs:
+        log.append("LaTeX Warning: There were undefined references.")
+    if undefined_cites and not biblatex:
+        log.append("LaTeX Warning: There were undefined citations.")
+
+    if "-synctex=1" in args:
+        with gzip.open(gen(f"{jobname}.synctex.gz"), "wt", encoding="utf-8") as fobj:
+            fobj.write(f"SyncTeX Version:1\nInput:1:{Path(tex_file).resolve()}\nOutput:pdf\n")
+        outputs.append(gen(f"{jobname}.synctex.gz").as_posix())
+    if "-no-pdf" in args:
+        result = gen(f"{jobname}.xdv")
+        result.write_text(f"STUBXDV pages={pages}\n", encoding="ascii")
+    else:
+        result = gen(f"{jobname}.pdf")
+        result.write_bytes(minimal_pdf(pages))
+    outputs.append(result.as_posix())
+    log.append(f"Output written on {result.as_posix()} ({pages} page{'s' if pages > 1 else ''}, {result.stat().st_size} bytes).")
+    for message, line_no in doc.errors:
+        log.append(f"! {message}.\nl.{line_no} \\errmessage{{{message}}}")
+    log.append(f"Transcript written on {gen(f'{jobname}.log').as_posix()}.")
+    write(f"{jobname}.log", "\n".join(log) + "\n")
+
+    if "-recorder" in args:
+        records = [f"PWD {Path.cwd().as_posix()}"]
+        records += [f"INPUT {TEXMF}/{package}/{package}.sty" for package in packages]
+        records += [f"INPUT {name}" for name in doc.inputs + read_back]
+        records += [f"OUTPUT {name}" for name in outputs + [gen(f"{jobname}.log").as_posix()]]
+        gen(f"{jobname}.fls").write_text("\n".join(records) + "\n", encoding="utf-8")
+
+    if not batchmode:
+        print("\n".join(log[1:]))
+    return 1 if doc.errors else 0
+
+
+def _bib_entries(names: list[str]) -> dict[str, str]:
+    entries = {}
+    for name in names:
+        path = Path(name if name.endswith(".bib") else f"{name}.bib")
+        entries.update((key, kind) for kind, key in BIB_ENTRY_PATTERN.findall(_read(path)))
+    return entries
+
+
+def biber(args: list[str]):
+    jobname = Path([a for a in args if not a.startswith("-")][-1]).with_suffix("").name
+    control = _read(Path(f"{jobname}.bcf"))
+    entries = _bib_entries(re.findall(r"<bcf:datasource[^>]*>\s*(.*?)\s*</bcf:datasource>", control))
+    keys = list(dict.fromkeys(re.findall(r"<bcf:citekey[^>]*>(.*?)</bcf:citekey>", control)))
+    _sleep(engine=False)
+    found = [key for key in keys if key in entries]
+    body = "".join(f"    \\entry{{{key}}}{{{entries[key]}}}{{}}{{}}\n    \\endentry\n" for key in found)
+    Path(f"{jobname}.bbl").write_text(
+        f"\\refsection{{0}}\n  \\datalist[entry]{{nty/global//global/global}}\n{body}  \\enddatalist\n\\endrefsection\n",
+        encoding="utf-8",
+    )
+    blg = [f"[0] Config.pm:307> INFO - This is Biber 2.19", f"[1] Biber.pm:420> INFO - Reading '{jobname}.bcf'"]
+    blg += [f"[2] Biber.pm:1338> WARN - I didn't find a database entry for '{key}' (section 0)" for key in keys if key not in entries]
+    blg.append(f"[3] bbl.pm:676> INFO - Writing '{jobname}.bbl' with encoding 'UTF-8'")
+    Path(f"{jobname}.blg").write_text("\n".join(blg) + "\n", encoding="utf-8")
+    if "-quiet" not in args:
+        print("\n".join(f"INFO - {line.split('INFO - ', 1)[-1]}" for line in blg))
+
+
+def bibtex(args: list[str]):
+    jobname = Path(args[-1]).with_suffix("").name
+    keys, databases, pending = [], [], [Path(f"{jobname}.aux")]
+    while pending:
+        content = _read(pending.pop(0))
+        keys += re.findall(r"\\citation\{(.*?)\}", content)
+        databases += [d for data in re.findall(r"\\bibdata\{(.*?)\}", content) for d in data.split(",")]
+        pending += [Path(child) for child in re.findall(r"\\@input\{(.*?)\}", content)]
+    entries = _bib_entries(databases)
+    _sleep(engine=False)
+    keys = list(entries) if "*" in keys else list(dict.fromkeys(keys))
+    found = [key for key in keys if key in entries]
+    items = "".join(f"\\bibitem{{{key}}}\nEntry {key}.\n\n" for key in found)
+    Path(f"{jobname}.bbl").write_text(f"\\begin{{thebibliography}}{{{len(found)}}}\n\n{items}\\end{{thebibliography}}\n", encoding="utf-8")
+    blg = ["This is BibTeX, Version 0.99d (TeX Live 2023)", f"The top-level auxiliary file: {jobname}.aux"]
+    blg += [f"Database file #{n}: {name}" for n, name in enumerate(databases, 1)]
+    blg += [f'Warning--I didn\'t find a database entry for "{key}"' for key in keys if key not in entries]
+    Path(f"{jobname}.blg").write_text("\n".join(blg) + "\n", encoding="utf-8")
+    print("\n".join(blg))
+
+
+def makeindex(args: list[str]):
+    options, rest = {}, []
+    it = iter(args)
+    for arg in it:
+        if arg in ("-s", "-o", "-t", "-p"):
+            options[arg] = next(it, "")
+        elif not arg.startswith("-"):
+            rest.append(arg)
+    source = Path(rest[-1])
+    output = Path(options.get("-o", source.with_suffix(".ind")))
+    entries = sorted(set(_read(source).splitlines()))
+    _sleep(engine=False)
+    items = "".join(f"  \\item {line}\n" for line in entries)
+    output.write_text(f"\\begin{{theindex}}\n\n{items}\n\\end{{theindex}}\n", encoding="utf-8")
+    ilg = [
+        "This is makeindex, version 2.17 [TeX Live 2023] (kpathsea + Thai support).",
+        f"Scanning style file {options['-s']}...done." if "-s" in options else "",
+        f"Scanning input file {source}....done ({len(entries)} entries accepted, 0 rejected).",
+        f"Generating output file {output}....done ({len(entries) + 3} lines written, 0 warnings).",
+    ]
+    Path(options.get("-t", source.with_suffix(".ilg"))).write_text("\n".join(filter(None, ilg)) + "\n", encoding="utf-8")
+    print("\n".join(filter(None, ilg)), file=sys.stderr)
+
+
+def dvipdfmx(args: list[str]):
+    names = [a for a, prev in zip(args, [""] + args) if not a.startswith("-") and prev not in ("-V", "-o")]
+    xdv = Path(names[-1] if names[-1].endswith(".xdv") else f"{names[-1]}.xdv")
+    pdf = Path(args[args.index("-o") + 1]) if "-o" in args else Path(f"{xdv.stem}.pdf")
+    match = re.search(r"pages=(\d+)", _read(xdv))
+    _sleep(engine=False)
+    pdf.write_bytes(minimal_pdf(int(match.group(1)) if match else 1))
+    if "-q" not in args:
+        print(f"{xdv} -> {pdf}\n[1]\n{pdf.stat().st_size} bytes written")
+
+
+def install(bin_dir: Path) -> Path:
+    """Write one executable wrapper per tool name into bin_dir; prepend bin_dir to PATH to use them."""
+    bin_dir.mkdir(parents=True, exist_ok=True)
+    for tool in TOOLS:
+        wrapper = bin_dir / tool
+        wrapper.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{Path(__file__).resolve()}" {tool} "$@"\n', encoding="utf-8")
+        wrapper.chmod(0o755)
+    return bin_dir
+
+
+def main(argv: list[str]) -> int:
+    if not argv or argv[0] not in TOOLS:
+        print(__doc__, file=sys.stderr)
+        return 2
+    tool, args = argv[0], argv[1:]
+    if tool in ENGINES:
+        return engine(tool, args)
+    {"biber": biber, "bibtex": bibtex, "makeindex": makeindex, "dvipdfmx": dvipdfmx}[tool](args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
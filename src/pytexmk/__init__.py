@@ -43,7 +43,7 @@ def __getattr__(name):
         mod = importlib.import_module(f".cli.{name}", __name__)
         return mod
     if name == "main":
-        from .cli.__main__ import main
+        from .cli.client import main
 
         return main
     raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,144 @@
+"""辅助文件快照：每轮检测只读取并解析一次主 .aux 及其 \\@input 引入的全部子 .aux 文件。
+
+每个文件逐行流式读取，规范化、命令提取（组合分词器一次匹配）与摘要计算在同一遍中完成，
+不在内存中保留文件内容，数百 MB 的 .aux 也只占用与单行长度相关的内存。
+解析结果（引用计数、\\bibdata、词汇表声明、交叉引用标签、规范化摘要）由 CompilationDetector 的各检测维度共享，
+避免同一轮检测中多次打开、读取同一批辅助文件。
+"""
+import hashlib
+import re
+from collections import defaultdict
+from pathlib import Path
+
+# 单一组合分词器：在行首一次匹配识别全部需要提取的辅助文件命令
+AUX_TOKEN_PATTERN = re.compile(
+    r"\\(?:"
+    r"abx@aux@cite\{.*?\}\{(?P<biber_cite>.*)\}"
+    r"|citation\{(?P<citation>.*)\}"
+    r"|bibcite\{(?P<bibcite>.*?)\}"
+    r"|newlabel\{(?P<label>.*?)\}\{(?P<label_value>.*)\}"
+    r"|@newglossary\{(?P<gls_name>.*)\}\{.*\}\{(?P<gls_out>.*)\}\{(?P<gls_in>.*)\}"
+    r"|@input\{(?P<input>.*?\.aux)\}"
+    r"|bibdata\{(?P<bibdata>.*)\}"
+    r"|(?P<refcontext>abx@aux@refcontext)"
+    r")"
+)
+
+# 与编译结果无关、不参与变化判定的行
+IGNORED_LINE_PATTERN = re.compile(
+    r"\\relax(?:\{\})?"
+    r"|\\bookmarksetup\{.*\}"
+    r"|\\@outlinefile\s*\{.*\}"
+    r"|\\[gx]def\s*\\@abspage@last\{.*\}"
+    r"|\\global\\\@namedef\{ver@.*\}\{.*\}"
+)
+
+
+def _strip_comment(line: str) -> str:
+    """去除未转义的 % 及其后的注释。"""
+    idx = line.find("%")
+    while idx > 0 and line[idx - 1] == "\\":
+        idx = line.find("%", idx + 1)
+    return line if idx < 0 else line[:idx].rstrip()
+
+
+def iter_normalized_lines(lines):
+    """逐行去除空行、注释、\relax 以及书签 / 总页数等与编译结果无关的行（不缓存整个文件）。"""
+    for raw_line in lines:
+        line = raw_line.strip()
+        if not line or line[0] == "%":
+            continue
+        if "%" in line:
+            line = _strip_comment(line)
+            if not line:
+                continue
+        if IGNORED_LINE_PATTERN.fullmatch(line):
+            continue
+        yield line
+
+
+def normalize_aux_like(content: str) -> str:
+    """规范化 .aux / .out 内容（见 iter_normalized_lines），用于变化判定。"""
+    return "\n".join(iter_normalized_lines(content.splitlines()))
+
+
+class AuxSnapshot:
+    """一轮检测中主 .aux 与子 .aux 的解析结果。
+
+    citations 以文件名为键记录各文件的引用计数（\\abx@aux@cite / \\citation / \\bibcite），
+    file_digests 记录各文件规范化内容的摘要，digest 为全部文件的合并摘要。
+    """
+
+    def __init__(self, main_aux: str):
+        self.main_aux = main_aux
+        self.exists = False
+        self.citations: dict[str, defaultdict[str, int]] = {}
+        self.biber = False  # 存在 \abx@aux@refcontext（biblatex + biber）
+        self.bibdata: str | None = None  # \bibdata 的参数（BibTeX）
+        self.bibcite = False  # 存在 \bibcite（thebibliography 环境）
+        self.glossaries: list[tuple[str, str, str]] = []  # \@newglossary 的 (名称, 输出后缀, 输入后缀)
+        self.labels: dict[str, str] = {}
+        self.file_digests: dict[str, str] = {}
+        self.digest = ""
+        self.missing: list[str] = []  # 被 \@input 引入但不存在或无法读取的子 .aux 文件
+
+    @classmethod
+    def read(cls, main_aux: str, fallback_dir: str | None = None, base_dir: str = ".") -> "AuxSnapshot":
+        """读取主 .aux（base_dir 中不存在时从 fallback_dir 读取）及其引入的子 .aux 文件。"""
+        snapshot = cls(main_aux)
+        base = Path(base_dir)
+        if not (base / main_aux).exists() and fallback_dir is not None and (Path(fallback_dir) / main_aux).exists():
+            base = Path(fallback_dir)
+        pending = [main_aux]
+        seen = set()
+        while pending:
+            file_name = pending.pop(0)
+            if file_name in seen:
+                continue
+            seen.add(file_name)
+            try:
+                pending.extend(snapshot._parse_file(file_name, base / file_name))
+            except OSError:
+                if file_name != main_aux:
+                    snapshot.missing.append(file_name)
+                continue
+            if file_name == main_aux:
+                snapshot.exists = True
+
+        combined = hashlib.sha256()
+        for file_name, digest in snapshot.file_digests.items():
+            combined.update(f"{file_name}\0{digest}\n".encode("utf-8"))
+        snapshot.digest = combined.hexdigest() if snapshot.exists else ""
+        return snapshot
+
+    def _parse_file(self, file_name: str, path: Path) -> list[str]:
+        """流式解析单个 .aux 文件：逐行完成命令提取与规范化摘要，内存占用与文件大小无关。返回引入的子 .aux 文件。"""
+        counter = defaultdict(int)
+        children = []
+        hasher = hashlib.sha256()
+        separator = b""
+        with open(path, "r", encoding="utf-8", errors="replace") as fobj:
+            for line in iter_normalized_lines(fobj):
+                hasher.update(separator + line.encode("utf-8"))
+                separator = b"\n"
+                match = AUX_TOKEN_PATTERN.match(line)
+                if match is None:
+                    continue
+                kind = match.lastgroup
+                if kind in ("biber_cite", "citation", "bibcite"):
+                    counter[match.group(kind)] += 1
+                    self.bibcite = self.bibcite or kind == "bibcite"
+                elif kind == "label_value":
+                    self.labels[match.group("label")] = match.group("label_value")
+                elif kind == "gls_in":
+                    self.glossaries.append((match.group("gls_name"), match.group("gls_out"), match.group("gls_in")))
+                elif kind == "input":
+                    children.append(match.group("input"))
+                elif kind == "bibdata":
+                    if self.bibdata is None:
+                        self.bibdata = match.group("bibdata")
+                elif kind == "refcontext":
+                    self.biber = True
+        self.citations[file_name] = counter
+        self.file_digests[file_name] = hasher.hexdigest()
+        return children
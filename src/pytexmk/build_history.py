@@ -0,0 +1,176 @@
+"""编译历史记录：将每次编译的各阶段耗时、LaTeX 编译次数、每轮检测结果、编译程序与结果保存到用户缓存目录下的
+SQLite 数据库，供 `pytexmk stats` 统计各阶段耗时分布并提示相对近期基线变慢的阶段。
+"""
+import logging
+import os
+import sqlite3
+import statistics
+import time
+from collections import Counter
+from pathlib import Path
+
+from platformdirs import user_cache_dir
+
+from pytexmk.language import set_language
+from pytexmk.version import script_name
+
+_ = set_language("build_history")
+
+HISTORY_FILE = "build_history.sqlite3"
+DIMENSIONS = ("bib", "idx", "toc", "aux", "out", "log")
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    cwd TEXT NOT NULL,
+    project TEXT NOT NULL,
+    engine TEXT NOT NULL,
+    status TEXT NOT NULL,
+    total_s REAL NOT NULL,
+    passes INTEGER NOT NULL,
+    version TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS stages (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    seconds REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rounds (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    round INTEGER NOT NULL,
+    bib INTEGER, idx INTEGER, toc INTEGER, aux INTEGER, out INTEGER, log INTEGER
+);
+CREATE INDEX IF NOT EXISTS runs_project ON runs(cwd, project);
+CREATE INDEX IF NOT EXISTS stages_run ON stages(run_id);
+"""
+
+
+def history_path() -> Path:
+    return Path(user_cache_dir(script_name, ensure_exists=True)) / HISTORY_FILE
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """最近秩法百分位数。"""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+class BuildHistory:
+    """编译历史数据库：每次编译一条 runs 记录，附带各阶段耗时（stages）与每轮检测结果（rounds）。"""
+
+    def __init__(self, path: str | Path | None = None):
+        self.logger = logging.getLogger(__name__)
+        self.path = Path(path) if path is not None else history_path()
+
+    def _connect(self) -> sqlite3.Connection:
+        # -a 模式下多个进程同时写入，等待锁释放而不是立即报错
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.executescript(SCHEMA)
+        return conn
+
+    def record(
+        self,
+        project: str,
+        engine: str,
+        status: str,
+        total_s: float,
+        stage_times: dict[str, float],
+        rounds: list[dict[str, int]],
+        version: str,
+    ):
+        """保存一次编译（status 为 "ok" / "failed"）；写入失败只记录警告，不影响编译结果。"""
+        try:
+            with self._connect() as conn:
+                run_id = conn.execute(
+                    "INSERT INTO runs (started_at, cwd, project, engine, status, total_s, passes, version)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (time.time() - total_s, os.getcwd(), project, engine, status, total_s, len(rounds), version),
+                ).lastrowid
+                conn.executemany(
+                    "INSERT INTO stages (run_id, name, seconds) VALUES (?, ?, ?)",
+                    [(run_id, name, seconds) for name, seconds in stage_times.items() if isinstance(seconds, float | int)],
+                )
+                conn.executemany(
+                    "INSERT INTO rounds (run_id, round, bib, idx, toc, aux, out, log) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(run_id, i + 1, *(dims.get(dim, 0) for dim in DIMENSIONS)) for i, dims in enumerate(rounds)],
+                )
+            conn.close()
+        except sqlite3.Error as e:
+            self.logger.warning(_("保存编译历史记录失败: ") + f"{self.path} --> {e}")
+
+    def runs(self, project: str | None = None, limit: int = 50) -> list[dict]:
+        """当前目录下（可指定主文件）最近 limit 次编译，按时间先后排列，每项含 stages 与 rounds。"""
+        if not self.path.exists():
+            return []
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        try:
+            query = "SELECT * FROM runs WHERE cwd = ?"
+            params: list = [os.getcwd()]
+            if project:
+                query += " AND project = ?"
+                params.append(project)
+            rows = conn.execute(query + " ORDER BY id DESC LIMIT ?", (*params, limit)).fetchall()
+            runs = []
+            for row in reversed(rows):
+                run = dict(row)
+                run["stages"] = dict(conn.execute("SELECT name, seconds FROM stages WHERE run_id = ?", (row["id"],)).fetchall())
+                run["rounds"] = [
+                    dict(zip(DIMENSIONS, dims))
+                    for dims in conn.execute(
+                        "SELECT bib, idx, toc, aux, out, log FROM rounds WHERE run_id = ? ORDER BY round", (row["id"],)
+                    ).fetchall()
+                ]
+                runs.append(run)
+            return runs
+        finally:
+            conn.close()
+
+
+def stage_statistics(runs: list[dict]) -> dict[str, dict]:
+    """各阶段耗时的样本数、p50、p95 与最近一次的耗时（只统计成功的编译）。"""
+    samples: dict[str, list[float]] = {}
+    for run in runs:
+        if run["status"] != "ok":
+            continue
+        for name, seconds in run["stages"].items():
+            samples.setdefault(name, []).append(seconds)
+        samples.setdefault("total", []).append(run["total_s"])
+    return {
+        name: {"count": len(values), "p50": percentile(values, 50), "p95": percentile(values, 95), "last": values[-1]}
+        for name, values in samples.items()
+    }
+
+
+def pass_distribution(runs: list[dict]) -> Counter:
+    """LaTeX 编译次数的分布 {次数: 编译次数}。"""
+    return Counter(run["passes"] for run in runs if run["status"] == "ok")
+
+
+def regressions(
+    runs: list[dict], window: int = 10, threshold: float = 0.2, min_seconds: float = 0.05
+) -> list[tuple[str, float, float]]:
+    """最近一次成功编译中相对滚动基线（此前至多 window 次成功编译的中位数）变慢超过 threshold 的阶段。
+
+    返回 [(阶段名, 基线耗时, 最近耗时)]；基线少于 3 个样本或差值小于 min_seconds 的阶段不提示。
+    """
+    ok_runs = [run for run in runs if run["status"] == "ok"]
+    if len(ok_runs) < 2:
+        return []
+    latest, previous = ok_runs[-1], ok_runs[:-1][-window:]
+    latest_times = {**latest["stages"], "total": latest["total_s"]}
+    alerts = []
+    for name, seconds in latest_times.items():
+        baseline_samples = [
+            run["total_s"] if name == "total" else run["stages"][name]
+            for run in previous
+            if name == "total" or name in run["stages"]
+        ]
+        if len(baseline_samples) < 3:
+            continue
+        baseline = statistics.median(baseline_samples)
+        if seconds - baseline >= min_seconds and seconds > baseline * (1 + threshold):
+            alerts.append((name, baseline, seconds))
+    return alerts
@@ -0,0 +1,156 @@
+"""编译产物清单：记录编译中各工具创建的文件，清除与移动辅助文件时按清单逐个处理，不再按后缀遍历目录树。
+
+清单以「阶段 → 创建的文件」的形式保存在辅助目录下的 <主文件名>.manifest.json 中（与编译状态记录、依赖图同目录），
+文件来源有两个：
+  1. LaTeX 引擎 -recorder 生成的 .fls 中的 OUTPUT 文件；
+  2. 每个外部程序运行前后其写出目录（根目录 / 生成文件目录）列表的差异，覆盖 .fls 不记录的文件，
+     如 shell-escape 调用的外部程序（minted、gnuplottex 等）生成的文件与目录。
+     差异中只记录名称为 <主文件名>.* / <主文件名>-* 的条目（main.pyg、main-figure0.pdf、_minted-main/ 等，源文件除外）：
+     同一时刻出现的其他文件（用户保存的文件、-a 模式下其他主文件的生成文件）无法判断来源，不记录；
+     输出目录与辅助目录本身也从不记录。
+路径为相对所在目录的 posix 路径（与依赖图一致），新建的目录以 "/" 结尾记录。清单在多次编译间累积，清除后删除。
+"""
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from pytexmk.language import set_language
+
+_ = set_language("build_manifest")
+
+MANIFEST_SUFFIX = ".manifest.json"
+MANIFEST_FORMAT = 1
+# 由用户编写、不会由编译工具生成的源文件后缀，从不记录到清单
+SOURCE_SUFFIXES = {".tex", ".bib", ".sty", ".cls", ".bst", ".dtx", ".ins"}
+
+
+def list_dir(folder: str | Path) -> set[str]:
+    """列出目录中的条目（不递归），目录名以 "/" 结尾；目录不存在时返回空集合。"""
+    entries = set()
+    try:
+        with os.scandir(folder) as it:
+            for entry in it:
+                try:
+                    entries.add(f"{entry.name}/" if entry.is_dir(follow_symlinks=False) else entry.name)
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return entries
+
+
+def owned_name(project_name: str, name: str) -> bool:
+    """目录差异中的条目能否归属于该主文件：<主文件名>.*、<主文件名>-* 或 minted 的 _minted-<主文件名>/ 目录。
+
+    源文件（.tex / .bib / .sty 等）即使以主文件名开头也不归属，编译期间保存的 paper-notes.tex 之类不会被记录后清除。
+    """
+    name = name.rstrip("/")
+    if Path(name).suffix.lower() in SOURCE_SUFFIXES:
+        return False
+    return name == f"_minted-{project_name}" or name.startswith((f"{project_name}.", f"{project_name}-"))
+
+
+def _expand_dir(folder: Path, name: str) -> list[str]:
+    """新建目录及其中的全部文件与子目录（目录以 "/" 结尾）。"""
+    paths = [name]
+    for current, dirs, files in os.walk(folder / name):
+        prefix = Path(current).relative_to(folder).as_posix()
+        paths.extend(f"{prefix}/{d}/" for d in dirs)
+        paths.extend(f"{prefix}/{f}" for f in files)
+    return paths
+
+
+class BuildManifest:
+    """编译产物清单：stage 名称（xelatex / biber / glossaries main / dvipdfmx …）→ 该阶段创建的文件与目录。"""
+
+    def __init__(self, project_name: str):
+        self.logger = logging.getLogger(__name__)
+        self.project_name = project_name
+        self.stages: dict[str, list[str]] = {}
+        self._lock = threading.Lock()  # 文献 / 索引阶段可能并发记录
+
+    @staticmethod
+    def manifest_path(project_name: str, auxdir: str) -> Path:
+        return Path(auxdir) / f"{project_name}{MANIFEST_SUFFIX}"
+
+    def record(self, stage: str, paths: list[str]):
+        """将文件并入某一阶段的记录（保留以前编译记录的文件）。"""
+        with self._lock:
+            self.stages[stage] = list(dict.fromkeys(self.stages.get(stage, []) + list(paths)))
+
+    @contextmanager
+    def track(self, stage: str, folders: list[str], reserved: list[str] | None = None):
+        """记录 with 块中（一个外部程序运行期间）各目录新出现、归属于该主文件的文件与目录，程序失败时同样记录。
+
+        reserved 中的名称（输出目录、辅助目录）即使在运行期间新建也不记录。
+        """
+        before = {folder: list_dir(folder) for folder in folders}
+        skipped = set(reserved or [])
+        try:
+            yield
+        finally:
+            for folder, names in before.items():
+                created = []
+                for name in sorted(list_dir(folder) - names):
+                    if name.rstrip("/") in skipped or not owned_name(self.project_name, name):
+                        continue
+                    created.extend(_expand_dir(Path(folder), name) if name.endswith("/") else [name])
+                if created:
+                    self.record(stage, created)
+
+    def files(self, exclude: list[str] | None = None) -> list[str]:
+        """清单中的文件（不含目录），exclude 中的文件（通常为输出结果文件）除外。"""
+        excluded = set(exclude or [])
+        return [
+            f for stage in self.stages.values() for f in stage
+            if not f.endswith("/") and f not in excluded and not Path(f).is_absolute()
+        ]
+
+    def dirs(self) -> list[str]:
+        """清单中新建的目录，子目录在前（按此顺序删除空目录）。"""
+        dirs = {f.rstrip("/") for stage in self.stages.values() for f in stage if f.endswith("/")}
+        return sorted(dirs, key=lambda d: d.count("/"), reverse=True)
+
+    def save(self, auxdir: str):
+        manifest_path = self.manifest_path(self.project_name, auxdir)
+        data = {"format": MANIFEST_FORMAT, "project": self.project_name, "stages": self.stages}
+        try:
+            manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(manifest_path, "w", encoding="utf-8") as fobj:
+                json.dump(data, fobj, ensure_ascii=False, indent=1)
+            self.logger.info(_("已保存编译产物清单: ") + str(manifest_path))
+        except OSError as e:
+            self.logger.error(_("保存编译产物清单失败: ") + f"{manifest_path} --> {e}")
+
+    @classmethod
+    def load(cls, project_name: str, auxdir: str) -> "BuildManifest | None":
+        """读取辅助目录中的编译产物清单，不存在或格式不符时返回 None。"""
+        manifest_path = cls.manifest_path(project_name, auxdir)
+        if not manifest_path.exists():
+            return None
+        manifest = cls(project_name)
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as fobj:
+                data = json.load(fobj)
+        except (OSError, ValueError) as e:
+            manifest.logger.warning(_("读取编译产物清单失败: ") + f"{manifest_path} --> {e}")
+            return None
+        if data.get("format") != MANIFEST_FORMAT:
+            return None
+        manifest.stages = {stage: list(paths) for stage, paths in data.get("stages", {}).items()}
+        return manifest
+
+    @classmethod
+    def find_all(cls, auxdir: str) -> list[tuple["BuildManifest", str]]:
+        """辅助目录（及 -a 模式下各主文件的子辅助目录）中的全部清单，返回 (清单, 其生成文件目录)。"""
+        found = []
+        paths = [*sorted(Path(auxdir).glob(f"*{MANIFEST_SUFFIX}")), *sorted(Path(auxdir).glob(f"*/*{MANIFEST_SUFFIX}"))]
+        for manifest_path in paths:
+            project_name = manifest_path.name[: -len(MANIFEST_SUFFIX)]
+            manifest = cls.load(project_name, str(manifest_path.parent))
+            if manifest is not None:
+                found.append((manifest, str(manifest_path.parent)))
+        return found
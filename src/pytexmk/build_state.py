@@ -0,0 +1,139 @@
+"""编译状态记录：保存上次成功编译时各输入文件的内容摘要，源文件未变化时跳过编译。"""
+import hashlib
+import json
+import logging
+from pathlib import Path
+
+from pytexmk.language import set_language
+
+_ = set_language("build_state")
+
+STATE_SUFFIX = ".build_state.json"
+STATE_FORMAT = 1
+
+
+def file_digest(path: Path) -> str:
+    """计算文件内容的 SHA-256 摘要。"""
+    with open(path, "rb") as fobj:
+        return hashlib.file_digest(fobj, "sha256").hexdigest()
+
+
+def _same_stat(entry: dict, other: dict) -> bool:
+    return entry["size"] == other["size"] and entry["mtime_ns"] == other["mtime_ns"]
+
+
+class BuildStateManager:
+    """编译状态管理器：读写辅助目录下的 <主文件名>.build_state.json。
+
+    记录内容：编译选项（引擎、草稿模式、目录等）+ 每个输入文件的 size / mtime_ns / sha256。
+    判定时先比较 size 与 mtime_ns，不一致才重新计算摘要，因此仅被 touch 的文件不会触发重新编译。
+    记录摘要时同样沿用上次记录中 size / mtime_ns 未变的摘要，只对变化的文件计算；
+    项目外的绝对路径（TeX 发行版中的宏包、类文件、字体）只记录 size 与 mtime_ns，不计算摘要（与 format_cache 一致）。
+    """
+
+    def __init__(self, project_name: str, auxdir: str, outdir: str):
+        self.logger = logging.getLogger(__name__)
+        self.project_name = project_name
+        self.outdir = Path(outdir)
+        self.state_path = Path(auxdir) / f"{project_name}{STATE_SUFFIX}"
+        self._state: dict | None = None  # load() 读取的上次记录，snapshot() 沿用其中的摘要
+
+    @staticmethod
+    def _file_entry(path: str, previous: dict | None = None) -> dict | None:
+        """文件的 size / mtime_ns / sha256；previous 的 size 与 mtime_ns 与当前一致时沿用其摘要，绝对路径不计算摘要。"""
+        file_path = Path(path)
+        try:
+            stat = file_path.stat()
+            entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+            if file_path.is_absolute():
+                return entry
+            if previous is not None and "sha256" in previous and _same_stat(previous, entry):
+                entry["sha256"] = previous["sha256"]
+            else:
+                entry["sha256"] = file_digest(file_path)
+            return entry
+        except OSError:
+            return None
+
+    def _entry_matches(self, path: str, entry: dict | None) -> bool:
+        file_path = Path(path)
+        if entry is None:
+            return not file_path.exists()
+        try:
+            stat = file_path.stat()
+        except OSError:
+            return False
+        if stat.st_size != entry["size"]:
+            return False
+        if stat.st_mtime_ns == entry["mtime_ns"]:
+            return True
+        if "sha256" not in entry:
+            return False
+        try:
+            return file_digest(file_path) == entry["sha256"]
+        except OSError:
+            return False
+
+    def snapshot(self, files: list[str]) -> dict[str, dict | None]:
+        """记录输入文件当前的摘要（编译开始前调用），上次记录以来未变化的文件不重新计算。"""
+        previous = (self._state if self._state is not None else self.load() or {}).get("inputs", {})
+        return {path: self._file_entry(path, previous.get(path)) for path in files}
+
+    def load(self) -> dict | None:
+        self._state = None
+        if not self.state_path.exists():
+            return None
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as fobj:
+                state = json.load(fobj)
+        except (OSError, ValueError) as e:
+            self.logger.warning(_("读取编译状态记录失败: ") + f"{self.state_path} --> {e}")
+            return None
+        if state.get("format") != STATE_FORMAT:
+            return None
+        self._state = state
+        return state
+
+    def is_up_to_date(self, options: dict, out_files: list[str]) -> bool:
+        """判断上次成功编译后输入文件、编译选项与输出文件是否均未变化。"""
+        state = self.load()
+        if state is None:
+            self.logger.info(_("未找到编译状态记录, 需要编译"))
+            return False
+        if state.get("options") != options:
+            self.logger.info(_("编译选项发生变化, 需要编译"))
+            return False
+        for out_file in out_files:
+            if not (self.outdir / out_file).exists():
+                self.logger.info(_("输出文件不存在, 需要编译: ") + out_file)
+                return False
+        for path, entry in state.get("inputs", {}).items():
+            if not self._entry_matches(path, entry):
+                self.logger.info(_("输入文件发生变化, 需要编译: ") + path)
+                return False
+        return True
+
+    def save(self, options: dict, input_snapshot: dict[str, dict | None]):
+        """编译成功后写入状态记录。
+
+        编译期间未变化的文件直接使用 snapshot() 的记录；被修改过的文件保留编译前的摘要，
+        下一次运行时会因摘要不一致而重新编译。
+        """
+        inputs = {}
+        for path, entry in input_snapshot.items():
+            current = self._file_entry(path, entry)
+            if entry is None or current is None:
+                inputs[path] = entry
+            elif "sha256" in entry:
+                inputs[path] = current if current["sha256"] == entry["sha256"] else entry
+            else:
+                inputs[path] = current if _same_stat(current, entry) else entry
+
+        state = {"format": STATE_FORMAT, "options": options, "inputs": inputs}
+        try:
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.state_path, "w", encoding="utf-8") as fobj:
+                json.dump(state, fobj, ensure_ascii=False, indent=1)
+            self.logger.info(_("已保存编译状态记录: ") + str(self.state_path))
+        except OSError as e:
+            self.logger.error(_("保存编译状态记录失败: ") + f"{self.state_path} --> {e}")
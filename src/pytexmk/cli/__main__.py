@@ -93,16 +93,41 @@ if sys.platform == "win32":
         # 兜底：任何异常都不能阻止程序启动
         pass
 
-from pytexmk.cli.check_version import UpdateChecker
 from pytexmk.cli.cli_args import parse_args
 from pytexmk.language import set_language
 
-UC = UpdateChecker(1, 6)
 _ = set_language("__main__")
 
 
+def update_checker():
+    """按需构造版本检查器：check_version 会导入 packaging 等模块，启动时不加载；配置关闭检查时返回 None。"""
+    from pytexmk.config import ConfigParser
+
+    if not ConfigParser().update_check_enabled():
+        return None
+    from pytexmk.cli.check_version import UpdateChecker
+
+    return UpdateChecker(1, 6)
+
+
 def main():
-    args = parse_args(UC)
+    # 子命令：pytexmk stats（编译名为 stats 的主文件请写作 stats.tex）
+    if sys.argv[1:2] == ["stats"]:
+        from pytexmk.cli.cli_stats import run_stats
+
+        run_stats(sys.argv[2:])
+        return
+
+    args = parse_args(update_checker)
+    if args.daemon or args.daemon_stop:
+        from pytexmk.cli.daemon import serve, stop_daemon
+
+        if args.daemon:
+            serve()
+        else:
+            stop_daemon()
+        return
+
     from pytexmk.cli.cli_workflow import run_workflow
 
     run_workflow(args)
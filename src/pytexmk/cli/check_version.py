@@ -26,13 +26,13 @@ Description  :
 
 import json
 import logging
+import os
+import threading
 import time
 import tomllib
-import urllib.request
 from datetime import timedelta
 from pathlib import Path
 
-import tomli_w
 from packaging import version
 from platformdirs import user_cache_dir
 from rich import print
@@ -43,25 +43,26 @@ from ..version import __version__, script_name
 _ = set_language("check_version")
 
 API_URL = f"https://api.github.com/repos/YanMing-lxb/{script_name}/releases/latest"
+UPDATE_CHECK_DEADLINE = 0.3  # 运行结束时等待后台版本检查的最长时间（秒）
 
 
 class UpdateChecker:
     """版本检查器：GitHub API 查询、缓存读写、新版本提示。"""
-    def __init__(self, time_out, cache_time):
+    def __init__(self, time_out, cache_time, api_url=API_URL):
         """
         初始化 CheckVersion 类的实例。
 
         参数:
         time_out (int): 超时时间，单位为秒。
         cache_time (int): 缓存时间，单位为小时。
+        api_url (str): 查询最新版本的 GitHub API 地址。
 
         行为逻辑:
         1. 创建日志对象。
         2. 初始化版本列表。
         3. 将缓存时间转换为秒并存储。
         4. 存储超时时间。
-        5. 获取安装路径并拼接 data 子路径，创建 data 目录（如果已存在则不报错）。
-        6. 创建缓存文件路径。
+        5. 获取用户缓存目录并拼接缓存文件路径（目录在写入缓存时才创建）。
         """
         self.logger = logging.getLogger(__name__)  # 创建日志对象
 
@@ -69,8 +70,11 @@ class UpdateChecker:
 
         self.cache_time = cache_time * 3600  # 将缓存时间转换为秒并存储
         self.time_out = time_out  # 存储超时时间
+        self.api_url = api_url
+        self._thread = None  # 后台检查线程
+        self._latest_version = None  # 后台检查得到的最新版本
 
-        cache_path = Path(user_cache_dir(script_name, ensure_exists=True))
+        cache_path = Path(user_cache_dir(script_name))
         self.cache_file = cache_path / f"{script_name}_version_cache.toml"
 
     # --------------------------------------------------------------------------------
@@ -135,10 +139,15 @@ class UpdateChecker:
         尝试打开缓存文件并以写模式写入最新的版本号.如果操作失败,记录错误日志.
         """
         try:
-            # 尝试以写模式打开缓存文件
-            with open(self.cache_file, "wb") as f:
+            import tomli_w
+
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            # 先写临时文件再替换：后台线程可能随进程退出被中断，不能留下半个缓存文件
+            tmp_file = self.cache_file.with_name(f"{self.cache_file.name}.{os.getpid()}.tmp")
+            with open(tmp_file, "wb") as f:
                 # 使用 tomli_w 库将最新的版本号写入文件
                 tomli_w.dump({"latest_version": latest_version}, f)
+            os.replace(tmp_file, self.cache_file)
         except Exception as e:  # noqa: BLE001
             # 如果更新缓存时出错,记录错误日志
             self.logger.error(_("更新版本缓存时出错: ") + str(e))
@@ -150,6 +159,8 @@ class UpdateChecker:
         self,
     ): 
 
+        import urllib.request  # urllib.request 会连带导入 http.client 与 ssl，仅在联网查询时加载
+
         start_time = time.time()
 
         try:
@@ -157,7 +168,7 @@ class UpdateChecker:
                 "User-Agent": f"{script_name} Update Checker",  # GitHub要求明确User-Agent
                 "Accept": "application/vnd.github.v3+json",
             }
-            req = urllib.request.Request(API_URL, headers=headers)
+            req = urllib.request.Request(self.api_url, headers=headers)
 
             with urllib.request.urlopen(req, timeout=self.time_out) as response:
                 # 添加编码处理
@@ -195,30 +206,24 @@ class UpdateChecker:
         return None
 
     # --------------------------------------------------------------------------------
-    # 定义 更新检查主函数
+    # 定义 最新版本获取函数
     # --------------------------------------------------------------------------------
-    def check_for_updates(self):
-        """
-        检查是否有新版本可用,并提示用户更新.
-
-        行为逻辑说明:
-        1. 从缓存中加载最新版本信息.
-        2. 如果缓存中没有最新版本信息,则从远程获取最新版本信息并更新缓存.
-        3. 获取当前安装的版本信息.
-        4. 比较当前版本和最新版本,如果当前版本较旧,则提示用户更新.
-        5. 如果当前版本是最新的,则提示当前版本信息.
-        """
+    def _resolve_latest_version(self):
+        """先读缓存，缓存无效时联网查询并更新缓存；返回最新版本对象，失败返回 None。"""
         latest_version = self._load_cached_version()  # 从缓存中加载最新版本信息
 
         if latest_version:
-            latest_version = version.parse(latest_version)  # 将字符串转换为版本对象
-        else:
-            latest_version = self._get_latest_version()
-            if latest_version:
-                self._update_version_cache(str(latest_version))
-            else:
-                return
+            return version.parse(latest_version)  # 将字符串转换为版本对象
+        latest_version = self._get_latest_version()
+        if latest_version:
+            self._update_version_cache(str(latest_version))
+        return latest_version
 
+    # --------------------------------------------------------------------------------
+    # 定义 更新提示函数
+    # --------------------------------------------------------------------------------
+    def _notify(self, latest_version):
+        """比较当前版本和最新版本，当前版本较旧时提示更新，否则打印当前版本。"""
         # 获取当前安装的版本信息
         current_version = version.parse(__version__)
 
@@ -237,3 +242,48 @@ class UpdateChecker:
             )
         else:
             print(_("当前版本: ") + f"[bold green]{current_version}[/bold green]")
+
+    # --------------------------------------------------------------------------------
+    # 定义 更新检查主函数
+    # --------------------------------------------------------------------------------
+    def check_for_updates(self):
+        """
+        检查是否有新版本可用,并提示用户更新.
+
+        行为逻辑说明:
+        1. 从缓存中加载最新版本信息.
+        2. 如果缓存中没有最新版本信息,则从远程获取最新版本信息并更新缓存.
+        3. 比较当前版本和最新版本,如果当前版本较旧,则提示用户更新.
+        4. 如果当前版本是最新的,则提示当前版本信息.
+        """
+        latest_version = self._resolve_latest_version()
+        if latest_version:
+            self._notify(latest_version)
+
+    # --------------------------------------------------------------------------------
+    # 定义 后台更新检查函数
+    # --------------------------------------------------------------------------------
+    def start(self):
+        """在后台守护线程中读取缓存或联网查询最新版本，不阻塞编译。"""
+
+        def run():
+            self._latest_version = self._resolve_latest_version()
+
+        self._thread = threading.Thread(target=run, name="pytexmk-update-check", daemon=True)
+        self._thread.start()
+
+    def finish(self, deadline=UPDATE_CHECK_DEADLINE):
+        """
+        运行结束时收取后台检查结果并提示更新.
+
+        最多等待 deadline 秒；届时仍未完成（如离线环境下等待网络超时）则跳过本次提示，
+        守护线程不会阻止进程退出。
+        """
+        if self._thread is None:
+            return
+        self._thread.join(deadline)
+        if self._thread.is_alive():
+            self.logger.info(_("版本检查未在 %.1f 秒内完成, 跳过") % deadline)
+            return
+        if self._latest_version:
+            self._notify(self._latest_version)
@@ -0,0 +1,135 @@
+"""PyTeXMK --all 模式：在进程池中并行编译根目录下检测到的全部主文件。
+
+每个主文件在独立的子进程中走完整的 run_workflow 流程，以原生目录模式编译，生成文件直接写入 <辅助目录>/<主文件名>/，
+子进程输出先写入临时文件，任务完成后按完成顺序整体打印，最后汇总打印各任务的运行时长统计表。
+"""
+import copy
+import dataclasses
+import datetime
+import os
+import sys
+import tempfile
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from rich import print
+from rich.rule import Rule
+
+from ..language import set_language
+from ..ui_theme import console
+
+_ = set_language("cli_all")
+
+
+def _build_job(args, project_name: str, isatty: bool, columns: int):
+    """子进程任务：编译单个主文件，返回 (主文件名, 是否成功, runtime_dict, 输出文本, 资源占用记录, trace 事件)。"""
+    job_args = copy.copy(args)
+    job_args.all = False
+    job_args.watch = False
+    job_args.pdf_preview = None
+    job_args.document = project_name
+    job_args.job = True
+    # 各任务的引擎以 -output-directory 将生成文件写入自己的辅助目录（原生目录模式），
+    # 多个主文件 \include 同一子文件时不会在根目录中同时写同一个子 .aux
+    job_args.native_dirs = True
+    job_args.usage_json = None
+    job_args.trace = None
+
+    if isatty and "NO_COLOR" not in os.environ:
+        os.environ.setdefault("FORCE_COLOR", "1")
+    if columns:
+        os.environ["COLUMNS"] = str(columns)
+
+    with tempfile.TemporaryFile() as log:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.dup2(log.fileno(), 1)
+        os.dup2(log.fileno(), 2)
+
+        import rich
+
+        from ..resource_usage import take_usage_records
+        from ..timing import tracer
+        from ..ui_theme import reset_console
+
+        rich.reconfigure()
+        reset_console()
+        if args.trace:
+            tracer.start(f"pytexmk {project_name}")
+
+        runtime_dict, success = {}, False
+        try:
+            from .cli_workflow import run_workflow
+
+            runtime_dict = run_workflow(job_args) or {}
+            success = True
+        except SystemExit:
+            pass
+        except Exception:  # noqa: BLE001
+            traceback.print_exc()
+        trace_events = tracer.take_events()
+        usage_records = [
+            dataclasses.replace(record, program=f"{project_name}: {record.program}") for record in take_usage_records()
+        ]
+        sys.stdout.flush()
+        sys.stderr.flush()
+        log.seek(0)
+        output = log.read().decode("utf-8", errors="replace")
+    return project_name, success, runtime_dict, output, usage_records, trace_events
+
+
+def run_all(args, logger) -> list[str]:
+    """并行编译根目录下的全部主文件，-j 限制同时运行的任务数（默认 CPU 核数）；返回编译失败的主文件名。"""
+    from ..tex_project import MainFileOperation
+    from ..resource_usage import write_usage_json
+    from ..timing import time_print, tracer
+
+    start_time = datetime.datetime.now()  # noqa: DTZ005
+    MFO = MainFileOperation()
+    main_files = MFO.find_tex_commands(MFO.get_suffix_files_in_dir(".", ".tex"))
+    if args.document:
+        logger.warning(_("--all 模式下忽略指定的主文件: ") + args.document)
+
+    jobs = max(1, min(args.jobs or os.cpu_count() or 1, len(main_files)))
+    print(
+        _("[bold green]并行编译 %(n)s 个主文件, 最大并行任务数: %(jobs)s")
+        % {"n": len(main_files), "jobs": jobs}
+    )
+
+    isatty = sys.stdout.isatty()
+    columns = console.width if isatty else 0
+    combined_runtime = {}
+    combined_usage = []
+    combined_trace = []
+    failed = []
+    with ProcessPoolExecutor(max_workers=jobs, max_tasks_per_child=1) as pool:
+        futures = [pool.submit(_build_job, args, name, isatty, columns) for name in main_files]
+        for future in as_completed(futures):
+            project_name, success, runtime_dict, output, usage_records, trace_events = future.result()
+            combined_usage.extend(usage_records)
+            combined_trace.extend(trace_events)
+            console.print(Rule(f"[bold cyan]{project_name}.tex"))
+            sys.stdout.write(output)
+            sys.stdout.flush()
+            if success:
+                combined_runtime.update({f"{project_name}: {key}": value for key, value in runtime_dict.items()})
+            else:
+                failed.append(project_name)
+
+    if args.usage_json:
+        try:
+            write_usage_json(args.usage_json, combined_usage)
+        except OSError as e:
+            logger.warning(_("写出资源占用记录失败: ") + f"{args.usage_json} --> {e}")
+    if args.trace:
+        try:
+            tracer.write(args.trace, tracer.take_events() + combined_trace)
+        except OSError as e:
+            logger.warning(_("写出 trace 文件失败: ") + f"{args.trace} --> {e}")
+    if combined_runtime:
+        time_print(start_time, combined_runtime, summary=False, usage_records=combined_usage)
+    if failed:
+        logger.error(_("编译失败的主文件: ") + ", ".join(f"{name}.tex" for name in sorted(failed)))
+    else:
+        print(_("[bold green]全部主文件编译完成"))
+    return failed
@@ -25,39 +25,55 @@ Description  :
 """
 
 import argparse
+import sys
 
 from rich import print
-from rich.console import Console
 from rich_argparse import RichHelpFormatter
 
 from ..language import set_language
-from ..ui_messages import magic_comment_desc_table
 from ..version import __version__, script_name
 
 _ = set_language("cli_args")
 
 
 class CustomArgumentParser(argparse.ArgumentParser):
-    """自定义 ArgumentParser：退出时打印魔法注释说明表与版本检查。"""
+    """自定义 ArgumentParser：打印帮助时附带魔法注释说明表与版本检查。"""
 
-    def __init__(self, *args, uc=None, **kwargs):
+    def __init__(self, *args, uc_factory=None, **kwargs):
         super().__init__(*args, **kwargs)
-        self.uc = uc
-
-    def exit(self, status=0, message=None):
-        """自定义 argparse 退出：帮助时打印魔法注释说明与版本检查。"""
-        if status == 0 and message is None:
-            print(
-                _(
-                    "\nPyTeXMK-支持使用魔法注释来定义待编译主文件、编译程序、编译结果存放位置等（仅支持检索文档前 50 行）\n"
-                )
+        # 版本检查器按需构造：只有打印帮助时才需要，-v 等路径不导入 check_version
+        self.uc_factory = uc_factory
+
+    def print_help(self, file=None):
+        """打印帮助后追加魔法注释说明表并检查新版本；-v 只打印版本号，不经过这里。"""
+        super().print_help(file)
+        print(
+            _(
+                "\nPyTeXMK-支持使用魔法注释来定义待编译主文件、编译程序、编译结果存放位置等（仅支持检索文档前 50 行）\n"
             )
-            table = magic_comment_desc_table()
-            console = Console()
-            console.print(table)
-            if self.uc is not None:
-                self.uc.check_for_updates()
-        super().exit(status, message)
+        )
+        from rich.console import Console
+
+        from ..ui_messages import magic_comment_desc_table
+
+        table = magic_comment_desc_table()
+        console = Console()
+        console.print(table)
+        uc = self.uc_factory() if self.uc_factory is not None else None
+        if uc is not None:
+            uc.check_for_updates()
+
+
+class VersionAction(argparse.Action):
+    """打印版本号并退出：不经过 RichHelpFormatter，-v 无需导入 rich.console。"""
+
+    def __init__(self, option_strings, version, dest=argparse.SUPPRESS, default=argparse.SUPPRESS, help=None):
+        super().__init__(option_strings=option_strings, dest=dest, default=default, nargs=0, help=help)
+        self.version = version
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        sys.stdout.write(self.version + "\n")
+        parser.exit()
 
 
 class CustomHelpFormatter(RichHelpFormatter):
@@ -69,8 +85,11 @@ class CustomHelpFormatter(RichHelpFormatter):
         return super()._format_args(action, default_metavar)
 
 
-def parse_args(uc=None):
-    """定义并解析 PyTeXMK 命令行参数，返回 argparse.Namespace。"""
+def parse_args(uc_factory=None):
+    """定义并解析 PyTeXMK 命令行参数，返回 argparse.Namespace。
+
+    uc_factory 为返回 UpdateChecker（或关闭检查时返回 None）的无参可调用对象，仅在打印帮助后调用。
+    """
     parser = CustomArgumentParser(
         prog="pytexmk",
         description=_("[i]LaTeX 辅助编译程序  ---- 焱铭[/]"),
@@ -80,7 +99,7 @@ def parse_args(uc=None):
         formatter_class=CustomHelpFormatter,
         add_help=False,
         suggest_on_error=True,
-        uc=uc,
+        uc_factory=uc_factory,
     )
 
     meg_clean = parser.add_mutually_exclusive_group()
@@ -89,8 +108,8 @@ def parse_args(uc=None):
     parser.add_argument(
         "-v",
         "--version",
-        action="version",
-        version=f"{script_name}: version [i]{__version__}",
+        action=VersionAction,
+        version=f"{script_name}: version {__version__}",
         help=_("显示 PyTeXMK 的版本号并退出"),
     )
     parser.add_argument(
@@ -151,6 +170,11 @@ def parse_args(uc=None):
         action="store_true",
         help=_("清除所有带辅助文件后缀的文件（包含根目录）和主文件输出文件"),
     )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help=_("与 -c / -C / -ca / -Ca 一起使用时只列出将删除的文件, 不实际删除"),
+    )
     parser.add_argument(
         "-nq",
         "--non-quiet",
@@ -163,12 +187,81 @@ def parse_args(uc=None):
         action="store_true",
         help=_("显示 PyTeXMK 运行过程中的详细信息"),
     )
+    parser.add_argument(
+        "-pc",
+        "--preamble-cache",
+        action="store_true",
+        help=_("将导言区预编译为格式文件并缓存在辅助目录中, 各次 LaTeX 编译直接加载, 导言区变化时自动重新生成"),
+    )
+    parser.add_argument(
+        "-nd",
+        "--native-dirs",
+        action="store_true",
+        help=_("原生目录模式: 通过 -output-directory 等参数让 LaTeX 引擎、biber、bibtex 与 makeindex 直接在辅助目录中读写辅助文件, 编译前后不再移动辅助文件"),
+    )
+    parser.add_argument(
+        "-po",
+        "--pdf-optimize",
+        action="store_true",
+        help=_("编译完成后优化输出 PDF: 合并重复嵌入的图片与字体、压缩内容流、删除未引用的对象, 找到 qpdf 时再生成对象流"),
+    )
+    parser.add_argument(
+        "--linearize",
+        action="store_true",
+        help=_("优化输出 PDF 时线性化 (快速网页显示), 需要 qpdf, 隐含 -po"),
+    )
+    parser.add_argument(
+        "-f",
+        "--force",
+        action="store_true",
+        help=_("忽略编译状态记录, 即使源文件未发生变化也强制重新编译; 与 -pr 同时使用时忽略 PDF 检查缓存, 重新检查全部 PDF 文件"),
+    )
+    parser.add_argument(
+        "-w",
+        "--watch",
+        action="store_true",
+        help=_("编译后持续监视源文件, 文件保存后仅重新执行受影响的编译阶段, 按 Ctrl+C 退出"),
+    )
+    parser.add_argument(
+        "-a",
+        "--all",
+        action="store_true",
+        help=_("并行编译根目录下的全部主文件, 每个主文件使用独立的辅助目录 <辅助目录>/<主文件名>/"),
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        metavar="N",
+        help=_("并行任务数上限: -a 的编译任务数与 -pr 的 PDF 检查进程数 (默认为 CPU 核数), -ca 的删除线程数"),
+    )
+    parser.add_argument(
+        "--usage-json",
+        metavar="FILE",
+        help=_("将各外部程序的资源占用 (CPU 时间、峰值内存、读写字节数) 以 JSON 格式写入 FILE, 编译失败时同样写出"),
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help=_("将编译各阶段 (主文件检测、各次 LaTeX 编译、各维度检测、辅助工具、文件移动、日志分析) 的耗时区间以 Chrome trace 格式写入 FILE, 可在 Perfetto 或 chrome://tracing 中查看"),
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help=_("启动后台守护进程 (前台运行, 预加载依赖模块), 之后的 pytexmk 命令将交给守护进程执行以减少启动时间"),
+    )
+    parser.add_argument(
+        "--daemon-stop",
+        action="store_true",
+        help=_("停止正在运行的后台守护进程"),
+    )
     parser.add_argument(
         "-pr",
         "--pdf-repair",
         action="store_true",
         help=_(
-            "尝试修复所有根目录以外的 PDF 文件, 当 LaTeX 编译过程中警告 invalid X X R object 时, 可使用此参数尝试修复所有 pdf 文件"
+            "尝试修复所有根目录以外的 PDF 文件, 当 LaTeX 编译过程中警告 invalid X X R object 时, 可使用此参数尝试修复所有 pdf 文件; "
+            "先并行检查交叉引用表与 trailer, 只重写结构损坏的文件, 已确认完好的文件记录在检查缓存中, 再次运行时跳过"
         ),
     )
     parser.add_argument(
@@ -0,0 +1,93 @@
+"""PyTeXMK 编译历史统计：`pytexmk stats` 子命令，打印各阶段耗时 p50 / p95、编译次数分布与变慢提示。"""
+import argparse
+
+from rich import box
+from rich.table import Table
+from rich.text import Text
+
+from ..build_history import BuildHistory, pass_distribution, regressions, stage_statistics
+from ..language import set_language
+from ..ui_theme import console
+from .cli_args import CustomHelpFormatter
+
+_ = set_language("cli_stats")
+
+
+def parse_stats_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="pytexmk stats",
+        description=_("显示当前目录下编译历史的统计信息：各阶段耗时 p50 / p95、LaTeX 编译次数分布与相对近期基线变慢的阶段"),
+        formatter_class=CustomHelpFormatter,
+    )
+    parser.add_argument("document", nargs="?", help=_("只统计该主文件的编译历史（默认统计当前目录下的所有主文件）"))
+    parser.add_argument(
+        "-n", "--limit", type=int, default=50, metavar="N", help=_("统计最近 N 次编译 (默认: 50)")
+    )
+    parser.add_argument(
+        "--window", type=int, default=10, metavar="N", help=_("变慢判定的滚动基线为此前 N 次成功编译的中位数 (默认: 10)")
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=20,
+        metavar="PCT",
+        help=_("阶段耗时超过基线该百分比时提示变慢 (默认: 20)"),
+    )
+    return parser.parse_args(argv)
+
+
+def _table(title: str) -> Table:
+    return Table(show_header=True, header_style="bold dark_orange", box=box.ASCII_DOUBLE_HEAD, title=title)
+
+
+def run_stats(argv: list[str]):
+    args = parse_stats_args(argv)
+    document = args.document.removesuffix(".tex") if args.document else None
+    runs = BuildHistory().runs(document, args.limit)
+    if not runs:
+        console.print("[yellow]" + _("当前目录下没有编译历史记录") + "[/yellow]")
+        return
+
+    failed = sum(1 for run in runs if run["status"] != "ok")
+    console.print(
+        _("共 %(n)s 次编译（失败 %(failed)s 次），编译程序: %(engines)s")
+        % {"n": len(runs), "failed": failed, "engines": ", ".join(sorted({run["engine"] for run in runs}))}
+    )
+
+    stats = stage_statistics(runs)
+    if stats:
+        table = _table(_("各阶段耗时统计"))
+        table.add_column(Text(_("运行项目"), justify="center"), style="cyan", justify="left", no_wrap=True)
+        table.add_column(_("次数"), justify="right", no_wrap=True)
+        for header in ("p50", "p95", _("最近")):
+            table.add_column(header, style="green", justify="right", no_wrap=True)
+        for name, stat in stats.items():
+            label = _("总计") if name == "total" else name
+            table.add_row(label, str(stat["count"]), f"{stat['p50']:.2f}s", f"{stat['p95']:.2f}s", f"{stat['last']:.2f}s")
+        console.print(table)
+
+        distribution = pass_distribution(runs)
+        total = sum(distribution.values())
+        table = _table(_("LaTeX 编译次数分布"))
+        table.add_column(_("编译次数"), justify="center", no_wrap=True)
+        table.add_column(_("编译"), justify="right", no_wrap=True)
+        table.add_column(_("占比"), style="green", justify="right", no_wrap=True)
+        for passes, count in sorted(distribution.items()):
+            table.add_row(str(passes), str(count), f"{count / total:.0%}")
+        console.print(table)
+
+    alerts = regressions(runs, window=args.window, threshold=args.threshold / 100)
+    for name, baseline, latest in alerts:
+        console.print(
+            "[bold red]"
+            + _("变慢: %(stage)s 最近一次 %(latest).2fs, 基线 %(baseline).2fs (+%(pct).0f%%)")
+            % {
+                "stage": _("总计") if name == "total" else name,
+                "latest": latest,
+                "baseline": baseline,
+                "pct": (latest / baseline - 1) * 100 if baseline else 100,
+            }
+            + "[/bold red]"
+        )
+    if stats and not alerts:
+        console.print("[green]" + _("最近一次编译没有相对基线变慢的阶段") + "[/green]")
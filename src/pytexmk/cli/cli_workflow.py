@@ -2,25 +2,27 @@
 
 
 def run_workflow(args):
+    # 只在此处导入每条命令路径都会用到的模块；pytexlogs、编译引擎、latexdiff、编译历史、
+    # 版本检查与 webbrowser 在各自的分支内按需导入，-c 等轻量命令不为其付出启动时间
     import datetime
-    import webbrowser
+    import sys
+    import time
 
-    import pytexlogs
     from rich import print
 
-    from pytexmk.cli.check_version import UpdateChecker
-
+    from ..build_manifest import MANIFEST_SUFFIX, BuildManifest
+    from ..build_state import STATE_SUFFIX, BuildStateManager
     from ..config import ConfigParser
+    from ..dependency_graph import GRAPH_SUFFIX, DependencyGraph
     from ..file_ops import FileMoveRemoveManager
+    from ..format_cache import FormatCache
     from ..language import set_language
-    from ..latexdiff import LaTeXDiff_Aux
     from ..lifecycle import exit_pytexmk
     from ..logger_config import setup_logger
-    from ..paths import get_app_path
     from ..pdf_tools import PdfFileOperation
-    from ..compile_engine import RUN, LaTeXDiffRUN
+    from ..resource_usage import format_bytes, take_usage_records, write_usage_json
     from ..tex_project import MainFileOperation
-    from ..timing import time_count, time_print
+    from ..timing import span, time_count, time_print, tracer
     from ..ui_messages import print_message
     from ..version import __version__
 
@@ -75,6 +77,8 @@ def run_workflow(args):
     project_name = ""
     runtime_dict = {}
     magic_comments = {}
+    graph = None
+    watch_mode = False
 
     print(_("PyTeXMK 版本: %(args)s") % {"args": f"[i bold green]{__version__}[/i bold green]\n"})
     print(_("[bold green]PyTeXMK 开始运行...\n"))
@@ -85,6 +89,10 @@ def run_workflow(args):
 
     if args.readme:
         try:
+            import webbrowser
+
+            from ..paths import get_app_path
+
             app_path = get_app_path()
             readme_path = app_path / "data" / "README.html"
             if readme_path.exists():
@@ -100,13 +108,59 @@ def run_workflow(args):
         finally:
             exit_pytexmk()
 
+    # 版本检查在启动时放到后台线程，运行结束时最多等待 UPDATE_CHECK_DEADLINE 秒；--all 的子任务与关闭检查时不启动
+    # 此后每条正常结束的路径（含 -ca / -Ca 的提前返回）都要调用 check_for_updates() 收取结果
+    update_checker = None
+    if not getattr(args, "job", False) and CP.update_check_enabled():
+        from .check_version import UpdateChecker
+
+        update_checker = UpdateChecker(1, 6)
+        update_checker.start()
+
+    def check_for_updates():
+        """收取后台版本检查结果并提示更新。"""
+        if update_checker is not None:
+            update_checker.finish()
+
+    if args.trace:
+        tracer.start()
+
+    if args.all:
+        from .cli_all import run_all
+
+        failed = run_all(args, logger)
+        check_for_updates()
+        if failed:
+            sys.exit(1)  # 任一主文件编译失败时以非零退出码结束，供 CI 判断
+        return
+
+    # --all 模式下的单个编译任务：辅助文件存放在独立的 <辅助目录>/<主文件名>/ 下
+    job_mode = getattr(args, "job", False)
+
+    def report_usage():
+        """取出本次编译的外部程序资源占用记录；指定 --usage-json / --trace 时同时写出资源占用与 trace 文件。"""
+        records = take_usage_records()
+        if args.usage_json:
+            try:
+                write_usage_json(args.usage_json, records)
+            except OSError as e:
+                logger.warning(_("写出资源占用记录失败: ") + f"{args.usage_json} --> {e}")
+        if args.trace and not job_mode:
+            try:
+                tracer.write(args.trace, tracer.take_events())
+            except OSError as e:
+                logger.warning(_("写出 trace 文件失败: ") + f"{args.trace} --> {e}")
+        return records
+
     logger.info("-" * 70)
-    tex_files_in_root = MFO.get_suffix_files_in_dir(".", ".tex")
-    main_files_in_root = MFO.find_tex_commands(tex_files_in_root)
-    all_magic_comments = MFO.search_magic_comments(main_files_in_root, magic_comments_keys)
+    with span(_("主文件检测")):
+        tex_files_in_root = MFO.get_suffix_files_in_dir(".", ".tex")
+        main_files_in_root = MFO.find_tex_commands(tex_files_in_root)
+        all_magic_comments = MFO.search_magic_comments(main_files_in_root, magic_comments_keys)
 
     logger.info("-" * 70)
-    config_dict = CP.init_config_file()
+    with span(_("读取配置文件")):
+        config_dict = CP.init_config_file()
 
     if config_dict["default_file"]:
         default_file = config_dict["default_file"]
@@ -218,27 +272,243 @@ def run_workflow(args):
         auxdir = magic_comments["auxdir"]
         print(_("通过魔法注释设置辅助目录: ") + f"[bold cyan]{auxdir}[/bold cyan]")
 
+    if job_mode and project_name:
+        auxdir = f"{Path(auxdir) / project_name}/"
+
     out_files = [f"{project_name}{suffix}" for suffix in suffixes_out]
     aux_files = [f"{project_name}{suffix}" for suffix in suffixes_aux]
     aux_regex_files = [f".*\\{suffix}" for suffix in suffixes_aux]
 
+    def clean_files(label, remove, *remove_args, **kwargs):
+        """执行一项清除操作并记录耗时；--dry-run 时只列出将删除的文件，不删除。"""
+        runtime_clean, removed = time_count(remove, *remove_args, dry_run=args.dry_run, **kwargs)
+        runtime_dict[label] = runtime_clean
+        if args.dry_run:
+            from rich.markup import escape
+
+            for file_path in removed or []:
+                print(_("将删除: ") + f"[cyan]{escape(str(file_path))}[/cyan]")
+
+    def clean_done(message):
+        print(_("[bold yellow]试运行, 未删除任何文件") if args.dry_run else message)
+
+    def recorded_files(manifest):
+        """编译产物清单中的辅助文件（该主文件的输出结果文件除外）。"""
+        return manifest.files(exclude=[f"{manifest.project_name}{suffix}" for suffix in suffixes_out])
+
+    def remove_manifest_files(manifests, dry_run=False):
+        """按编译产物清单删除各主文件在其辅助目录与根目录中的生成文件、新建的空目录及清单本身。"""
+        removed = []
+        for manifest, build_auxdir in manifests:
+            for folder in (build_auxdir, "."):
+                removed += MRO.remove_specific_files(recorded_files(manifest), folder, dry_run=dry_run)
+                removed += MRO.remove_empty_dirs(manifest.dirs(), folder, dry_run=dry_run)
+            removed += MRO.remove_specific_files([f"{manifest.project_name}{MANIFEST_SUFFIX}"], build_auxdir, dry_run=dry_run)
+        return removed
+
+    def move_manifest_files(manifests, src_folder, dest_folder):
+        """按编译产物清单移动辅助文件（只移动 src_folder 中实际存在的文件），返回移动的文件数。"""
+        files = dict.fromkeys(f for manifest in manifests for f in recorded_files(manifest))
+        return MRO.move_specific_files([f for f in files if (Path(src_folder) / f).exists()], src_folder, dest_folder)
+
+    def clean_any():
+        """-ca / -Ca：辅助目录中存在编译产物清单时按清单删除，否则按辅助文件后缀遍历目录树删除。"""
+        manifests = BuildManifest.find_all(auxdir)
+        if manifests:
+            logger.info(_("按编译产物清单清除: ") + ", ".join(manifest.project_name for manifest, _dir in manifests))
+            clean_files(_("清除所有的辅助文件"), remove_manifest_files, manifests)
+        else:
+            clean_files(_("清除所有的辅助文件"), MRO.remove_matched_files, aux_regex_files, ".", jobs=args.jobs)
+
     if args.clean_any:
-        runtime_remove_aux_matched_auxdir, _ret = time_count(MRO.remove_matched_files, aux_regex_files, ".")
-        runtime_dict[_("清除所有的辅助文件")] = runtime_remove_aux_matched_auxdir
-        print(_("[bold green]已完成清除所有带辅助文件后缀的文件的指令"))
+        clean_any()
+        clean_done(_("[bold green]已完成清除所有带辅助文件后缀的文件的指令"))
         if runtime_dict:
             time_print(start_time, runtime_dict)
+        check_for_updates()
         return
     elif args.Clean_any:
-        runtime_remove_aux_matched_auxdir, _ret = time_count(MRO.remove_matched_files, aux_regex_files, ".")
-        runtime_dict[_("清除所有的辅助文件")] = runtime_remove_aux_matched_auxdir
-        runtime_remove_out_outdir, _ret = time_count(MRO.remove_specific_files, out_files, outdir)
-        runtime_dict[_("清除文件夹内输出文件")] = runtime_remove_out_outdir
-        print(_("[bold green]已完成清除所有带辅助文件后缀的文件和主文件输出文件的指令"))
+        clean_any()
+        clean_files(_("清除文件夹内输出文件"), MRO.remove_specific_files, out_files, outdir)
+        clean_done(_("[bold green]已完成清除所有带辅助文件后缀的文件和主文件输出文件的指令"))
         if runtime_dict:
             time_print(start_time, runtime_dict)
+        check_for_updates()
         return
 
+    def optimize_pdf(runtime_dict, name):
+        """-po / --linearize：优化输出目录中 name 的 PDF 文件，节省的大小写在统计表的行名中，与耗时一同显示。"""
+        print("[yellow]" + _("优化输出 PDF 文件...") + "[/yellow]")
+        with span(_("优化 PDF 文件")):
+            runtime_optimize, sizes = time_count(
+                PFO.pdf_optimize, name, outdir, auxdir, linearize=args.linearize, quiet=not non_quiet,
+            )
+        if sizes is not None:
+            size_before, size_after = sizes
+            runtime_dict[
+                _("优化 PDF 文件 (%(before)s → %(after)s, 减少 %(saved)s)")
+                % {
+                    "before": format_bytes(size_before), "after": format_bytes(size_after),
+                    "saved": format_bytes(size_before - size_after),
+                }
+            ] = runtime_optimize
+
+    def compile_project(runtime_dict, force=False, pre_stages=None):
+        """编译主文件：检查编译状态 → 移入辅助文件 → RUN → 移出结果文件 →（-po 时）优化输出 PDF → 移出辅助文件 → 日志分析 → 保存编译状态。
+
+        原生目录模式（--native-dirs）下不移动辅助文件，只将结果文件从辅助目录移到输出目录。
+        """
+        nonlocal aux_files, graph
+
+        compile_start = time.perf_counter()
+        BSM = BuildStateManager(project_name, auxdir, outdir)
+        build_options = {
+            "compiled_program": compiled_program,
+            "draft": bool(args.draft),
+            "outdir": outdir,
+            "auxdir": auxdir,
+            "pdf_optimize": bool(args.pdf_optimize or args.linearize),
+            "linearize": bool(args.linearize),
+            "version": __version__,
+        }
+        up_to_date = False
+        if not force:
+            with span(_("检查编译状态")):
+                runtime_check_state, up_to_date = time_count(BSM.is_up_to_date, build_options, out_files)
+            runtime_dict[_("检查编译状态")] = runtime_check_state
+
+        if up_to_date:
+            print("[bold green]" + _("源文件与编译选项自上次成功编译后均未变化, 跳过编译") + "[/bold green]")
+        else:
+            input_files = MFO.find_input_files(project_name)
+            if graph is not None:
+                input_files = list(dict.fromkeys(input_files + graph.source_inputs()))
+            with span(_("输入文件摘要")):
+                input_snapshot = BSM.snapshot(input_files)
+
+            print_message(_("开始预处理"), "additional")
+            # 原生目录模式下各工具直接读写辅助目录中的文件，无需移入根目录
+            build_dir = Path(auxdir) if args.native_dirs else Path(".")
+            if not args.native_dirs:
+                with span(_("辅助文件->根目录")):
+                    runtime_move_aux_root, aux_moved_count = time_count(MRO.move_specific_files, aux_files, auxdir, ".")
+                runtime_dict[_("辅助文件->根目录")] = runtime_move_aux_root
+
+            aux_exist_count = sum(1 for f in aux_files if (build_dir / f).exists())
+            if aux_exist_count == 0:
+                console.print("[green]" + _("未检测到已有辅助文件，进行初始化") + "[/green]")
+            else:
+                console.print("[green]" + _("已检测到 %(n)s 个已有辅助文件") % {"n": aux_exist_count} + "[/green]")
+
+            if args.native_dirs:
+                console.print("[green]" + _("原生目录模式, 辅助文件保留在辅助目录中") + "[/green]")
+            elif aux_moved_count == 0:
+                console.print("[green]" + _("没有检测到可迁移的辅助文件") + "[/green]")
+            else:
+                console.print("[yellow]" + _("已移动 %(n)s 个辅助文件到项目根目录") % {"n": aux_moved_count} + "[/yellow]")
+
+            import pytexlogs
+
+            from ..build_history import BuildHistory
+            from ..compile_engine import RUN
+
+            # 编译历史：各阶段耗时、编译次数、每轮检测结果、编译程序与结果，供 pytexmk stats 统计
+            rounds = []
+
+            def record_history(status):
+                BuildHistory().record(
+                    project_name, compiled_program, status, time.perf_counter() - compile_start,
+                    runtime_dict, rounds, __version__,
+                )
+
+            try:
+                with span(_("编译"), project=project_name):
+                    RUN(
+                        runtime_dict, project_name, compiled_program, out_files, aux_files,
+                        outdir, auxdir, non_quiet, args.draft, pre_stages, args.preamble_cache,
+                        round_log=rounds, native_dirs=args.native_dirs, track_dirs=not job_mode,
+                    )
+            except SystemExit:
+                record_history("failed")
+                raise
+
+            print_message(_("开始后处理"), "additional")
+
+            print("[yellow]" + _("移动结果文件到输出目录...") + "[/yellow]")
+            with span(_("结果文件->输出目录")):
+                # 原生目录模式下只移动辅助目录中实际生成的结果文件（XeLaTeX 的 PDF 已由 dvipdfmx 直接写入输出目录）
+                built_out_files = [f for f in out_files if (build_dir / f).exists()] if args.native_dirs else out_files
+                runtime_move_out_outdir, _ret = time_count(MRO.move_specific_files, built_out_files, str(build_dir), outdir)
+            runtime_dict[_("结果文件->输出目录")] = runtime_move_out_outdir
+
+            if args.pdf_optimize or args.linearize:
+                optimize_pdf(runtime_dict, project_name)
+
+            graph = DependencyGraph.load(project_name, auxdir)
+            if graph is not None:
+                aux_files = list(dict.fromkeys(aux_files + graph.generated_files(exclude=out_files)))
+                input_snapshot.update(
+                    BSM.snapshot([f for f in graph.source_inputs() if f not in input_snapshot])
+                )
+            manifest = BuildManifest.load(project_name, auxdir)
+            if manifest is not None:
+                aux_files = list(dict.fromkeys(aux_files + recorded_files(manifest)))
+
+            if not args.native_dirs:
+                print("[yellow]" + _("移动辅助文件到辅助目录...") + "[/yellow]")
+                with span(_("辅助文件->辅助目录")):
+                    runtime_move_aux_auxdir, _ret = time_count(MRO.move_specific_files, aux_files, ".", auxdir)
+                runtime_dict[_("辅助文件->辅助目录")] = runtime_move_aux_auxdir
+                if manifest is not None:
+                    MRO.remove_empty_dirs(manifest.dirs(), ".")  # 移走文件后根目录中留下的工具新建目录
+
+            with span(_("日志分析")):
+                pytexlogs.run_log_pipeline(
+                    project_name, auxdir, root_file=project_name,
+                    pytexmk_version=__version__,
+                    ref_tracker_translate_fn=set_language("log_parser"),
+                )
+
+            with span(_("保存编译状态")):
+                BSM.save(build_options, input_snapshot)
+            record_history("ok")
+
+    def watch_project():
+        """监视模式：源文件变化后按依赖图只重新执行受影响的阶段，按 Ctrl+C 退出。"""
+        from ..file_watcher import FileWatcher
+
+        def watched_files():
+            files = MFO.find_input_files(project_name)
+            if graph is not None:
+                files += [f for f in graph.source_inputs() if not Path(f).is_absolute()]
+            return list(dict.fromkeys(files))
+
+        watcher = FileWatcher(watched_files())
+        print("[bold green]" + _("进入监视模式, 保存文件后自动重新编译, 按 Ctrl+C 退出") + "[/bold green]")
+        try:
+            while True:
+                changed = watcher.wait_for_changes()
+                print_message(_("检测到文件变化: ") + ", ".join(changed), "additional")
+                pre_stages = graph.tool_stages_for(changed) if graph is not None else None
+                if pre_stages:
+                    logger.info(_("仅重新执行受影响的阶段: ") + ", ".join(stage for stage, _cmd in pre_stages))
+                watch_start_time = datetime.datetime.now()  # noqa: DTZ005
+                watch_runtime_dict = {}
+                if args.trace:
+                    tracer.start()  # 每次重新编译单独写出 trace
+                try:
+                    compile_project(watch_runtime_dict, pre_stages=pre_stages)
+                except SystemExit:
+                    report_usage()
+                    logger.error(_("编译失败, 等待文件再次变化后重新编译"))
+                if watch_runtime_dict:
+                    time_print(watch_start_time, watch_runtime_dict, usage_records=report_usage())
+                watcher.set_files(watched_files())
+        except KeyboardInterrupt:
+            print("[bold green]" + _("已退出监视模式") + "[/bold green]")
+        finally:
+            watcher.close()
+
     if args.LaTeXDiff or args.LaTeXDiff_compile or args.LaTeXDiff == [] or args.LaTeXDiff_compile == []:
         if not old_tex_file or not new_tex_file:
             logger.error(_("请指定在命令行或配置文件中指定两个新旧 TeX 文件"))
@@ -248,6 +518,9 @@ def run_workflow(args):
             logger.error(_("不能对同一个文件进行比较, 请检查文件名是否正确"))
             exit_pytexmk()
 
+        from ..compile_engine import RUN, LaTeXDiffRUN
+        from ..latexdiff import LaTeXDiff_Aux
+
         print_message(_("LaTeXDiff 预处理"), "additional")
 
         LDA = LaTeXDiff_Aux(outdir, suffixes_out, suffixes_aux, auxdir)
@@ -264,7 +537,17 @@ def run_workflow(args):
 
         old_tex_file_flatten = LDA.flatten_Latex(old_tex_file)
         new_tex_file_flatten = LDA.flatten_Latex(new_tex_file)
-        runtime_move_matched_files, _ret = time_count(MRO.move_matched_files, aux_regex_files, auxdir, ".")
+        # 新旧文件均有编译产物清单时按清单移动辅助文件，否则按辅助文件后缀移动辅助目录中的全部文件
+        def diff_manifests():
+            manifests = [BuildManifest.load(name, auxdir) for name in (old_tex_file, new_tex_file, diff_tex_file)]
+            if manifests[0] is None or manifests[1] is None:
+                return None
+            return [manifest for manifest in manifests if manifest is not None]
+
+        if manifests := diff_manifests():
+            runtime_move_matched_files, _ret = time_count(move_manifest_files, manifests, auxdir, ".")
+        else:
+            runtime_move_matched_files, _ret = time_count(MRO.move_matched_files, aux_regex_files, auxdir, ".")
         runtime_dict[_("全辅助文件->根目录")] = runtime_move_matched_files
         latex_diff_style = input(
             _(
@@ -325,74 +608,78 @@ def run_workflow(args):
                 print(_("移动结果文件到输出目录..."))
                 runtime_move_out_outdir, _ret = time_count(MRO.move_specific_files, out_files, ".", outdir)
                 runtime_dict[_("结果文件->输出目录")] = runtime_move_out_outdir
+
+                if args.pdf_optimize or args.linearize:
+                    optimize_pdf(runtime_dict, diff_tex_file)
+
         except Exception as e:  # noqa: BLE001
             logger.error(_("LaTeXDiff 编译出错: ") + str(e))
             exit_pytexmk()
         finally:
-            runtime_move_matched_files, _ret = time_count(MRO.move_matched_files, aux_regex_files, ".", auxdir)
+            if manifests := diff_manifests():
+                runtime_move_matched_files, _ret = time_count(move_manifest_files, manifests, ".", auxdir)
+            else:
+                runtime_move_matched_files, _ret = time_count(MRO.move_matched_files, aux_regex_files, ".", auxdir)
             runtime_dict[_("辅助文件->辅助目录")] = runtime_move_matched_files
 
     elif project_name:
+        state_files = [
+            f"{project_name}{STATE_SUFFIX}", f"{project_name}{GRAPH_SUFFIX}", f"{project_name}{MANIFEST_SUFFIX}",
+            *FormatCache.cache_files(project_name),
+        ]
+        # 存在上次编译的依赖图 / 编译产物清单时，以其记录的生成文件作为辅助文件列表，否则按辅助文件后缀推断
+        graph = DependencyGraph.load(project_name, auxdir)
+        manifest = BuildManifest.load(project_name, auxdir)
+        if graph is not None or manifest is not None:
+            aux_files = list(dict.fromkeys(
+                (graph.generated_files(exclude=out_files) if graph is not None else [])
+                + (recorded_files(manifest) if manifest is not None else [])
+            ))
+        created_dirs = manifest.dirs() if manifest is not None else []
         if args.clean:
-            runtime_remove_aux_auxdir, _ret = time_count(MRO.remove_specific_files, aux_files, auxdir)
-            runtime_dict[_("清除文件夹内辅助文件")] = runtime_remove_aux_auxdir
-            runtime_remove_aux_root, _ret = time_count(MRO.remove_specific_files, aux_files, ".")
-            runtime_dict[_("清除根目录内辅助文件")] = runtime_remove_aux_root
-            print(_("[bold green]已完成清除所有主文件的辅助文件的指令"))
+            clean_files(_("清除文件夹内辅助文件"), MRO.remove_specific_files, aux_files + state_files, auxdir)
+            clean_files(_("清除根目录内辅助文件"), MRO.remove_specific_files, aux_files, ".")
+            MRO.remove_empty_dirs(created_dirs, auxdir, dry_run=args.dry_run)
+            MRO.remove_empty_dirs(created_dirs, ".", dry_run=args.dry_run)
+            clean_done(_("[bold green]已完成清除所有主文件的辅助文件的指令"))
         elif args.Clean:
-            runtime_remove_aux_auxdir, _ret = time_count(MRO.remove_specific_files, aux_files, auxdir)
-            runtime_dict[_("清除文件夹内辅助文件")] = runtime_remove_aux_auxdir
-            runtime_remove_aux_root, _ret = time_count(MRO.remove_specific_files, aux_files, ".")
-            runtime_dict[_("清除根目录内辅助文件")] = runtime_remove_aux_root
-            runtime_remove_out_outdir, _ret = time_count(MRO.remove_specific_files, out_files, outdir)
-            runtime_dict[_("清除文件夹内输出文件")] = runtime_remove_out_outdir
-            print(_("[bold green]已完成清除所有主文件的辅助文件和输出文件的指令"))
+            clean_files(_("清除文件夹内辅助文件"), MRO.remove_specific_files, aux_files + state_files, auxdir)
+            clean_files(_("清除根目录内辅助文件"), MRO.remove_specific_files, aux_files, ".")
+            MRO.remove_empty_dirs(created_dirs, auxdir, dry_run=args.dry_run)
+            MRO.remove_empty_dirs(created_dirs, ".", dry_run=args.dry_run)
+            clean_files(_("清除文件夹内输出文件"), MRO.remove_specific_files, out_files, outdir)
+            clean_done(_("[bold green]已完成清除所有主文件的辅助文件和输出文件的指令"))
         elif args.pdf_repair:
-            runtime_pdf_repair, _ret = time_count(PFO.pdf_repair, project_name, ".", outdir)
+            runtime_pdf_repair, _ret = time_count(
+                PFO.pdf_repair, project_name, ".", outdir, cache_dir=auxdir, jobs=args.jobs, force=args.force,
+            )
             runtime_dict[_("修复 PDF 文件")] = runtime_pdf_repair
         else:
-            print_message(_("开始预处理"), "additional")
-            runtime_move_aux_root, aux_moved_count = time_count(MRO.move_specific_files, aux_files, auxdir, ".")
-            runtime_dict[_("辅助文件->根目录")] = runtime_move_aux_root
-
-            aux_exist_count = sum(1 for f in aux_files if Path(f).exists())
-            if aux_exist_count == 0:
-                console.print("[green]" + _("未检测到已有辅助文件，进行初始化") + "[/green]")
-            else:
-                console.print("[green]" + _("已检测到 %(n)s 个已有辅助文件") % {"n": aux_exist_count} + "[/green]")
-
-            if aux_moved_count == 0:
-                console.print("[green]" + _("没有检测到可迁移的辅助文件") + "[/green]")
-            else:
-                console.print("[yellow]" + _("已移动 %(n)s 个辅助文件到项目根目录") % {"n": aux_moved_count} + "[/yellow]")
-
-            RUN(
-                runtime_dict, project_name, compiled_program, out_files, aux_files,
-                outdir, auxdir, non_quiet, args.draft,
-            )
-
-            print_message(_("开始后处理"), "additional")
-
-            print("[yellow]" + _("移动结果文件到输出目录...") + "[/yellow]")
-            runtime_move_out_outdir, _ret = time_count(MRO.move_specific_files, out_files, ".", outdir)
-            runtime_dict[_("结果文件->输出目录")] = runtime_move_out_outdir
-
-            print("[yellow]" + _("移动辅助文件到辅助目录...") + "[/yellow]")
-            runtime_move_aux_auxdir, _ret = time_count(MRO.move_specific_files, aux_files, ".", auxdir)
-            runtime_dict[_("辅助文件->辅助目录")] = runtime_move_aux_auxdir
-
-            pytexlogs.run_log_pipeline(
-                project_name, auxdir, root_file=project_name,
-                pytexmk_version=__version__,
-                ref_tracker_translate_fn=set_language("log_parser"),
-            )
+            watch_mode = args.watch
+            try:
+                compile_project(runtime_dict, force=args.force)
+            except SystemExit:
+                # 编译失败时同样写出资源占用记录，便于定位超出内存限制的程序
+                if not job_mode:
+                    report_usage()
+                if not watch_mode:
+                    raise
+                logger.error(_("编译失败, 等待文件再次变化后重新编译"))
 
     if pdf_preview_status == "preview after compile":
         PFO.pdf_preview(project_name, outdir)
-        exit_pytexmk()
+        if not watch_mode:
+            check_for_updates()
+            exit_pytexmk()
 
+    if job_mode:
+        return runtime_dict
+
+    usage_records = report_usage()
     if runtime_dict:
-        time_print(start_time, runtime_dict)
+        time_print(start_time, runtime_dict, usage_records=usage_records)
+
+    if watch_mode:
+        watch_project()
 
-    UC = UpdateChecker(1, 6)
-    UC.check_for_updates()
+    check_for_updates()
@@ -0,0 +1,142 @@
+"""PyTeXMK 轻量客户端：存在后台守护进程时，把 argv / cwd / 环境变量转发给守护进程并回放输出与退出码。
+
+本模块是 `pytexmk` 命令的入口，只允许导入标准库中的轻量模块；
+守护进程不存在或连接失败时回退到 cli.__main__.main 在本进程内编译。
+"""
+import json
+import os
+import socket
+import stat
+import struct
+import sys
+
+FRAME_HEADER = struct.Struct("!cI")  # 帧类型 (o=stdout, e=stderr, x=退出码) + 长度 / 退出码
+# 需要终端交互或管理守护进程本身的参数不转发
+LOCAL_ONLY_ARGS = {"--daemon", "--daemon-stop", "-d", "--LaTeXDiff", "-dc", "--LaTeXDiff-compile"}
+
+
+def socket_dir() -> str:
+    """守护进程套接字所在目录：优先 $XDG_RUNTIME_DIR，否则为 /tmp 下仅当前用户可访问的 pytexmk-<uid> 目录。"""
+    return os.environ.get("XDG_RUNTIME_DIR") or os.path.join("/tmp", f"pytexmk-{os.getuid()}")
+
+
+def socket_path() -> str:
+    """守护进程套接字路径，文件名包含 uid 以区分用户。"""
+    return os.path.join(socket_dir(), f"pytexmk-{os.getuid()}.sock")
+
+
+def private_dir_ok(path: str) -> bool:
+    """目录属于当前用户、不是符号链接且其他用户无任何权限（0700）。"""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISDIR(st.st_mode) and st.st_uid == os.getuid() and not st.st_mode & 0o077
+
+
+def make_socket_dir() -> bool:
+    """创建（或确认）套接字目录，目录不安全时返回 False（如其他用户抢先创建了同名目录）。"""
+    try:
+        os.mkdir(socket_dir(), 0o700)
+    except FileExistsError:
+        pass
+    except OSError:
+        return False
+    return private_dir_ok(socket_dir())
+
+
+def socket_trusted(path: str) -> bool:
+    """套接字位于私有目录中，且是当前用户创建的套接字文件。"""
+    if not private_dir_ok(os.path.dirname(path)):
+        return False
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(st.st_mode) and st.st_uid == os.getuid()
+
+
+def peer_is_current_user(sock: socket.socket) -> bool:
+    """连接对端进程属于当前用户（Linux 的 SO_PEERCRED），不支持的平台只依赖 socket_trusted 的检查。"""
+    if not hasattr(socket, "SO_PEERCRED"):
+        return True
+    try:
+        creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    except OSError:
+        return False
+    _pid, uid, _gid = struct.unpack("3i", creds)
+    return uid == os.getuid()
+
+
+def send_request(sock: socket.socket, request: dict):
+    sock.sendall(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+
+
+def recv_exact(sock: socket.socket, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("daemon closed the connection")
+        data += chunk
+    return data
+
+
+def forward(argv: list[str]) -> int | None:
+    """将本次调用转发给守护进程，返回退出码；守护进程不可用时返回 None。"""
+    if not hasattr(socket, "AF_UNIX") or os.environ.get("PYTEXMK_NO_DAEMON"):
+        return None
+    if LOCAL_ONLY_ARGS.intersection(argv):
+        return None
+    # 转发内容包含全部环境变量，只连接当前用户自己的守护进程，任一检查失败即在本进程内编译
+    path = socket_path()
+    if not socket_trusted(path):
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+    if not peer_is_current_user(sock):
+        sock.close()
+        return None
+
+    isatty = sys.stdout.isatty()
+    try:
+        columns = os.get_terminal_size().columns if isatty else 0
+    except OSError:
+        columns = 0
+    with sock:
+        send_request(sock, {
+            "command": "run",
+            "argv": argv,
+            "cwd": os.getcwd(),
+            "env": dict(os.environ),
+            "isatty": isatty,
+            "columns": columns,
+        })
+        streams = {b"o": sys.stdout.buffer, b"e": sys.stderr.buffer}
+        try:
+            while True:
+                kind, value = FRAME_HEADER.unpack(recv_exact(sock, FRAME_HEADER.size))
+                if kind == b"x":
+                    return value
+                streams[kind].write(recv_exact(sock, value))
+                streams[kind].flush()
+        except ConnectionError:
+            return 1
+        except KeyboardInterrupt:
+            return 130
+
+
+def main():
+    """`pytexmk` 命令入口：优先交给守护进程，否则在本进程内运行。"""
+    exit_code = forward(sys.argv[1:])
+    if exit_code is not None:
+        sys.exit(exit_code)
+
+    from pytexmk.cli.__main__ import main as local_main
+
+    local_main()
@@ -0,0 +1,249 @@
+"""PyTeXMK 后台守护进程：预先导入 rich / pypdf / pytexlogs / 翻译目录等，按请求 fork 子进程执行编译。
+
+每个请求由一个 handler 子进程负责：再 fork 出 worker 子进程（切换到客户端 cwd 与环境变量后运行
+cli.__main__.main），handler 将 worker 的 stdout / stderr 分帧转发给客户端，最后发送退出码。
+客户端断开（例如 Ctrl+C）时 handler 向 worker 发送 SIGINT。fork 保证每次编译都从同一份已预热、
+未被污染的进程状态开始。
+"""
+import importlib
+import json
+import logging
+import os
+import select
+import signal
+import socket
+import sys
+import traceback
+
+from rich import print
+
+from pytexmk.cli.client import FRAME_HEADER, make_socket_dir, recv_exact, send_request, socket_path, socket_trusted
+from pytexmk.language import set_language
+
+_ = set_language("daemon")
+
+WARM_MODULES = (
+    "pytexmk.cli.__main__",
+    "pytexmk.cli.cli_workflow",
+    "pytexmk.compile_engine",
+    "pytexmk.detection",
+    "pytexmk.pdf_tools",
+    "pytexmk.latexdiff",
+    "pytexmk.config",
+    "pytexmk.logger_config",
+    "pytexmk.file_watcher",
+    "pytexmk.build_history",
+    "pytexmk.cli.check_version",
+    "pytexlogs",
+    "rich_argparse",
+    "pypdf",
+)
+REQUEST_TIMEOUT = 5.0  # 读取请求行的超时时间（秒）
+
+
+def _warm_up(logger):
+    for module in WARM_MODULES:
+        try:
+            importlib.import_module(module)
+        except Exception as e:  # noqa: BLE001
+            logger.warning(_("预加载模块失败: ") + f"{module} --> {e}")
+
+
+def _read_request(conn: socket.socket) -> dict | None:
+    conn.settimeout(REQUEST_TIMEOUT)
+    data = b""
+    try:
+        while not data.endswith(b"\n"):
+            chunk = conn.recv(64 * 1024)
+            if not chunk:
+                return None
+            data += chunk
+        return json.loads(data)
+    except (OSError, ValueError):
+        return None
+    finally:
+        conn.settimeout(None)
+
+
+def _run_worker(request: dict, out_fd: int, err_fd: int) -> int:
+    """worker 子进程：还原客户端的运行环境后执行一次 pytexmk。"""
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.dup2(out_fd, 1)
+    os.dup2(err_fd, 2)
+    os.environ.clear()
+    os.environ.update(request["env"])
+    if request.get("isatty") and "NO_COLOR" not in os.environ:
+        os.environ.setdefault("FORCE_COLOR", "1")
+    if request.get("columns"):
+        os.environ["COLUMNS"] = str(request["columns"])
+    os.chdir(request["cwd"])
+    sys.argv = ["pytexmk", *request["argv"]]
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+
+    # 控制台对象在预加载时已创建，按客户端终端重新初始化
+    import rich
+
+    from pytexmk.ui_theme import reset_console
+
+    rich.reconfigure()
+    reset_console()
+
+    from pytexmk.cli.__main__ import main
+
+    try:
+        main()
+        code = 0
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except KeyboardInterrupt:
+        code = 130
+    except BaseException:  # noqa: BLE001
+        traceback.print_exc()
+        code = 1
+    sys.stdout.flush()
+    sys.stderr.flush()
+    return code
+
+
+def _handle(conn: socket.socket, request: dict) -> int:
+    """handler 子进程：fork worker 并转发其输出，返回 worker 的退出码。"""
+    out_r, out_w = os.pipe()
+    err_r, err_w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        conn.close()
+        os.close(out_r)
+        os.close(err_r)
+        os._exit(_run_worker(request, out_w, err_w))
+    os.close(out_w)
+    os.close(err_w)
+
+    open_fds = {out_r: b"o", err_r: b"e"}
+    client_alive = True
+    while open_fds:
+        readable, _w, _x = select.select([*open_fds, conn] if client_alive else list(open_fds), [], [])
+        if conn in readable:
+            if not conn.recv(1):  # 客户端断开
+                client_alive = False
+                os.kill(pid, signal.SIGINT)
+            continue
+        for fd in readable:
+            data = os.read(fd, 64 * 1024)
+            if not data:
+                os.close(fd)
+                del open_fds[fd]
+                continue
+            if client_alive:
+                try:
+                    conn.sendall(FRAME_HEADER.pack(open_fds[fd], len(data)) + data)
+                except OSError:
+                    client_alive = False
+                    os.kill(pid, signal.SIGINT)
+
+    _pid, status = os.waitpid(pid, 0)
+    code = os.waitstatus_to_exitcode(status)
+    code = code if code >= 0 else 128 - code  # 被信号终止
+    if client_alive:
+        try:
+            conn.sendall(FRAME_HEADER.pack(b"x", code))
+        except OSError:
+            pass
+    return code
+
+
+def _reap_children():
+    while True:
+        try:
+            pid, _status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+
+
+def _daemon_running(path: str) -> bool:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+def serve():
+    """启动守护进程（前台运行），直到收到 stop 请求或 Ctrl+C。"""
+    logger = logging.getLogger(__name__)
+    if not hasattr(socket, "AF_UNIX") or not hasattr(os, "fork"):
+        logger.error(_("当前平台不支持守护进程模式"))
+        return
+    path = socket_path()
+    if not make_socket_dir():
+        logger.error(_("守护进程套接字目录不属于当前用户或其他用户可访问, 拒绝启动: ") + os.path.dirname(path))
+        return
+    if os.path.exists(path):
+        if _daemon_running(path):
+            print(_("[bold yellow]守护进程已在运行: ") + path)
+            return
+        os.unlink(path)
+
+    _warm_up(logger)
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)
+    try:
+        server.bind(path)
+    finally:
+        os.umask(old_umask)
+    server.listen(16)
+    server.settimeout(1.0)
+    print(_("[bold green]PyTeXMK 守护进程已启动: ") + path)
+
+    try:
+        while True:
+            _reap_children()
+            try:
+                conn, _addr = server.accept()
+            except TimeoutError:
+                continue
+            request = _read_request(conn)
+            if request is None:
+                conn.close()
+                continue
+            if request.get("command") == "stop":
+                conn.sendall(FRAME_HEADER.pack(b"x", 0))
+                conn.close()
+                break
+            if os.fork() == 0:
+                server.close()
+                code = 0
+                try:
+                    code = _handle(conn, request)
+                finally:
+                    os._exit(code)
+            conn.close()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        if os.path.exists(path):
+            os.unlink(path)
+        print(_("[bold green]PyTeXMK 守护进程已退出"))
+
+
+def stop_daemon():
+    """请求正在运行的守护进程退出。"""
+    path = socket_path()
+    if not socket_trusted(path) or not _daemon_running(path):
+        print(_("[bold yellow]没有正在运行的守护进程"))
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        send_request(sock, {"command": "stop"})
+        try:
+            recv_exact(sock, FRAME_HEADER.size)
+        except ConnectionError:
+            pass
+    print(_("[bold green]已停止守护进程: ") + path)
@@ -24,26 +24,45 @@ Description  :
 模块职责边界（架构 FR-A3）：负责【实际 subprocess 级编译执行 + 对检测的最小必要组合调用】。
   具体职责：
     1. LaTeX / BibTeX / Biber / MakeIndex / Glossaries / dvipdfmx 的真实 subprocess 调用。
+    2. 记录每个阶段读取 / 写出的文件到 self.graph（LaTeX 阶段来自 -recorder 生成的 .fls），
+       并将各工具创建的文件（.fls 输出 + 运行前后的目录列表差异）记录到 self.manifest。
+    3. 启用导言区格式缓存时，LaTeX 编译通过 -fmt 加载 format_cache 生成的导言区格式。
+    4. 原生目录模式下通过 -output-directory / --output-directory / 工作目录与 BIBINPUTS 等搜索路径，
+       让各工具直接在辅助目录中读写生成文件，编译前后不再移动辅助文件。
   调用依赖关系拓扑：
     compile_engine.RUN 实例化 CompileLaTeX 执行实际编译 + 检测编排。
     CompileLaTeX 通过 self.detector 持有 CompilationDetector 引用，检测方法直接走 .detector.*。
   下游依赖：
-    subprocess_runner / file_ops / version / pytexlogs / detection。
+    subprocess_runner / file_ops / build_manifest / dependency_graph / format_cache / stage_scheduler / tex_project / version / pytexlogs / detection。
 """
 
+import functools
+import os
 import shlex
 import logging
+from pathlib import Path
 
 import pytexlogs
 
+from pytexmk.build_manifest import BuildManifest
+from pytexmk.dependency_graph import DependencyGraph, index_command_files
 from pytexmk.file_ops import FileMoveRemoveManager
+from pytexmk.format_cache import FORMAT_ENGINES, FormatCache
 from pytexmk.language import set_language
 from pytexmk.lifecycle import exit_pytexmk
+from pytexmk.stage_scheduler import Stage
 from pytexmk.subprocess_runner import MySubProcess, SubprocessFailedError
+from pytexmk.tex_project import MainFileOperation
 from pytexmk.version import __version__
 
 _ = set_language("compile")
 
+# 原生目录模式下在辅助目录中运行的工具，通过 kpathsea 搜索路径找到项目根目录中的文件（末尾的分隔符保留默认搜索路径）
+TOOL_SEARCH_PATHS = {
+    "bibtex": ("BIBINPUTS", "BSTINPUTS"),
+    "makeindex": ("INDEXSTYLE",),
+}
+
 
 class CompileLaTeX:
     def __init__(
@@ -55,6 +74,9 @@ class CompileLaTeX:
         outdir,
         auxdir,
         non_quiet,
+        preamble_cache=False,
+        native_dirs=False,
+        track_dirs=True,
     ):
         self.logger = logging.getLogger(__name__)
 
@@ -65,9 +87,27 @@ class CompileLaTeX:
         self.auxdir = auxdir
         self.outdir = outdir
         self.non_quiet = non_quiet
+        # 原生目录模式：生成文件始终位于辅助目录，编译失败时也无需移动
+        self.native_dirs = native_dirs
+        self.build_dir = auxdir if native_dirs else "."
+        self.moved_out_files = [] if native_dirs else out_files
+        self.moved_aux_files = [] if native_dirs else aux_files
 
         self.MRO = FileMoveRemoveManager()
-        self.MSP = MySubProcess(outdir, auxdir, project_name)
+        self.MSP = MySubProcess(outdir, auxdir, project_name, quiet=not non_quiet)
+        # 沿用上次保存的依赖图，本次未执行的阶段保留原有记录
+        self.graph = DependencyGraph.load(project_name, auxdir) or DependencyGraph(project_name)
+        # 编译产物清单在多次编译间累积，清除时才删除
+        self.manifest = BuildManifest.load(project_name, auxdir) or BuildManifest(project_name)
+        # 外部程序可能写出文件的目录：常规模式下为根目录，原生目录模式下还有辅助目录；
+        # 多个主文件同时编译（-a）时目录差异无法区分各编译任务的文件，track_dirs 为 False，只记录 .fls 中的输出文件
+        self.tracked_dirs = ([".", auxdir] if native_dirs else ["."]) if track_dirs else []
+        # 输出目录与辅助目录（取第一级目录名）可能在编译期间新建，不属于任何编译阶段
+        self.reserved_dirs = [Path(folder).parts[0] for folder in (outdir, auxdir) if Path(folder).parts]
+        self.format_cache = None
+        self.format_path = None  # 可用的导言区格式（不含 .fmt 后缀），None 表示按常规方式编译
+        if preamble_cache and compiled_program in FORMAT_ENGINES:
+            self.format_cache = FormatCache(project_name, compiled_program, auxdir, quiet=not non_quiet)
 
         from .detection import CompilationDetector
         self.detector = CompilationDetector(
@@ -79,7 +119,51 @@ class CompileLaTeX:
             auxdir=self.auxdir,
             non_quiet=self.non_quiet,
             MRO=self.MRO,
+            native_dirs=native_dirs,
+        )
+
+    def prepare_format(self):
+        """准备导言区格式（缓存有效时直接使用，否则重新生成），并将格式读取的文件记录到依赖图。"""
+        stage = f"{self.compiled_program.lower()} format"
+        self.format_path = self.format_cache.prepare()
+        if self.format_path is None:
+            self.graph.stages.pop(stage, None)
+            return
+        self.graph.record_stage(stage, self.format_cache.inputs, [])
+
+    def _abort(self):
+        """外部程序失败：保存编译产物清单（常规模式下将清单中的文件移回辅助目录）、分析日志后退出。"""
+        if not self.native_dirs:
+            self.MRO.move_specific_files(
+                [f for f in self.manifest.files(exclude=self.out_files) if Path(f).exists()], ".", self.auxdir,
+            )
+        self.manifest.save(self.auxdir)
+        pytexlogs.run_log_pipeline(
+            self.project_name, self.auxdir, root_file=None,
+            pytexmk_version=__version__,
+            ref_tracker_translate_fn=set_language("log_parser"),
         )
+        exit_pytexmk()
+
+    def record_outputs(self, stage: str):
+        """将依赖图中某一阶段写出的文件并入编译产物清单。"""
+        self.manifest.record(stage, self.graph.stages.get(stage, {"outputs": []})["outputs"])
+
+    def prepare_build_dirs(self):
+        """原生目录模式：在辅助目录中建立与 \\include 子文件所在目录对应的子目录（TeX 不会自动创建目录，子 .aux 无法写出）。"""
+        tex_dirs = {Path(f).parent for f in MainFileOperation().find_input_files(self.project_name) if f.endswith(".tex")}
+        tex_dirs.update(Path(f).parent for f in self.graph.generated_files())
+        for tex_dir in tex_dirs:
+            if not tex_dir.is_absolute() and ".." not in tex_dir.parts:
+                (Path(self.auxdir) / tex_dir).mkdir(parents=True, exist_ok=True)
+
+    def tool_env(self, program: str) -> dict[str, str]:
+        """原生目录模式下在辅助目录中运行的工具所需的环境变量：将项目根目录加入其 kpathsea 搜索路径。"""
+        root = str(Path(".").resolve())
+        env = dict(os.environ)
+        for var in TOOL_SEARCH_PATHS[program]:
+            env[var] = f"{root}{os.pathsep}{os.environ.get(var, '')}"
+        return env
 
     def compile_tex(self):
 
@@ -89,6 +173,7 @@ class CompileLaTeX:
             "-file-line-error",
             "-halt-on-error",
             "-synctex=1",
+            "-recorder",
             f"{self.project_name}.tex",
         ]
         if self.compiled_program == "XeLaTeX":
@@ -97,59 +182,123 @@ class CompileLaTeX:
             command.insert(4, "-interaction=nonstopmode")
         else:
             command.insert(4, "-interaction=batchmode")
+        if self.format_path is not None:
+            command.insert(-1, f"-fmt={self.format_path}")
+        if self.native_dirs:
+            command.insert(-1, f"-output-directory={self.auxdir}")
 
+        # 引擎运行期间逐行匹配重新编译警告等信息，进程退出时判定结果即已就绪
+        self.detector.output_watcher.reset()
         try:
-            self.MSP.run_command(
-                command, self.out_files, self.aux_files, self.compiled_program
-            )
+            with self.manifest.track(self.compiled_program.lower(), self.tracked_dirs, self.reserved_dirs):
+                self.MSP.run_command(
+                    command, self.moved_out_files, self.moved_aux_files, self.compiled_program,
+                    line_observers=[self.detector.output_watcher],
+                )
         except SubprocessFailedError:
-            pytexlogs.run_log_pipeline(
-                self.project_name, self.auxdir, root_file=None,
-                pytexmk_version=__version__,
-                ref_tracker_translate_fn=set_language("log_parser"),
-            )
-            exit_pytexmk()
+            self._abort()
+        self.graph.record_fls(
+            self.compiled_program.lower(),
+            Path(self.build_dir) / f"{self.project_name}.fls",
+            exclude_inputs=[f"{self.format_path}.fmt"] if self.format_path is not None else None,
+            build_dir=self.auxdir if self.native_dirs else None,
+        )
+        self.record_outputs(self.compiled_program.lower())
+
+    def round_state(self) -> dict[str, str]:
+        """下一次 LaTeX 编译将读取的生成文件（依赖图中 LaTeX 阶段读取、且由某一阶段生成的文件）及其摘要。"""
+        generated = set(self.graph.outputs())
+        stage = self.graph.stages.get(self.compiled_program.lower(), {"inputs": []})
+        files = [f for f in stage["inputs"] if f in generated and not Path(f).is_absolute()]
+        if not files:
+            files = [f"{self.project_name}{suffix}" for suffix in (".aux", ".toc", ".out")]
+        return self.detector.state_digests(files)
+
+    def bib_stage_files(self, bib_engine) -> tuple[list[str], list[str]]:
+        """文献阶段读取与写出的文件：.aux / .bcf + 文献库 → .bbl / .blg。"""
+        bib_inputs = [f"{self.project_name}.bcf" if bib_engine == "biber" else f"{self.project_name}.aux"]
+        for bib_name in self.detector.bib_file.split(","):
+            bib_path = Path(bib_name.strip())
+            if bib_name.strip() and bib_path.suffix != ".bib":
+                bib_path = Path(f"{bib_path}.bib")
+            if bib_path.is_file():
+                bib_inputs.append(bib_path.as_posix())
+        if not self.detector.bib_file and bib_engine in self.graph.stages:
+            # 监视模式下先于检测执行时尚未解析文献库，沿用上次记录的输入文件
+            bib_inputs = self.graph.stages[bib_engine]["inputs"]
+        return bib_inputs, [f"{self.project_name}.bbl", f"{self.project_name}.blg"]
 
-    def compile_bib(self, bib_engine):
+    def compile_bib(self, bib_engine, show_status=True):
         command = [bib_engine, self.project_name]
+        cwd = env = None
+        if self.native_dirs and bib_engine == "biber":
+            command.insert(1, f"--output-directory={self.auxdir}")
+        elif self.native_dirs:
+            # BibTeX 没有输出目录选项：在辅助目录中运行，文献库与 .bst 样式通过 BIBINPUTS / BSTINPUTS 在根目录中查找
+            cwd, env = self.auxdir, self.tool_env("bibtex")
 
         if not self.non_quiet and bib_engine == "biber":
             command.insert(1, "-quiet")
 
         try:
-            self.MSP.run_command(command, self.out_files, self.aux_files, bib_engine)
+            with self.manifest.track(bib_engine, self.tracked_dirs, self.reserved_dirs):
+                self.MSP.run_command(
+                    command, self.moved_out_files, self.moved_aux_files, bib_engine, show_status=show_status,
+                    cwd=cwd, env=env,
+                )
         except SubprocessFailedError:
-            pytexlogs.run_log_pipeline(
-                self.project_name, self.auxdir, root_file=None,
-                pytexmk_version=__version__,
-                ref_tracker_translate_fn=set_language("log_parser"),
-            )
-            exit_pytexmk()
+            self._abort()
+        self.graph.record_stage(bib_engine, *self.bib_stage_files(bib_engine))
+        self.record_outputs(bib_engine)
 
-    def compile_index(self, cmd):
+    def compile_index(self, cmd, show_status=True):
         name_target = f"{cmd[0]}"
         command = shlex.split(cmd[1])
+        cwd = env = None
+        if self.native_dirs:
+            # 索引命令中的文件名均相对生成文件目录，在辅助目录中运行，根目录中的 .ist 样式通过 INDEXSTYLE 查找
+            cwd, env = self.auxdir, self.tool_env("makeindex")
         try:
-            self.MSP.run_command(command, self.out_files, self.aux_files, cmd[0])
+            with self.manifest.track(name_target, self.tracked_dirs, self.reserved_dirs):
+                self.MSP.run_command(
+                    command, self.moved_out_files, self.moved_aux_files, cmd[0], show_status=show_status,
+                    cwd=cwd, env=env,
+                )
         except SubprocessFailedError:
-            pytexlogs.run_log_pipeline(
-                self.project_name, self.auxdir, root_file=None,
-                pytexmk_version=__version__,
-                ref_tracker_translate_fn=set_language("log_parser"),
-            )
-            exit_pytexmk()
+            self._abort()
+        self.graph.record_stage(name_target, *index_command_files(cmd[1]), command=cmd[1])
+        self.record_outputs(name_target)
         return name_target
 
+    def tool_stages(self, bib_engine, index_run_cmds) -> list[Stage]:
+        """将检测结果（文献引擎 + 索引命令）转换为可调度的阶段列表。"""
+        stages = []
+        if bib_engine:
+            stages.append(Stage(
+                bib_engine,
+                functools.partial(self.compile_bib, bib_engine),
+                *self.bib_stage_files(bib_engine),
+            ))
+        for cmd in index_run_cmds:
+            stages.append(Stage(
+                cmd[0],
+                functools.partial(self.compile_index, cmd),
+                *index_command_files(cmd[1]),
+            ))
+        return stages
+
     def compile_xdv(self):
         command = ["dvipdfmx", "-V", "2.0", f"{self.project_name}"]
+        if self.native_dirs:
+            # .xdv 位于辅助目录，PDF 直接写入输出目录
+            Path(self.outdir).mkdir(parents=True, exist_ok=True)
+            command[-1:] = ["-o", str(Path(self.outdir) / f"{self.project_name}.pdf"), str(Path(self.auxdir) / f"{self.project_name}.xdv")]
         if not self.non_quiet:
             command.insert(1, "-q")
         try:
-            self.MSP.run_command(command, self.out_files, self.aux_files, "dvipdfmx")
+            with self.manifest.track("dvipdfmx", self.tracked_dirs, self.reserved_dirs):
+                self.MSP.run_command(command, self.moved_out_files, self.moved_aux_files, "dvipdfmx")
         except SubprocessFailedError:
-            pytexlogs.run_log_pipeline(
-                self.project_name, self.auxdir, root_file=None,
-                pytexmk_version=__version__,
-                ref_tracker_translate_fn=set_language("log_parser"),
-            )
-            exit_pytexmk()
+            self._abort()
+        self.graph.record_stage("dvipdfmx", [f"{self.project_name}.xdv"], [f"{self.project_name}.pdf"])
+        self.record_outputs("dvipdfmx")
@@ -23,21 +23,26 @@ Description  :
  -----------------------------------------------------------------------
 模块职责边界（架构 FR-A3）：负责【主编译流程编排 + while 收敛调度】。
   具体职责：
-    1. while 收敛循环的驱动、max_extra_compilations=10 安全上限、草稿模式开关。
-    2. 子步骤时间统计：缩写序数 1st/2nd/... 对应 runtime_dict 写入。
+    1. while 收敛循环的驱动、草稿模式开关、导言区格式缓存开关。
+       每轮记录生成文件的规范化摘要（detection.RoundHistory），状态重复（不动点 / 循环）即停止，
+       max_extra_compilations=10 仅作为最后的安全上限。
+    2. 子步骤时间统计：缩写序数 1st/2nd/... 对应 runtime_dict 写入；文献 / 索引阶段交给 stage_scheduler 并发调度。
     3. XeLaTeX 专属 dvipdfmx 后置调度；最终「完成所有编译」Banner 打印。
+    4. 编译结束后将各阶段的依赖图与编译产物清单保存到辅助目录，供编译状态判定与辅助文件移动 / 清理使用。
   调用依赖关系拓扑：
     cli.cli_workflow.run_workflow 通过 `from ..compile_engine import RUN, LaTeXDiffRUN` 作为唯一入口调用；
     compile_engine.py 实例化 compile.CompileLaTeX 执行实际编译 + 检测编排。
   下游依赖：
-    compile / compile_report / tex_project / timing / ui_messages / language。
+    compile / compile_report / detection / stage_scheduler / tex_project / timing / ui_messages / language。
 """
 
 from pytexmk.compile import CompileLaTeX
 from pytexmk.compile_report import print_compile_report, print_compile_separator
+from pytexmk.detection import RoundHistory
 from pytexmk.language import set_language
+from pytexmk.stage_scheduler import run_stages
 from pytexmk.tex_project import MainFileOperation
-from pytexmk.timing import time_count
+from pytexmk.timing import span, time_count
 from pytexmk.ui_messages import print_message
 
 _ = set_language("compile_engine")
@@ -66,9 +71,21 @@ def RUN(
     auxdir,
     non_quiet,
     draft,
+    pre_stages=None,
+    preamble_cache=False,
+    round_log=None,
+    native_dirs=False,
+    track_dirs=True,
 ):
     # 草稿模式函数启用
-    """主编译流程：草稿模式、多轮 LaTeX/Bib/Index 编译、统计时长。"""
+    """主编译流程：草稿模式、多轮 LaTeX/Bib/Index 编译、统计时长。
+
+    pre_stages 为监视模式下需要在 LaTeX 编译前重新执行的文献 / 索引阶段，元素为 (阶段名, 索引命令或 None)。
+    preamble_cache 为 True 时先准备导言区格式缓存，各次 LaTeX 编译均加载该格式。
+    round_log 为列表时，按轮追加每次 LaTeX 编译后的检测结果 dims（供编译历史记录使用）。
+    native_dirs 为 True 时各工具直接在辅助目录中读写生成文件（原生目录模式），编译前后无需移动辅助文件。
+    track_dirs 为 False 时编译产物清单不比较目录列表（-a 模式下多个主文件同时编译），只记录 .fls 中的输出文件。
+    """
     MFO.draft_model(project_name, draft, True)
 
     abbreviations_num = (
@@ -77,62 +94,83 @@ def RUN(
     )
     # 编译前的准备工作
     compile_model = CompileLaTeX(
-        project_name, compiled_program, out_files, aux_files, outdir, auxdir, non_quiet
+        project_name, compiled_program, out_files, aux_files, outdir, auxdir, non_quiet,
+        preamble_cache=preamble_cache, native_dirs=native_dirs, track_dirs=track_dirs,
     )
+    if native_dirs:
+        compile_model.prepare_build_dirs()
+
+    # 导言区格式缓存：导言区或其引入的宏包变化时重新生成
+    if compile_model.format_cache is not None:
+        with span(_("导言区格式缓存")):
+            runtime_format, _ret = time_count(compile_model.prepare_format)
+        runtime_dict[_("导言区格式缓存")] = runtime_format
+
+    # 输入文件仅影响文献 / 索引阶段时，先重新执行这些阶段，再进行 LaTeX 编译
+    if pre_stages:
+        run_stages(
+            compile_model.tool_stages(
+                next((stage for stage, command in pre_stages if command is None), None),
+                [(stage, command) for stage, command in pre_stages if command is not None],
+            ),
+            runtime_dict,
+        )
 
-    runtime_read, return_read = time_count(
-        compile_model.detector.prepare_LaTeX_output_files,
-    )  # 读取 LaTeX 文件
+    with span(_("检测辅助文件"), cat="detection"):
+        runtime_read, return_read = time_count(
+            compile_model.detector.prepare_LaTeX_output_files,
+        )  # 读取 LaTeX 文件
     cite_counter, toc_file, index_aux_content_dict_old = (
         return_read  # 获取 read_LaTeX_files 函数得到的参数
     )
     runtime_dict[_("检测辅助文件")] = runtime_read
 
-    aux_content_old, out_content_old = compile_model.detector.prepare_aux_out_snapshots()
+    aux_digest_old, out_content_old = compile_model.detector.prepare_aux_out_snapshots()
 
     # 首次编译 LaTeX 文档
     print_message(_("1 次 %(args)s 编译") % {"args": compiled_program}, "running")
-    runtime_Latex, _ret = time_count(
-        compile_model.compile_tex,
-    )
+    with span(f"{compiled_program} {abbreviations_num[0]}", cat="pass"):
+        runtime_Latex, _ret = time_count(
+            compile_model.compile_tex,
+        )
     runtime_dict[f"{compiled_program} {abbreviations_num[0]}"] = runtime_Latex
 
     # 首次编译后：run_full_detection 聚合 6 维检测 + 返回子步骤 schedule 所需值
-    runtime_detect, return_detect = time_count(
-        compile_model.detector.run_full_detection,
-        cite_counter_old=cite_counter,
-        toc_file_old=toc_file,
-        index_aux_content_old=index_aux_content_dict_old,
-        aux_content_old=aux_content_old,
-        out_content_old=out_content_old,
-    )
-    dims, Latex_compilation_times, bib_engine, index_run_cmds, Latex_compilation_times_bib = return_detect
-    runtime_dict[_("编译文献判定")] = runtime_detect
-    runtime_dict[_("编译索引判定")] = runtime_detect
-
-    # 编译参考文献
-    if bib_engine and Latex_compilation_times_bib != 0:
-        print_message(_("%(args)s 编译文献") % {"args": bib_engine}, "running")
-        runtime_bib, _ret = time_count(
-            compile_model.compile_bib, bib_engine
-        )  # 编译参考文献
-        name_target_bib = bib_engine
-        runtime_dict[_("%(args)s 编译") % {"args": name_target_bib}] = runtime_bib
-
-    # 编译索引
-    if index_run_cmds:  # 存在目录索引编译命令
-        for cmd in index_run_cmds:
-            print_message(_("%(args)s 编译") % {"args": cmd[0]}, "running")
-            runtime_index, return_index = time_count(compile_model.compile_index, cmd)
-            name_target_index = return_index  # 获取 compile_index 函数得到的参数
-            runtime_dict[_("%(args)s 编译") % {"args": name_target_index}] = (
-                runtime_index
+    with span(_("编译状态检测"), cat="detection"):
+        dims, Latex_compilation_times, bib_engine, index_run_cmds, Latex_compilation_times_bib = (
+            compile_model.detector.run_full_detection(
+                cite_counter_old=cite_counter,
+                toc_file_old=toc_file,
+                index_aux_content_old=index_aux_content_dict_old,
+                aux_digest_old=aux_digest_old,
+                out_content_old=out_content_old,
             )
+        )
+    if round_log is not None:
+        round_log.append(dims)
+    runtime_dict[_("编译文献判定")] = compile_model.detector.dimension_times["bib"]
+    runtime_dict[_("编译索引判定")] = compile_model.detector.dimension_times["idx"]
+
+    # 编译参考文献与索引：按读写文件构建 DAG，互不依赖的阶段并发执行
+    run_stages(
+        compile_model.tool_stages(
+            bib_engine if Latex_compilation_times_bib != 0 else None,
+            index_run_cmds or [],
+        ),
+        runtime_dict,
+    )
 
     total_compilations = 1
     current_times = 1
     max_extra_compilations = 10  # 最大额外编译次数上限，防止死循环
 
+    # 记录每次 LaTeX 编译前生成文件的状态，状态重复时继续编译不会得到新结果
+    history = RoundHistory()
+    stop_reason, oscillating_files = None, []
+    if Latex_compilation_times > 0:
+        with span(_("生成文件状态"), cat="detection"):
+            stop_reason, oscillating_files = history.record(compile_model.round_state())
+
     print_compile_separator()
     print_compile_report(
         round_index=1,
@@ -144,16 +182,21 @@ def RUN(
         max_extra=max_extra_compilations,
     )
 
-    # 进行额外的 LaTeX 编译（迭代收敛直到所有维度均返回 0，或达到安全上限）
-    while Latex_compilation_times > 0 and (current_times - 1) < max_extra_compilations:
+    # 进行额外的 LaTeX 编译（迭代收敛直到所有维度均返回 0、生成文件状态重复，或达到安全上限）
+    while (
+        Latex_compilation_times > 0
+        and stop_reason is None
+        and (current_times - 1) < max_extra_compilations
+    ):
         current_times += 1
         total_compilations += 1
 
         # 本轮编译前：更新基线并保存快照
-        cite_counter, toc_file, index_aux_content_dict_old = (
-            compile_model.detector.prepare_LaTeX_output_files()
-        )
-        aux_content_old, out_content_old = compile_model.detector.prepare_aux_out_snapshots()
+        with span(_("检测辅助文件"), cat="detection"):
+            cite_counter, toc_file, index_aux_content_dict_old = (
+                compile_model.detector.prepare_LaTeX_output_files()
+            )
+            aux_digest_old, out_content_old = compile_model.detector.prepare_aux_out_snapshots()
 
         # 执行本轮 LaTeX 编译
         print_message(
@@ -161,27 +204,36 @@ def RUN(
             % {"args1": str(current_times), "args2": compiled_program},
             "running",
         )
-        runtime_Latex, _ret = time_count(
-            compile_model.compile_tex,
-        )
+        with span(f"{compiled_program} {abbreviations_num[current_times - 1]}", cat="pass"):
+            runtime_Latex, _ret = time_count(
+                compile_model.compile_tex,
+            )
         runtime_dict[f"{compiled_program} {abbreviations_num[current_times - 1]}"] = (
             runtime_Latex
         )
 
         # 本轮编译后：run_full_detection 聚合 6 维检测
-        dims, Latex_compilation_times, _bib_eng, index_run_cmds, _tbib = (
-            compile_model.detector.run_full_detection(
-                cite_counter_old=cite_counter,
-                toc_file_old=toc_file,
-                index_aux_content_old=index_aux_content_dict_old,
-                aux_content_old=aux_content_old,
-                out_content_old=out_content_old,
+        with span(_("编译状态检测"), cat="detection"):
+            dims, Latex_compilation_times, _bib_eng, index_run_cmds, _tbib = (
+                compile_model.detector.run_full_detection(
+                    cite_counter_old=cite_counter,
+                    toc_file_old=toc_file,
+                    index_aux_content_old=index_aux_content_dict_old,
+                    aux_digest_old=aux_digest_old,
+                    out_content_old=out_content_old,
+                )
             )
-        )
 
+        if round_log is not None:
+            round_log.append(dims)
+
+        if Latex_compilation_times > 0:
+            with span(_("生成文件状态"), cat="detection"):
+                stop_reason, oscillating_files = history.record(compile_model.round_state())
         reached_limit = (
             (current_times - 1) >= max_extra_compilations
             and Latex_compilation_times > 0
+            and stop_reason is None
         )
         print_compile_separator()
         print_compile_report(
@@ -192,16 +244,23 @@ def RUN(
             compiled_program=standardize_name(compiled_program),
             reached_limit=reached_limit,
             max_extra=max_extra_compilations,
+            stop_reason=stop_reason,
+            oscillating_files=oscillating_files,
         )
 
     # 编译完成, 开始判断编译 XDV 文件
     if compiled_program == "XeLaTeX":  # 判断是否编译 xdv 文件
         print_message(_("DVIPDFMX 编译"), "running")
-        runtime_xdv, _ret = time_count(
-            compile_model.compile_xdv,
-        )  # 编译 xdv 文件
+        with span(_("DVIPDFMX 编译"), cat="pass"):
+            runtime_xdv, _ret = time_count(
+                compile_model.compile_xdv,
+            )  # 编译 xdv 文件
         runtime_dict[_("DVIPDFMX 编译")] = runtime_xdv
 
+    # 保存依赖图（各阶段读取 / 写出的文件）与编译产物清单（各工具创建的文件）
+    compile_model.graph.save(auxdir)
+    compile_model.manifest.save(auxdir)
+
     # 显示编译过程中关键信息
     print_message(_("完成所有编译"), "success")
 
@@ -256,6 +315,9 @@ def LaTeXDiffRUN(
         )  # 编译 xdv 文件
         runtime_dict[_("DVIPDFMX 编译")] = runtime_xdv
 
+    # 保存编译产物清单，供移动与清除辅助文件使用
+    compile_model.manifest.save(auxdir)
+
     # 显示编译过程中关键信息
     print_message(_("完成所有编译"), "success")
 
@@ -51,6 +51,8 @@ def print_compile_report(
     prog: str = "",
     reached_limit: bool = False,
     max_extra: int = 10,
+    stop_reason: str | None = None,
+    oscillating_files: list[str] | None = None,
 ) -> None:
     try:
         raw_program = compiled_program if compiled_program else prog
@@ -93,6 +95,19 @@ def print_compile_report(
                 f"[yellow]" + _("需额外进行 %(next)s 次 %(prog)s 编译。") % {"next": actual_next, "prog": actual_program} + "[/yellow]"
             )
 
+        if stop_reason == "fixpoint":
+            console.print(
+                f"[bold yellow]" + _("生成文件与上一轮编译前完全相同（已达到不动点），继续编译不会改变结果，停止调度。") + "[/bold yellow]"
+            )
+        elif stop_reason == "cycle":
+            console.print(
+                f"[bold red]" + _("生成文件在多轮编译间循环变化，继续编译无法收敛，停止调度。") + "[/bold red]"
+            )
+            if oscillating_files:
+                console.print(
+                    f"[red]" + _("振荡文件：%(files)s") % {"files": ", ".join(oscillating_files)} + "[/red]"
+                )
+
         if reached_limit:
             console.print(
                 f"[bold red]" + _("已达 %(max_extra)s 次额外编译安全上限，停止调度。") % {"max_extra": max_extra} + "[/bold red]"
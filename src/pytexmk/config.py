@@ -1,5 +1,6 @@
 """配置管理模块：加载/生成/校验用户配置与项目配置 TOML 文件。"""
 import logging
+import os
 import tomllib
 from collections import defaultdict
 from pathlib import Path
@@ -86,8 +87,11 @@ class ConfigParser:
                 path.parent.mkdir(parents=True, exist_ok=True)  # 创建父目录
                 with open(self.data_dir / config_file, "r", encoding="utf-8") as f:
                     default_config = f.read()
-                with open(path, "w", encoding="utf-8") as f:
+                # 先写临时文件再替换：-a 模式下多个任务可能同时创建项目配置文件，其他任务不能读到写了一半的文件
+                tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+                with open(tmp_path, "w", encoding="utf-8") as f:
                     f.write(default_config)
+                os.replace(tmp_path, path)
             except Exception as e:  # noqa: BLE001
                 self.logger.error(_("创建默认配置文件失败: ") + f"{path} --> {e}")
         else:
@@ -165,6 +169,23 @@ class ConfigParser:
             else:
                 self.logger.error(_("无效输入，请输入如下选项: yes/no 或 y/n"))
 
+    def update_check_enabled(self) -> bool:
+        """读取用户配置中的 update_check 开关，不创建或修正配置文件。
+
+        Returns
+        -------
+        bool
+            是否检查新版本；配置文件或配置项不存在时默认检查。
+        """
+        if self.user_config_path is None or not self.user_config_path.exists():
+            return True
+        try:
+            with open(self.user_config_path, "rb") as f:
+                config = tomllib.load(f)
+        except Exception:  # noqa: BLE001
+            return True  # 配置文件格式错误留给 init_config_file 报告
+        return config.get("update_check", True) is not False
+
     def init_config_file(self) -> dict[str, Any]:
         """初始化配置文件。
         加载用户配置和项目配置文件, 优先使用项目配置。
@@ -0,0 +1,196 @@
+"""编译依赖图：解析 -recorder 生成的 .fls 文件，记录每个编译阶段读取与写出的文件。
+
+依赖图以「阶段 → 输入文件 / 输出文件」的形式保存在辅助目录下的 <主文件名>.deps.json 中，
+供编译状态判定、辅助文件移动与清理使用。
+"""
+import json
+import logging
+import shlex
+from pathlib import Path
+
+from pytexmk.language import set_language
+
+_ = set_language("dependency_graph")
+
+GRAPH_SUFFIX = ".deps.json"
+GRAPH_FORMAT = 1
+BIB_STAGES = ("bibtex", "biber")
+
+
+def _normalize_path(path: str, pwd: Path, root: Path) -> str:
+    """将 .fls 中的路径统一为：项目内文件用相对 posix 路径，项目外文件用绝对 posix 路径。"""
+    file_path = Path(path)
+    if not file_path.is_absolute():
+        file_path = pwd / file_path
+    try:
+        return file_path.resolve().relative_to(root).as_posix()
+    except ValueError:
+        return file_path.resolve().as_posix()
+
+
+def parse_fls(fls_path: str | Path, root: str | Path = ".") -> tuple[list[str], list[str]]:
+    """解析 .fls 文件，返回 (INPUT 文件列表, OUTPUT 文件列表)，保持首次出现顺序并去重。"""
+    root = Path(root).resolve()
+    pwd = root
+    inputs: dict[str, None] = {}
+    outputs: dict[str, None] = {}
+    with open(fls_path, "r", encoding="utf-8", errors="replace") as fobj:
+        for line in fobj:
+            kind, _sep, value = line.rstrip("\r\n").partition(" ")
+            if not value or value.endswith("(busy)"):  # synctex 写入中的临时文件
+                continue
+            if kind == "PWD":
+                pwd = Path(value)
+            elif kind == "INPUT":
+                inputs[_normalize_path(value, pwd, root)] = None
+            elif kind == "OUTPUT":
+                outputs[_normalize_path(value, pwd, root)] = None
+    return list(inputs), list(outputs)
+
+
+def index_command_files(command: str) -> tuple[list[str], list[str]]:
+    """推断 makeindex 命令读取与写出的文件：输入文件 + 样式文件 → 输出文件 + .ilg 日志。"""
+    args = shlex.split(command)[1:]
+    inputs, outputs = [], []
+    output_file = None
+    i = 0
+    while i < len(args):
+        if args[i] in ("-s", "-o", "-t") and i + 1 < len(args):
+            if args[i] == "-s":
+                inputs.append(args[i + 1])
+            elif args[i] == "-o":
+                output_file = args[i + 1]
+            else:
+                outputs.append(args[i + 1])
+            i += 2
+            continue
+        if not args[i].startswith("-"):
+            inputs.append(args[i])
+        i += 1
+    source = next((f for f in reversed(inputs) if not f.endswith(".ist")), None)
+    if source is not None:
+        stem = Path(source).with_suffix("")
+        outputs.append(output_file or f"{stem}.ind")
+        if not any(f.endswith(".ilg") for f in outputs):
+            outputs.append(f"{stem}.ilg")
+    return inputs, outputs
+
+
+class DependencyGraph:
+    """编译依赖图：stage 名称（xelatex / biber / glossaries main / dvipdfmx …）→ 输入 / 输出文件。"""
+
+    def __init__(self, project_name: str):
+        self.logger = logging.getLogger(__name__)
+        self.project_name = project_name
+        self.stages: dict[str, dict[str, list[str]]] = {}
+
+    @staticmethod
+    def graph_path(project_name: str, auxdir: str) -> Path:
+        return Path(auxdir) / f"{project_name}{GRAPH_SUFFIX}"
+
+    def record_stage(self, stage: str, inputs: list[str], outputs: list[str], command: str | None = None):
+        """记录（覆盖）某一阶段的输入与输出文件；command 为重新执行该阶段所需的命令（索引类阶段）。"""
+        self.stages[stage] = {"inputs": list(dict.fromkeys(inputs)), "outputs": list(dict.fromkeys(outputs))}
+        if command is not None:
+            self.stages[stage]["command"] = command
+
+    def record_fls(
+        self, stage: str, fls_path: str | Path, exclude_inputs: list[str] | None = None, build_dir: str | None = None,
+    ) -> bool:
+        """读取 LaTeX 引擎 -recorder 生成的 .fls 文件并记录为一个阶段，文件不存在时返回 False。
+
+        exclude_inputs 中的文件（如导言区格式缓存）不记录为输入文件。
+        build_dir 为引擎的 -output-directory（原生目录模式）：其中的文件记录为相对 build_dir 的路径，
+        与常规模式下根目录中的生成文件同名，依赖图不随编译模式变化。
+        """
+        try:
+            inputs, outputs = parse_fls(fls_path)
+        except OSError as e:
+            self.logger.warning(_("读取 .fls 文件失败: ") + f"{fls_path} --> {e}")
+            return False
+        root = Path(".").resolve()
+        if exclude_inputs:
+            excluded = {_normalize_path(path, root, root) for path in exclude_inputs}
+            inputs = [f for f in inputs if f not in excluded]
+        outputs.append(_normalize_path(str(fls_path), root, root))
+        if build_dir is not None:
+            prefix = _normalize_path(build_dir, root, root) + "/"
+            inputs = [f.removeprefix(prefix) for f in inputs]
+            outputs = [f.removeprefix(prefix) for f in outputs]
+        self.record_stage(stage, inputs, outputs)
+        self.logger.info(
+            _("依赖图已记录 %(stage)s: 输入文件 %(inputs)s 个, 输出文件 %(outputs)s 个")
+            % {"stage": stage, "inputs": len(inputs), "outputs": len(outputs)}
+        )
+        return True
+
+    def inputs(self) -> list[str]:
+        return list(dict.fromkeys(f for stage in self.stages.values() for f in stage["inputs"]))
+
+    def outputs(self) -> list[str]:
+        return list(dict.fromkeys(f for stage in self.stages.values() for f in stage["outputs"]))
+
+    def source_inputs(self) -> list[str]:
+        """真正的源文件：被读取但不是由任何编译阶段生成的文件（排除 .aux / .toc / .bbl 等中间文件）。"""
+        generated = set(self.outputs())
+        return [f for f in self.inputs() if f not in generated]
+
+    def generated_files(self, exclude: list[str] | None = None) -> list[str]:
+        """编译生成、位于项目目录内的文件（相对路径），exclude 中的文件（通常为输出结果文件）除外。"""
+        excluded = set(exclude or [])
+        return [f for f in self.outputs() if not Path(f).is_absolute() and f not in excluded]
+
+    def stages_reading(self, path: str) -> list[str]:
+        """返回读取了指定文件的阶段名称列表。"""
+        return [name for name, stage in self.stages.items() if path in stage["inputs"]]
+
+    def affected_stages(self, paths: list[str]) -> list[str] | None:
+        """返回读取了任一变化文件的阶段；存在未被任何阶段记录的文件时返回 None（需完整编译）。"""
+        stages: dict[str, None] = {}
+        for path in paths:
+            readers = self.stages_reading(path)
+            if not readers:
+                return None
+            stages.update(dict.fromkeys(readers))
+        return list(stages)
+
+    def tool_stages_for(self, paths: list[str]) -> list[tuple[str, str | None]] | None:
+        """变化文件只被文献 / 索引阶段读取时，返回需在 LaTeX 编译前重新执行的 (阶段名, 索引命令或 None)。
+
+        例如 .bib 修改只需重新执行 biber / bibtex 再进行 LaTeX 编译；返回 None 表示从 LaTeX 编译开始即可。
+        """
+        stages = self.affected_stages(paths)
+        if not stages:
+            return None
+        if not all(stage in BIB_STAGES or "command" in self.stages[stage] for stage in stages):
+            return None
+        return [(stage, self.stages[stage].get("command")) for stage in stages]
+
+    def save(self, auxdir: str):
+        graph_path = self.graph_path(self.project_name, auxdir)
+        data = {"format": GRAPH_FORMAT, "project": self.project_name, "stages": self.stages}
+        try:
+            graph_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(graph_path, "w", encoding="utf-8") as fobj:
+                json.dump(data, fobj, ensure_ascii=False, indent=1)
+            self.logger.info(_("已保存依赖图: ") + str(graph_path))
+        except OSError as e:
+            self.logger.error(_("保存依赖图失败: ") + f"{graph_path} --> {e}")
+
+    @classmethod
+    def load(cls, project_name: str, auxdir: str) -> "DependencyGraph | None":
+        """读取上次编译保存的依赖图，不存在或格式不符时返回 None。"""
+        graph_path = cls.graph_path(project_name, auxdir)
+        if not graph_path.exists():
+            return None
+        graph = cls(project_name)
+        try:
+            with open(graph_path, "r", encoding="utf-8") as fobj:
+                data = json.load(fobj)
+        except (OSError, ValueError) as e:
+            graph.logger.warning(_("读取依赖图失败: ") + f"{graph_path} --> {e}")
+            return None
+        if data.get("format") != GRAPH_FORMAT:
+            return None
+        graph.stages = data.get("stages", {})
+        return graph
@@ -24,36 +24,32 @@ Description  :
 模块职责边界（架构 FR-A3）：负责【6 维编译状态检测的布尔/次数计算 + 辅助文件快照读取】。
   具体职责：
     1. 6 维编译状态检测的布尔/次数计算：bib / idx / toc / aux / out / log。
-    2. 辅助文件快照读取 prepare_LaTeX_output_files / prepare_aux_out_snapshots。
+    2. 辅助文件快照读取 prepare_LaTeX_output_files / prepare_aux_out_snapshots：
+       主 / 子 .aux 每轮只由 aux_snapshot.AuxSnapshot 读取解析一次，各检测维度共享。
+    3. 每轮生成文件的规范化摘要 state_digests 与 RoundHistory 不动点 / 循环判定。
+    4. EngineOutputWatcher 在引擎运行期间逐行匹配重新编译警告 / 未定义引用 / 缺失文件，.log 扫描仅作兜底。
   调用依赖关系拓扑：
     compile.CompileLaTeX 实例化 CompilationDetector 持有引用；
     compile_engine.RUN 通过 compile_model.detector.* 调用检测方法。
   下游依赖：
-    file_ops / logger / timing / Path / language。
+    aux_snapshot / file_ops / logger / timing（span）/ Path / language。
 """
 
+import hashlib
 import logging
 import re
 from collections import defaultdict
 from pathlib import Path
 
+from pytexmk.aux_snapshot import AuxSnapshot, normalize_aux_like
 from pytexmk.language import set_language
+from pytexmk.timing import span
 
 _ = set_language("detection")
 
-BIBER_PATTERN = re.compile(r"\\abx@aux@refcontext")
-BIBTEX_PATTERN = re.compile(r"\\bibdata")
-
 BIBER_BIB_PATTERN = re.compile(
     r"<bcf:datasource[^>]*>\s*(.*?)\s*</bcf:datasource>"
 )
-BIBTEX_BIB_PATTERN = re.compile(r"\\bibdata\{(.*)\}")
-
-BIBER_CITE_PATTERN = re.compile(
-    r"\\abx@aux@cite{.*?}\{(.*)\}"
-)
-BIBTEX_CITE_PATTERN = re.compile(r"\\citation\{(.*)\}")
-THEBIB_CITE_PATTERN = re.compile(r"\\bibcite\{(.*?)\}")
 
 RERUN_LOG_PATTERNS = [
     re.compile(r"LaTeX Warning: There were undefined references\."),
@@ -63,30 +59,77 @@ RERUN_LOG_PATTERNS = [
     re.compile(r"LaTeX Warning: Citation .* undefined"),
     re.compile(r"LaTeX Warning: There were multiply-defined labels\."),
 ]
-
-
-def _count_citations(file_name):
-    _ = set_language("detection")
-    counter = defaultdict(int)
-
-    with open(file_name, "r", encoding="utf-8") as aux_file:
-        aux_content = aux_file.read()
-    match = BIBER_CITE_PATTERN.search(aux_content)
-    if match:
-        for match in BIBER_CITE_PATTERN.finditer(aux_content):
-            name = match.groups()[0]
-            counter[name] += 1
-    match = BIBTEX_CITE_PATTERN.search(aux_content)
-    if match:
-        for match in BIBTEX_CITE_PATTERN.finditer(aux_content):
-            name = match.groups()[0]
-            counter[name] += 1
-    match = THEBIB_CITE_PATTERN.search(aux_content)
-    if match:
-        for match in THEBIB_CITE_PATTERN.finditer(aux_content):
-            name = match.groups()[0]
-            counter[name] += 1
-    return counter
+RERUN_LOG_PATTERN = re.compile("|".join(pattern.pattern for pattern in RERUN_LOG_PATTERNS))
+UNDEFINED_CITATION_PATTERN = re.compile(r"LaTeX Warning: Citation .* undefined")
+MISSING_FILE_PATTERN = re.compile(r"No file (.+?)\.$")
+# TeX 在终端输出与 .log 中按 max_print_line（默认 79 个字符）折行
+MAX_PRINT_LINE = 79
+
+
+class EngineOutputWatcher:
+    """LaTeX 编译输出的逐行观察者：在引擎运行期间匹配重新编译警告、未定义引用与缺失文件（如 .bbl）。
+
+    作为 MySubProcess.run_command 的 line_observers 使用，引擎退出时判定结果即已就绪；
+    安静模式（不读取命令输出）或 batchmode 等终端无输出的情况下未见到 "Transcript written on" 结束行，complete 为 False，
+    由 CompilationDetector 将 .log 文件逐行送入同一观察者作为兜底。
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.rerun = False
+        self.undefined_citations = False
+        self.missing_files: set[str] = set()
+        self.complete = False
+        self._pending = ""
+
+    def __call__(self, raw_line: str):
+        line = raw_line.rstrip("\r\n")
+        if len(line) == MAX_PRINT_LINE:
+            # 被折行的长消息，与下一行拼接后再匹配
+            self._pending += line
+            return
+        line, self._pending = self._pending + line, ""
+        if "Warning" in line:
+            self.rerun = self.rerun or RERUN_LOG_PATTERN.search(line) is not None
+            self.undefined_citations = self.undefined_citations or UNDEFINED_CITATION_PATTERN.search(line) is not None
+        elif line.startswith("No file "):
+            if match := MISSING_FILE_PATTERN.match(line):
+                self.missing_files.add(match.group(1))
+        elif line.startswith("Transcript written on"):
+            self.complete = True
+
+    def feed_file(self, path: Path):
+        """将 .log 文件逐行送入观察者（引擎终端输出不完整时的兜底）。"""
+        with open(path, "r", encoding="utf-8", errors="replace") as fobj:
+            for line in fobj:
+                self(line)
+        self.complete = True
+
+
+class RoundHistory:
+    """记录每次 LaTeX 编译前生成文件（.aux / .toc / .out / .bbl …）的规范化摘要，判定不动点与循环。
+
+    LaTeX 编译的结果只取决于源文件与这些生成文件：若某轮编译前的状态与之前某轮完全相同，继续编译只会
+    重复已有结果——与上一轮相同即达到不动点，与更早的某轮相同即在多个状态间循环（如页码引用振荡）。
+    """
+
+    def __init__(self):
+        self.states: list[dict[str, str]] = []
+
+    def record(self, state: dict[str, str]) -> tuple[str | None, list[str]]:
+        """记录一轮状态，返回 (停止原因, 振荡文件)：停止原因为 "fixpoint" / "cycle"，无重复时为 None。"""
+        for k in range(len(self.states) - 1, -1, -1):
+            if self.states[k] != state:
+                continue
+            if k == len(self.states) - 1:
+                return "fixpoint", []
+            cycle = self.states[k:]
+            files = {f for s in cycle for f in s}
+            return "cycle", sorted(f for f in files if len({s.get(f) for s in cycle}) > 1)
+        self.states.append(state)
+        return None, []
 
 
 class CompilationDetector:
@@ -100,6 +143,7 @@ class CompilationDetector:
         auxdir,
         non_quiet,
         MRO,
+        native_dirs=False,
     ):
         self.logger = logging.getLogger(__name__)
 
@@ -111,20 +155,46 @@ class CompilationDetector:
         self.outdir = outdir
         self.non_quiet = non_quiet
         self.MRO = MRO
+        # 生成文件所在目录：常规模式下编译前移入根目录，原生目录模式下始终位于辅助目录
+        self.native_dirs = native_dirs
+        self.build_dir = Path(auxdir) if native_dirs else Path(".")
 
         self.bib_file = ""
-        self.out = ""
+        self.output_watcher = EngineOutputWatcher()
+        self.aux_snapshot: AuxSnapshot | None = None
+        self.dimension_times: dict[str, float] = {}  # 最近一次 run_full_detection 各维度的耗时
+
+    def refresh_aux_snapshot(self) -> AuxSnapshot:
+        """读取并解析本轮的主 .aux 与子 .aux 文件（每轮编译前、编译后各调用一次），供各检测维度共享。"""
+        _ = set_language("detection")
+        self.aux_snapshot = AuxSnapshot.read(f"{self.project_name}.aux", self.auxdir, base_dir=str(self.build_dir))
+        for file_name in self.aux_snapshot.missing:
+            self.logger.info(_("文件不存在或无法读取,跳过文件: %(args)s") % {"args": file_name})
+        return self.aux_snapshot
+
+    def _build_path(self, file_name: str) -> Path:
+        """生成文件（以相对生成文件目录的名称表示）的实际路径。"""
+        return self.build_dir / file_name
+
+    def _candidates(self, file_name: str) -> list[Path]:
+        """可能存放某一生成文件的位置：常规模式下先根目录后辅助目录，原生目录模式下只有辅助目录。"""
+        if self.native_dirs:
+            return [self._build_path(file_name)]
+        return [Path(file_name), Path(self.auxdir) / file_name]
+
+    def _aux(self) -> AuxSnapshot:
+        return self.aux_snapshot if self.aux_snapshot is not None else self.refresh_aux_snapshot()
 
     def prepare_LaTeX_output_files(self):
         _ = set_language("detection")
-        aux_file_path = Path(f"{self.project_name}.aux")
-        if aux_file_path.exists():
-            cite_counter = self._generate_citation_counter()
+        snapshot = self.refresh_aux_snapshot()
+        if snapshot.exists:
+            cite_counter = snapshot.citations
             index_aux_content_dict_old = self._index_aux_content_get()
         else:
             cite_counter = {f"{self.project_name}.aux": defaultdict(int)}
             index_aux_content_dict_old = {}
-        toc_file_path = Path(f"{self.project_name}.toc")
+        toc_file_path = self._build_path(f"{self.project_name}.toc")
         if toc_file_path.exists():
             with open(toc_file_path, "r", encoding="utf-8") as fobj:
                 toc_file = fobj.read()
@@ -133,77 +203,46 @@ class CompilationDetector:
 
         return cite_counter, toc_file, index_aux_content_dict_old
 
-    def _generate_citation_counter(self):
-        _ = set_language("detection")
-        cite_counter = {}
-        file_name = f"{self.project_name}.aux"
-        with open(file_name, "r", encoding="utf-8") as fobj:
-            main_aux_content = fobj.read()
-        cite_counter[file_name] = _count_citations(file_name)
-
-        for match in re.finditer(r"\\@input\{(.*.aux)\}", main_aux_content):
-            file_name = match.groups()[0]
-            try:
-                counter = _count_citations(file_name)
-            except OSError:
-                self.logger.info(
-                    _("文件不存在或无法读取,跳过文件: %(args)s") % {"args": file_name}
-                )
-            else:
-                cite_counter[file_name] = counter
-
-        return cite_counter
-
     def _index_aux_content_get(self):
         _ = set_language("detection")
-        file_name = Path(
-            f"{self.project_name}.aux"
-        )
+        snapshot = self._aux()
         index_aux_content_dict_old = {}
 
-        if file_name.exists():
+        if snapshot.exists:
             if any(
-                Path(f"{self.project_name}{ext}").exists()
+                self._build_path(f"{self.project_name}{ext}").exists()
                 for ext in [".glo", ".acn", ".slo"]
             ):
-                with open(file_name, "r", encoding="utf-8") as fobj:
-                    main_aux = fobj.read()
-                pattern = r"\\@newglossary\{(.*)\}\{.*\}\{(.*)\}\{(.*)\}"
-                for match in re.finditer(
-                    pattern, main_aux
-                ):
-                    _name, ext_o, ext_i = (
-                        match.groups()
-                    )
+                for _name, ext_o, ext_i in snapshot.glossaries:
                     if (
-                        Path(f"{self.project_name}{ext_i}").exists()
-                        and Path(f"{self.project_name}{ext_o}").exists()
+                        self._build_path(f"{self.project_name}{ext_i}").exists()
+                        and self._build_path(f"{self.project_name}{ext_o}").exists()
                     ):
                         with open(
-                            Path(f"{self.project_name}{ext_o}"), "r", encoding="utf-8"
+                            self._build_path(f"{self.project_name}{ext_o}"), "r", encoding="utf-8"
                         ) as fobj:
                             index_ext_i_content = fobj.read()
                         index_aux_content_dict_old[f"{self.project_name}.{ext_i}"] = (
                             index_ext_i_content
                         )
-            if Path(f"{self.project_name}.nlo").exists() and (
-                Path(f"{self.project_name}.nlo").exists()
-                and Path(f"{self.project_name}.nls").exists()
+            if self._build_path(f"{self.project_name}.nlo").exists() and (
+                self._build_path(f"{self.project_name}.nlo").exists()
+                and self._build_path(f"{self.project_name}.nls").exists()
             ):
                 with open(
-                    Path(f"{self.project_name}.nlo"), "r", encoding="utf-8"
+                    self._build_path(f"{self.project_name}.nlo"), "r", encoding="utf-8"
                 ) as fobj:
                     index_ext_i_content = fobj.read()
                 index_aux_content_dict_old[f"{self.project_name}.nlo"] = (
                     index_ext_i_content
                 )
 
-            if Path(f"{self.project_name}.idx").exists() and (
-                Path(f"{self.project_name}.idx").exists()
-                and Path(f"{self.project_name}.ind").exists()
+            if self._build_path(f"{self.project_name}.idx").exists() and (
+                self._build_path(f"{self.project_name}.idx").exists()
+                and self._build_path(f"{self.project_name}.ind").exists()
             ):
                 with open(
-                    Path(f"{self.project_name}.idx"), "r", encoding="utf-8"
+                    self._build_path(f"{self.project_name}.idx"), "r", encoding="utf-8"
                 ) as fobj:
                     index_ext_i_content = fobj.read()
                 index_aux_content_dict_old[f"{self.project_name}.idx"] = (
@@ -216,9 +255,7 @@ class CompilationDetector:
 
     def toc_changed_judgment(self, toc_file):
         _ = set_language("detection")
-        file_name = Path(self.project_name).with_suffix(
-            ".toc"
-        )
+        file_name = self._build_path(f"{self.project_name}.toc")
         if file_name.exists():
             with open(file_name, "r", encoding="utf-8") as fobj:
                 if fobj.read() != toc_file:
@@ -229,21 +266,11 @@ class CompilationDetector:
         bib_engine = None
         target_name_bib = None
         Latex_compilation_times = 0
-        aux_file_path = Path(f"{self.project_name}.aux")
-        if aux_file_path.exists():
-            with aux_file_path.open("r", encoding="utf-8") as fobj:
-                aux_content = fobj.read()
-            match_biber = BIBER_PATTERN.search(
-                aux_content
-            )
-            match_bibtex = BIBTEX_PATTERN.search(
-                aux_content
-            )
-            if match_biber or match_bibtex:
-                if match_biber:
-                    bcf_file_path = Path(
-                        f"{self.project_name}.bcf"
-                    )
+        snapshot = self._aux()
+        if snapshot.exists:
+            if snapshot.biber or snapshot.bibdata is not None:
+                if snapshot.biber:
+                    bcf_file_path = self._build_path(f"{self.project_name}.bcf")
                     with bcf_file_path.open(
                         "r", encoding="utf-8"
                     ) as fobj:
@@ -255,14 +282,10 @@ class CompilationDetector:
                         bib_engine = "biber"
                         Latex_compilation_times = 2
 
-                elif match_bibtex:
-                    match_bibtex_bib = BIBTEX_BIB_PATTERN.search(
-                        aux_content
-                    )
-                    if match_bibtex_bib:
-                        self.bib_file = match_bibtex_bib.group(1)
-                        bib_engine = "bibtex"
-                        Latex_compilation_times = 2
+                else:
+                    self.bib_file = snapshot.bibdata
+                    bib_engine = "bibtex"
+                    Latex_compilation_times = 2
 
                 target_name_bib = bib_engine
 
@@ -270,21 +293,15 @@ class CompilationDetector:
                 if not bib_file_path.exists() and bib_engine is not None:
                     Latex_compilation_times = 2
 
-                new_cite_counter = self._generate_citation_counter()
-                if old_cite_counter == new_cite_counter:
+                if old_cite_counter == snapshot.citations:
                     Latex_compilation_times = 0
 
-                if (
-                    re.search(
-                        f"No file {self.project_name}.bbl.", self.out
-                    )
-                    or re.search("LaTeX Warning: Citation .* undefined", self.out)
-                ):
+                output = self._engine_output()
+                if f"{self.project_name}.bbl" in output.missing_files or output.undefined_citations:
                     Latex_compilation_times = 2
 
-            elif re.search(r"\\bibcite", aux_content):
-                new_cite_counter = self._generate_citation_counter()
-                Latex_compilation_times = 0 if old_cite_counter == new_cite_counter else 1
+            elif snapshot.bibcite:
+                Latex_compilation_times = 0 if old_cite_counter == snapshot.citations else 1
 
         else:
             self.logger.warning(_("未找到辅助文件: ") + f"{self.project_name}.aux")
@@ -295,14 +312,12 @@ class CompilationDetector:
     ):
         _ = set_language("detection")
         make_index = False
-        if re.search(
-            f"No file {index_aux_infile}.", self.out
-        ):
+        if index_aux_infile in self._engine_output().missing_files:
             make_index = True
         elif (
-            Path(index_aux_infile).exists() and Path(index_aux_outfile).exists()
+            self._build_path(index_aux_infile).exists() and self._build_path(index_aux_outfile).exists()
         ):
-            with open(index_aux_infile, "r", encoding="utf-8") as fobj:
+            with open(self._build_path(index_aux_infile), "r", encoding="utf-8") as fobj:
                 file_content = fobj.read()
             if file_content is not None:
                 if (
@@ -315,23 +330,12 @@ class CompilationDetector:
 
     def index_judgment(self, index_aux_content_dict_old):
         _ = set_language("detection")
-        file_name = Path(
-            f"{self.project_name}.aux"
-        )
         run_index_list_cmd = []
         if any(
-            Path(f"{self.project_name}{ext}").exists()
+            self._build_path(f"{self.project_name}{ext}").exists()
             for ext in [".glo", ".acn", ".slo"]
         ):
-            with open(file_name, "r", encoding="utf-8") as fobj:
-                main_aux = fobj.read()
-            pattern = r"\\@newglossary\{(.*)\}\{.*\}\{(.*)\}\{(.*)\}"
-            for match in re.finditer(
-                pattern, main_aux
-            ):
-                name, ext_o, ext_i = (
-                    match.groups()
-                )
+            for name, ext_o, ext_i in self._aux().glossaries:
                 make_index = self._index_changed_judgment(
                     index_aux_content_dict_old,
                     f"{self.project_name}{ext_i}",
@@ -344,7 +348,7 @@ class CompilationDetector:
                             f"makeindex -s {self.project_name}.ist -o {self.project_name}{ext_o} {self.project_name}{ext_i}",
                         ]
                     )
-        elif Path(f"{self.project_name}.nlo").exists():
+        elif self._build_path(f"{self.project_name}.nlo").exists():
             make_index = self._index_changed_judgment(
                 index_aux_content_dict_old,
                 f"{self.project_name}.nlo",
@@ -358,7 +362,7 @@ class CompilationDetector:
                     ]
                 )
 
-        elif Path(f"{self.project_name}.idx").exists():
+        elif self._build_path(f"{self.project_name}.idx").exists():
             make_index = self._index_changed_judgment(
                 index_aux_content_dict_old,
                 f"{self.project_name}.idx",
@@ -371,28 +375,12 @@ class CompilationDetector:
         return run_index_list_cmd
 
     def prepare_aux_out_snapshots(self):
+        """返回编译前主 / 子 .aux 的规范化摘要（取自本轮快照）与 .out 文件内容。"""
         _ = set_language("detection")
-        aux_content_old = ""
+        aux_digest_old = self._aux().digest
         out_content_old = ""
 
-        aux_paths = [
-            Path(f"{self.project_name}.aux"),
-            Path(self.auxdir) / f"{self.project_name}.aux",
-        ]
-        for aux_path in aux_paths:
-            try:
-                if aux_path.exists():
-                    with open(aux_path, "r", encoding="utf-8") as fobj:
-                        aux_content_old = fobj.read()
-                    break
-            except (OSError, UnicodeDecodeError):
-                aux_content_old = ""
-
-        out_paths = [
-            Path(f"{self.project_name}.out"),
-            Path(self.auxdir) / f"{self.project_name}.out",
-        ]
-        for out_path in out_paths:
+        for out_path in self._candidates(f"{self.project_name}.out"):
             try:
                 if out_path.exists():
                     with open(out_path, "r", encoding="utf-8") as fobj:
@@ -401,67 +389,39 @@ class CompilationDetector:
             except (OSError, UnicodeDecodeError):
                 out_content_old = ""
 
-        return aux_content_old, out_content_old
+        return aux_digest_old, out_content_old
 
-    @staticmethod
-    def _normalize_aux_like(content: str) -> str:
-        _ = set_language("detection")
-        if not content:
-            return ""
-        stripped_lines: list[str] = []
-        for raw_line in content.splitlines():
-            line = raw_line.strip()
-            if not line:
-                continue
-            if line.startswith("%"):
-                continue
-            comment_idx = -1
-            for i, ch in enumerate(line):
-                if ch == "%" and (i == 0 or line[i - 1] != "\\"):
-                    comment_idx = i
-                    break
-            if comment_idx >= 0:
-                line = line[:comment_idx].strip()
-                if not line:
-                    continue
-            if line in (r"\relax", "\\relax", "\\relax{}"):
-                continue
-            if re.fullmatch(r"\\bookmarksetup\{.*\}", line):
-                continue
-            if re.fullmatch(r"\\@outlinefile\s*\{.*\}", line):
-                continue
-            if re.fullmatch(r"\\gdef\s*\\@abspage@last\{.*\}", line) or re.fullmatch(r"\\xdef\s*\\@abspage@last\{.*\}", line):
+    def state_digests(self, files: list[str]) -> dict[str, str]:
+        """计算生成文件的摘要：.aux / .out 先去除注释、\\relax 等与编译结果无关的行，不存在的文件记为空。
+
+        .aux 文件直接使用本轮快照中的摘要，不再重复读取。
+        """
+        state = {}
+        snapshot = self._aux()
+        for file_name in files:
+            if file_name in snapshot.file_digests:
+                state[file_name] = snapshot.file_digests[file_name]
                 continue
-            if re.fullmatch(r"\\global\\\@namedef\{ver@.*\}\{.*\}", line):
+            path = self._build_path(file_name)
+            try:
+                data = path.read_bytes()
+            except OSError:
+                state[file_name] = ""
                 continue
-            stripped_lines.append(line)
-        return "\n".join(stripped_lines)
+            if path.suffix in (".aux", ".out"):
+                data = normalize_aux_like(data.decode("utf-8", errors="replace")).encode("utf-8")
+            state[file_name] = hashlib.sha256(data).hexdigest()
+        return state
 
-    def aux_changed_judgment(self, aux_content_old):
+    def aux_changed_judgment(self, aux_digest_old):
+        """比较本轮快照与编译前快照中主 / 子 .aux 的规范化摘要。"""
         _ = set_language("detection")
-        aux_paths = [
-            Path(f"{self.project_name}.aux"),
-            Path(self.auxdir) / f"{self.project_name}.aux",
-        ]
-        current = ""
-        for aux_path in aux_paths:
-            try:
-                if aux_path.exists():
-                    with open(aux_path, "r", encoding="utf-8") as fobj:
-                        current = fobj.read()
-                    break
-            except (OSError, UnicodeDecodeError):
-                return False
-        return self._normalize_aux_like(current) != self._normalize_aux_like(aux_content_old)
+        return self._aux().digest != aux_digest_old
 
     def out_changed_judgment(self, out_content_old):
         _ = set_language("detection")
-        out_paths = [
-            Path(f"{self.project_name}.out"),
-            Path(self.auxdir) / f"{self.project_name}.out",
-        ]
         current = ""
-        for out_path in out_paths:
+        for out_path in self._candidates(f"{self.project_name}.out"):
             try:
                 if out_path.exists():
                     with open(out_path, "r", encoding="utf-8") as fobj:
@@ -469,35 +429,36 @@ class CompilationDetector:
                     break
             except (OSError, UnicodeDecodeError):
                 return False
-        return self._normalize_aux_like(current) != self._normalize_aux_like(out_content_old)
+        return normalize_aux_like(current) != normalize_aux_like(out_content_old)
+
+    def _log_candidates(self) -> list[Path]:
+        return self._candidates(f"{self.project_name}.log")
+
+    def _engine_output(self) -> EngineOutputWatcher:
+        """本轮 LaTeX 编译输出的匹配结果：编译时已逐行匹配完整终端输出则直接使用，否则逐行扫描 .log 文件兜底。"""
+        watcher = self.output_watcher
+        if not watcher.complete:
+            watcher.reset()
+            for candidate in self._log_candidates():
+                try:
+                    if candidate.exists():
+                        watcher.feed_file(candidate)
+                        break
+                except OSError:
+                    watcher.reset()
+        return watcher
 
     def log_has_rerun_warnings(self, log_path=None):
-        _ = set_language("detection")
-        log_content = ""
-
         if log_path is not None:
-            candidate_paths = [Path(log_path)]
-        else:
-            candidate_paths = [
-                Path(f"{self.project_name}.log"),
-                Path(self.auxdir) / f"{self.project_name}.log",
-            ]
-
-        for candidate in candidate_paths:
+            watcher = EngineOutputWatcher()
             try:
-                if candidate.exists():
-                    with open(candidate, "r", encoding="utf-8") as fobj:
-                        log_content = fobj.read()
-                    break
-            except (OSError, UnicodeDecodeError):
-                log_content = ""
-
-        for pattern in RERUN_LOG_PATTERNS:
-            if pattern.search(log_content):
-                return True
-        return False
+                watcher.feed_file(Path(log_path))
+            except OSError:
+                return False
+            return watcher.rerun
+        return self._engine_output().rerun
 
-    def run_full_detection(self, *, cite_counter_old, toc_file_old, index_aux_content_old, aux_content_old, out_content_old):
+    def run_full_detection(self, *, cite_counter_old, toc_file_old, index_aux_content_old, aux_digest_old, out_content_old):
         """六维状态检测聚合接口（FR-A5 Task 2.3）。一次性返回 (dims, next_extra, bib_engine, index_run_cmds, times_bib)。
 
         返回：
@@ -506,13 +467,24 @@ class CompilationDetector:
             bib_engine: str|None          —— BibTeX/Biber 引擎名，供 compile_engine 内 schedule 决定是否调用 compile_bib
             times_bib: int                —— bib 维度需要的 LaTeX 额外次数
             index_run_cmds: list          —— index 维度的实际执行命令列表，空列表表示无需执行索引编译
+
+        各维度（及快照读取 snapshot）的耗时记录在 self.dimension_times（秒），并作为 trace 区间记录。
         """
-        bib_engine, times_bib, _name_target = self.bib_judgment(cite_counter_old)
-        index_run_cmds = self.index_judgment(index_aux_content_old)
-        times_toc = 1 if self.toc_changed_judgment(toc_file_old) else 0
-        aux = 1 if self.aux_changed_judgment(aux_content_old) else 0
-        out = 1 if self.out_changed_judgment(out_content_old) else 0
-        log = 1 if self.log_has_rerun_warnings() else 0
+        self.dimension_times = {}
+
+        def timed(dim, fun, *args):
+            with span(dim, cat="detection") as current:
+                result = fun(*args)
+            self.dimension_times[dim] = current.seconds
+            return result
+
+        timed("snapshot", self.refresh_aux_snapshot)
+        bib_engine, times_bib, _name_target = timed("bib", self.bib_judgment, cite_counter_old)
+        index_run_cmds = timed("idx", self.index_judgment, index_aux_content_old)
+        times_toc = 1 if timed("toc", self.toc_changed_judgment, toc_file_old) else 0
+        aux = 1 if timed("aux", self.aux_changed_judgment, aux_digest_old) else 0
+        out = 1 if timed("out", self.out_changed_judgment, out_content_old) else 0
+        log = 1 if timed("log", self.log_has_rerun_warnings) else 0
 
         dims = {
             "bib": 1 if times_bib > 0 else 0,
@@ -1,39 +1,106 @@
 import logging
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from pytexmk.language import set_language
 
 _ = set_language("file_ops")
 
+# 按模式清除文件时不进入的目录（版本库元数据）
+EXCLUDED_DIRS = frozenset({".git", ".github"})
+# 待删除的文件达到此数量时在线程池中并发删除（网络文件系统上各次删除的延迟可以重叠）
+PARALLEL_UNLINK_MIN = 64
+
+
+def combine_patterns(patterns: list) -> re.Pattern:
+    """将多个文件名正则合并为一个，各模式仍从文件名开头匹配；公共的 ".*" 前缀只保留一次以减少回溯。"""
+    sources = [p.pattern if isinstance(p, re.Pattern) else p for p in patterns]
+    if not sources:
+        return re.compile(r"(?!)")
+    if all(source.startswith(".*") for source in sources):
+        return re.compile(".*(?:" + "|".join(source[2:] for source in sources) + ")")
+    return re.compile("|".join(f"(?:{source})" for source in sources))
+
+
+def iter_matched_files(pattern: re.Pattern, folder: str):
+    """以 os.scandir 遍历一次 folder（含子目录），逐个返回文件名与 pattern 匹配的文件路径。
+
+    EXCLUDED_DIRS 中的目录在进入前即跳过，不跟随指向目录的符号链接。
+    """
+    pending = [folder]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in EXCLUDED_DIRS:
+                                pending.append(entry.path)
+                        elif pattern.match(entry.name) and entry.is_file():
+                            yield Path(entry.path)
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
 
 class FileMoveRemoveManager:
     """架构 Task3：类名从 Move​Remove​Operation 升级为 FileMoveRemoveManager（语义更清晰，单一职责=文件移动+删除的 manager）。"""
     def __init__(self):
         self.logger = logging.getLogger(__name__)
 
-    def remove_specific_files(self, files: list, folder: str):
-        for file in files:
-            filepath = Path(folder) / file
-            if filepath.exists():
-                try:
-                    filepath.unlink()
-                    self.logger.info(_("删除成功: ") + str(filepath))
-                except OSError as e:
-                    self.logger.error(_("删除失败: ") + f"{filepath} --> {e}")
-
-    def remove_matched_files(self, patterns: list[re.Pattern], folder: str):
-        for pattern in patterns:
-            compiled_pattern = re.compile(pattern)
-            for filepath in Path(folder).rglob("*"):
-                if ".git" in filepath.parts or ".github" in filepath.parts:
-                    continue
-                if filepath.is_file() and compiled_pattern.match(filepath.name):
-                    try:
-                        filepath.unlink()
-                        self.logger.info(_("删除成功: ") + str(filepath))
-                    except OSError as e:
-                        self.logger.error(_("删除失败: ") + f"{filepath} --> {e}")
+    def _unlink(self, filepath: Path) -> bool:
+        try:
+            filepath.unlink()
+            self.logger.info(_("删除成功: ") + str(filepath))
+            return True
+        except OSError as e:
+            self.logger.error(_("删除失败: ") + f"{filepath} --> {e}")
+            return False
+
+    def remove_specific_files(self, files: list, folder: str, dry_run: bool = False) -> list[Path]:
+        """删除 folder 中的指定文件，返回已删除（dry_run 时为将删除）的文件。"""
+        existing = [Path(folder) / file for file in files if (Path(folder) / file).exists()]
+        if dry_run:
+            return existing
+        return [filepath for filepath in existing if self._unlink(filepath)]
+
+    def remove_empty_dirs(self, dirs: list[str], folder: str, dry_run: bool = False) -> list[Path]:
+        """删除 folder 中已为空的目录（dirs 需子目录在前），返回已删除（dry_run 时为存在、将在删除其中文件后删除）的目录。"""
+        removed = []
+        for directory in dirs:
+            dirpath = Path(folder) / directory
+            if not dirpath.is_dir():
+                continue
+            if dry_run:
+                removed.append(dirpath)
+                continue
+            try:
+                dirpath.rmdir()
+                removed.append(dirpath)
+                self.logger.info(_("删除成功: ") + str(dirpath))
+            except OSError:
+                continue  # 目录中还有不在清单中的文件
+        return removed
+
+    def remove_matched_files(
+        self, patterns: list[re.Pattern], folder: str, dry_run: bool = False, jobs: int | None = None,
+    ) -> list[Path]:
+        """删除 folder 下（含子目录）文件名与任一模式匹配的文件，返回已删除（dry_run 时为将删除）的文件。
+
+        所有模式合并为一个正则，目录树只遍历一次；文件较多时以 jobs 个线程并发删除。
+        """
+        matched = list(iter_matched_files(combine_patterns(patterns), folder))
+        if dry_run:
+            return sorted(matched)
+        if len(matched) < PARALLEL_UNLINK_MIN:
+            removed = [self._unlink(filepath) for filepath in matched]
+        else:
+            with ThreadPoolExecutor(max_workers=jobs or min(32, (os.cpu_count() or 1) + 4)) as pool:
+                removed = list(pool.map(self._unlink, matched))
+        return [filepath for filepath, ok in zip(matched, removed) if ok]
 
     def move_specific_files(
         self,
@@ -100,6 +167,7 @@ class FileMoveRemoveManager:
 
             if src_file_path.exists():
                 try:
+                    dest_file_path.parent.mkdir(parents=True, exist_ok=True)
                     src_file_path.rename(dest_file_path)
                     moved_count += 1
                     self.logger.info(
@@ -0,0 +1,152 @@
+"""文件监视：Linux 下使用 inotify（ctypes 调用 libc），其他平台或 inotify 不可用时轮询文件状态。
+
+监视对象为文件所在的目录，以便捕获编辑器「写临时文件再重命名」式的保存；一次保存引起的多个事件
+在 debounce 时间窗内合并为一批变更返回。
+"""
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+
+from pytexmk.language import set_language
+
+_ = set_language("file_watcher")
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class _InotifyBackend:
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        self.dirs: dict[int, Path] = {}
+
+    def watch_dir(self, directory: Path):
+        if directory in self.dirs.values():
+            return
+        wd = self._add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch {directory}")
+        self.dirs[wd] = directory
+
+    def poll(self, files: set[str], timeout: float) -> set[str]:
+        ready, _w, _x = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        changed = set()
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, _mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if wd in self.dirs and name:
+                path = (self.dirs[wd] / os.fsdecode(name)).as_posix()
+                if path in files:
+                    changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class _PollingBackend:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stats: dict[str, tuple[int, int] | None] = {}
+
+    @staticmethod
+    def _stat(path: str) -> tuple[int, int] | None:
+        try:
+            stat = os.stat(path)
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def watch_file(self, path: str):
+        if path not in self.stats:
+            self.stats[path] = self._stat(path)
+
+    def poll(self, files: set[str], timeout: float) -> set[str]:
+        time.sleep(min(timeout, self.interval))
+        changed = set()
+        for path in files:
+            current = self._stat(path)
+            if current != self.stats.get(path):
+                self.stats[path] = current
+                changed.add(path)
+        return changed
+
+    def close(self):
+        pass
+
+
+class FileWatcher:
+    """监视一组项目文件（相对 posix 路径），wait_for_changes 阻塞直到出现一批变更。"""
+
+    def __init__(self, files: list[str], interval: float = 0.5, debounce: float = 0.3):
+        self.logger = logging.getLogger(__name__)
+        self.interval = interval
+        self.debounce = debounce
+        self.files: set[str] = set()
+        self.backend = None
+        if sys.platform.startswith("linux"):
+            try:
+                self.backend = _InotifyBackend()
+                self.logger.info(_("使用 inotify 监视文件变化"))
+            except (OSError, AttributeError) as e:
+                self.logger.warning(_("inotify 不可用, 改为轮询监视: ") + str(e))
+        if self.backend is None:
+            self.backend = _PollingBackend(interval)
+            self.logger.info(_("使用轮询监视文件变化, 间隔: ") + f"{interval}s")
+        self.set_files(files)
+
+    def set_files(self, files: list[str]):
+        """更新监视的文件列表（编译后依赖图可能引入新的文件）。"""
+        self.files = {Path(f).as_posix() for f in files}
+        for path in self.files:
+            if isinstance(self.backend, _InotifyBackend):
+                try:
+                    self.backend.watch_dir(Path(path).parent)
+                except OSError as e:
+                    self.logger.warning(_("无法监视目录: ") + f"{Path(path).parent} --> {e}")
+            else:
+                self.backend.watch_file(path)
+        self.logger.info(_("监视文件数目: ") + str(len(self.files)))
+
+    def wait_for_changes(self) -> list[str]:
+        """阻塞直到有文件变化，并在 debounce 时间窗内合并后续变化，返回变化文件列表。"""
+        changed = set()
+        while not changed:
+            changed = self.backend.poll(self.files, self.interval)
+        deadline = time.monotonic() + self.debounce
+        while (remaining := deadline - time.monotonic()) > 0:
+            more = self.backend.poll(self.files, remaining)
+            if more:
+                changed |= more
+                deadline = time.monotonic() + self.debounce
+        return sorted(changed)
+
+    def close(self):
+        self.backend.close()
@@ -0,0 +1,193 @@
+"""导言区格式缓存：用 mylatexformat 将主文件导言区预编译为自定义格式（-ini 模式 dump），之后各次 LaTeX
+编译通过 -fmt 加载该格式，跳过导言区的重复执行。
+
+缓存以「引擎 + 导言区内容」的摘要为键，同时记录 dump 时读取的文件，导言区或其引入的宏包变化时自动重新生成。
+PdfLaTeX / XeLaTeX / LuaLaTeX 各自使用对应的 ini 引擎与基础格式，缓存文件按引擎区分存放在辅助目录下。
+格式生成失败（例如 XeTeX 无法在格式中保存 OpenType 字体）时记录失败结果，导言区变化前不再重试，按常规方式编译。
+dump 与其他外部程序一样经 MySubProcess 运行（计入资源占用记录与 trace），且不启用 -shell-escape：
+导言区在 dump 时执行，不能借此运行 \write18 命令。
+"""
+import hashlib
+import json
+import logging
+import re
+from pathlib import Path
+
+from pytexmk.build_state import file_digest
+from pytexmk.dependency_graph import parse_fls
+from pytexmk.language import set_language
+from pytexmk.subprocess_runner import MySubProcess, SubprocessFailedError
+
+_ = set_language("format_cache")
+
+CACHE_FORMAT = 1
+META_SUFFIX = ".fmt.json"
+# 编译程序 → (ini 模式使用的引擎, 基础格式)
+FORMAT_ENGINES = {
+    "PdfLaTeX": ("pdftex", "pdflatex"),
+    "XeLaTeX": ("xetex", "xelatex"),
+    "LuaLaTeX": ("luahbtex", "lualatex"),
+}
+# mylatexformat 只 dump 到 \endofdump（推荐写作 \csname endofdump\endcsname，未使用格式时等同 \relax）或 \begin{document}
+PREAMBLE_END = re.compile(r"\\csname\s*endofdump\s*\\endcsname|\\endofdump(?![A-Za-z])|\\begin\s*\{document\}")
+# 打开输出文件的命令：写入流无法保存在格式中，这些命令须放在 \endofdump 之后
+OPENOUT_COMMANDS = re.compile(r"\\(makeindex|makeglossaries|makeglossary|makenomenclature|makenoidxglossaries)(?![A-Za-z])")
+COMMENT = re.compile(r"(?<!\\)%.*")
+
+
+def read_preamble(tex_path: str | Path) -> tuple[str, bool] | None:
+    """读取 dump 范围内的导言区（已去除注释），返回 (导言区文本, 是否以 \\endofdump 结束)；未找到结束位置时返回 None。"""
+    lines = []
+    try:
+        with open(tex_path, "r", encoding="utf-8", errors="replace") as fobj:
+            for line in fobj:
+                line = COMMENT.sub("", line.rstrip("\r\n"))
+                match = PREAMBLE_END.search(line)
+                if match:
+                    lines.append(line[:match.start()])
+                    return "\n".join(lines), "document" not in match.group()
+                lines.append(line)
+    except OSError:
+        return None
+    return None
+
+
+class FormatCache:
+    """单个主文件在某一编译程序下的导言区格式缓存：<辅助目录>/<主文件名>-<编译程序>.fmt 及其记录文件。"""
+
+    def __init__(self, project_name: str, compiled_program: str, auxdir: str, quiet: bool = True):
+        self.logger = logging.getLogger(__name__)
+        self.project_name = project_name
+        self.compiled_program = compiled_program
+        self.ini_engine, self.base_format = FORMAT_ENGINES[compiled_program]
+        self.name = self.cache_name(project_name, compiled_program)
+        self.auxdir = Path(auxdir)
+        self.format_path = self.auxdir / f"{self.name}.fmt"
+        self.meta_path = self.auxdir / f"{self.name}{META_SUFFIX}"
+        self.inputs: list[str] = []  # dump 时读取的文件，记录到依赖图
+        # 失败提示中的日志路径为 <辅助目录>/<主文件名>-<编译程序>.log
+        self.MSP = MySubProcess(auxdir, auxdir, self.name, quiet=quiet)
+
+    @staticmethod
+    def cache_name(project_name: str, compiled_program: str) -> str:
+        return f"{project_name}-{compiled_program.lower()}"
+
+    @classmethod
+    def cache_files(cls, project_name: str) -> list[str]:
+        """各编译程序的缓存文件名（相对辅助目录），用于清理。"""
+        return [
+            f"{cls.cache_name(project_name, program)}{suffix}"
+            for program in FORMAT_ENGINES
+            for suffix in (".fmt", META_SUFFIX, ".log", ".fls")
+        ]
+
+    def cache_key(self, preamble: str) -> str:
+        data = f"{CACHE_FORMAT}\0{self.ini_engine}\0{self.base_format}\0{preamble}"
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def _load_meta(self) -> dict | None:
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as fobj:
+                meta = json.load(fobj)
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get("format") == CACHE_FORMAT else None
+
+    def _save_meta(self, key: str, status: str, inputs: dict):
+        meta = {"format": CACHE_FORMAT, "key": key, "status": status, "inputs": inputs}
+        try:
+            with open(self.meta_path, "w", encoding="utf-8") as fobj:
+                json.dump(meta, fobj, ensure_ascii=False, indent=1)
+        except OSError as e:
+            self.logger.warning(_("保存导言区格式记录失败: ") + f"{self.meta_path} --> {e}")
+
+    @staticmethod
+    def _input_entry(path: str) -> dict | None:
+        """项目内文件记录内容摘要，项目外文件（TeX 发行版中的宏包、基础格式）只记录修改时间。"""
+        file_path = Path(path)
+        try:
+            if file_path.is_absolute():
+                return {"mtime_ns": file_path.stat().st_mtime_ns}
+            return {"sha256": file_digest(file_path)}
+        except OSError:
+            return None
+
+    def _inputs_unchanged(self, inputs: dict) -> bool:
+        return all(self._input_entry(path) == entry for path, entry in inputs.items())
+
+    def prepare(self) -> Path | None:
+        """返回可用于 -fmt 的格式路径（不含 .fmt 后缀）；导言区不适合 dump 或格式生成失败时返回 None。"""
+        preamble = read_preamble(f"{self.project_name}.tex")
+        if preamble is None:
+            self.logger.warning(_("未找到导言区结束位置, 不使用导言区格式缓存"))
+            return None
+        text, has_endofdump = preamble
+        if not has_endofdump and (match := OPENOUT_COMMANDS.search(text)):
+            self.logger.warning(
+                _("导言区包含 %(cmd)s, 其打开的输出文件无法保存在格式中, 不使用导言区格式缓存; "
+                  "可在该命令前加入 \\csname endofdump\\endcsname")
+                % {"cmd": match.group()}
+            )
+            return None
+
+        key = self.cache_key(text)
+        meta = self._load_meta()
+        if meta is not None and meta.get("key") == key:
+            if meta.get("status") != "ok":
+                self.logger.info(_("导言区未变化且上次生成格式失败, 按常规方式编译"))
+                return None
+            if self.format_path.exists() and self._inputs_unchanged(meta.get("inputs", {})):
+                self.inputs = list(meta["inputs"])
+                self.logger.info(_("使用缓存的导言区格式: ") + str(self.format_path))
+                return self.format_path.resolve().with_suffix("")
+        return self._dump(key)
+
+    def _dump(self, key: str) -> Path | None:
+        """以 -ini 模式运行 mylatexformat 生成格式，并记录 dump 时读取的文件。"""
+        self.auxdir.mkdir(parents=True, exist_ok=True)
+        self.format_path.unlink(missing_ok=True)
+        command = [
+            self.ini_engine,
+            "-ini",
+            "-interaction=batchmode",
+            "-halt-on-error",
+            "-recorder",
+            f"-jobname={self.name}",
+            f"-output-directory={self.auxdir}",
+            f"&{self.base_format}",
+            "mylatexformat.ltx",
+            f"{self.project_name}.tex",
+        ]
+        self.logger.info(_("生成导言区格式: ") + " ".join(command))
+        try:
+            succeeded = self.MSP.run_command(command, [], [], _("生成导言区格式"))
+        except SubprocessFailedError:
+            succeeded = False
+        except OSError as e:
+            self.logger.warning(_("无法运行 %(engine)s: ") % {"engine": self.ini_engine} + str(e))
+            succeeded = False
+
+        inputs = []
+        fls_path = self.auxdir / f"{self.name}.fls"
+        if fls_path.exists():
+            inputs, _outputs = parse_fls(fls_path)
+        # 主文件正文的修改不影响格式，由导言区摘要判定
+        entries = {path: self._input_entry(path) for path in inputs if path != f"{self.project_name}.tex"}
+
+        if not succeeded or not self.format_path.exists():
+            self._save_meta(key, "failed", {})
+            self.logger.warning(
+                _("导言区格式生成失败, 按常规方式编译, 详见: ") + str(self.auxdir / f"{self.name}.log")
+            )
+            if self.compiled_program in ("XeLaTeX", "LuaLaTeX"):
+                self.logger.warning(
+                    _("%(program)s 无法在格式中保存已加载的 OpenType 字体, "
+                      "可将 fontspec 字体设置放在 \\csname endofdump\\endcsname 之后")
+                    % {"program": self.compiled_program}
+                )
+            return None
+
+        self._save_meta(key, "ok", entries)
+        self.inputs = list(entries)
+        self.logger.info(_("已生成导言区格式: ") + str(self.format_path))
+        return self.format_path.resolve().with_suffix("")
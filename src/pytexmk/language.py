@@ -23,17 +23,21 @@ Description  :
  -----------------------------------------------------------------------
 """
 
+import functools
 import gettext
 import locale
 import sys
 from pathlib import Path
 
+_CATALOGS: dict[str, "_Catalog"] = {}  # 进程级翻译注册表：翻译域 → 惰性 gettext 可调用对象
+
 
 # --------------------------------------------------------------------------------
 # 定义系统语言检查函数
 # --------------------------------------------------------------------------------
-def set_language(lang_file):
-    """根据系统区域设置动态选择翻译；源码默认中文，zh→NullTranslations，其他按优先级查找 .mo。"""
+@functools.cache
+def _locale_settings() -> tuple[Path, tuple[str, ...]]:
+    """每个进程只解析一次系统区域设置，返回 locale 目录与按优先级排列的候选语言；中文返回空元组。"""
     current_locale = locale.getdefaultlocale()
     if hasattr(sys, "_MEIPASS"):
         locale_path = Path(sys._MEIPASS) / "locale"
@@ -44,8 +48,7 @@ def set_language(lang_file):
 
     raw = current_locale[0] or ""
     if raw.startswith("zh"):
-        translation = gettext.NullTranslations()
-        return translation.gettext
+        return locale_path, ()  # 源码默认中文，无需加载 .mo
 
     # 其他语言：精确 locale → 语言回退 → 最终兜底 en，按顺序生成去重 candidates
     candidates: list[str] = []
@@ -56,14 +59,20 @@ def set_language(lang_file):
             candidates.append(raw.split(sep)[0])
     candidates.append("en")
     seen: set[str] = set()
-    languages: list[str] = [c for c in candidates if not (c in seen or seen.add(c))]
+    return locale_path, tuple(c for c in candidates if not (c in seen or seen.add(c)))
 
+
+def load_translation(lang_file):
+    """加载 lang_file 域的翻译并返回 gettext 函数（不经过注册表缓存）；zh→NullTranslations，其他按优先级查找 .mo。"""
+    locale_path, languages = _locale_settings()
     fallback = gettext.NullTranslations()
+    if not languages:
+        return fallback.gettext
     try:
         translation = gettext.translation(
             lang_file,
             localedir=str(locale_path),
-            languages=languages,
+            languages=list(languages),
             fallback=fallback,
         )
     except Exception:
@@ -71,6 +80,36 @@ def set_language(lang_file):
     return translation.gettext
 
 
+class _Catalog:
+    """单个翻译域的 gettext 可调用对象：首次翻译时才加载 .mo，之后直接复用。"""
+
+    __slots__ = ("domain", "_gettext")
+
+    def __init__(self, domain: str):
+        self.domain = domain
+        self._gettext = None
+
+    def __call__(self, message: str) -> str:
+        gettext_fn = self._gettext
+        if gettext_fn is None:
+            gettext_fn = self._gettext = load_translation(self.domain)
+        return gettext_fn(message)
+
+
+def set_language(lang_file):
+    """返回 lang_file 域的翻译函数；同一进程内按域缓存，区域设置只解析一次，.mo 在首次翻译时加载。"""
+    catalog = _CATALOGS.get(lang_file)
+    if catalog is None:
+        catalog = _CATALOGS.setdefault(lang_file, _Catalog(lang_file))
+    return catalog
+
+
+def reset_translations():
+    """清空翻译注册表与区域设置缓存，下次 set_language 时重新解析（切换区域设置的测试与基准使用）。"""
+    _CATALOGS.clear()
+    _locale_settings.cache_clear()
+
+
 def get_gettext(lang_file: str):
     """set_language 的别名：返回翻译函数。"""
     return set_language(lang_file)
@@ -1,14 +1,187 @@
+"""PDF 文件操作：预览输出 PDF；检查并修复根目录下的 PDF 文件（如插图）。
+
+修复流程（-pr）：
+  1. 按 size / mtime_ns / sha256 查询检查缓存（辅助目录下的 pdf_repair_cache.json），已确认完好的文件直接跳过；
+  2. 其余文件在进程池（-j 限制进程数）中先做结构检查：文件头、startxref、交叉引用表各条目的偏移与 trailer；
+  3. 只有结构损坏的文件才用 pypdf 重写，完好与修复成功的文件写入检查缓存。
+
+优化流程（-po）：编译完成、结果文件移入输出目录后，用 pypdf 合并相同的对象（多次嵌入的同一图片、字体）、
+压缩内容流并删除未引用的对象；找到 qpdf 时再由其生成对象流，--linearize 时线性化（快速网页显示）。
+"""
+import json
 import logging
-import webbrowser
+import mmap
+import os
+import re
+import shutil
 from pathlib import Path
 
-from pypdf import PdfReader, PdfWriter
 from rich import print
 
+from pytexmk.build_state import file_digest
+from pytexmk.file_ops import iter_matched_files
 from pytexmk.language import set_language
 
 _ = set_language("pdf_tools")
 
+OPTIMIZE_COMPRESSION_LEVEL = 9  # zlib 压缩级别，内容流与 qpdf 重新压缩均使用
+REPAIR_CACHE_NAME = "pdf_repair_cache.json"
+REPAIR_CACHE_FORMAT = 1
+TAIL_BYTES = 2048  # 在文件末尾的这一范围内查找 startxref
+HEADER_BYTES = 1024  # %PDF- 文件头允许出现在此范围内
+
+_STARTXREF_RE = re.compile(rb"startxref\s+(\d+)\s+%%EOF")
+_OBJ_RE = re.compile(rb"\s*(\d+)\s+\d+\s+obj\b")
+_SUBSECTION_RE = re.compile(rb"\s*(\d+)\s+(\d+)[ \t]*\r?\n?")
+_ENTRY_RE = re.compile(rb"(\d{10}) (\d{5}) ([nf])")
+_TRAILER_RE = re.compile(rb"\s*trailer\s*<<")
+_ROOT_RE = re.compile(rb"/Root\s+\d+\s+\d+\s+R")
+_PREV_RE = re.compile(rb"/Prev\s+(\d+)")
+
+
+def _check_xref_table(data: mmap.mmap, offset: int) -> tuple[str | None, bytes]:
+    """检查 offset 处的交叉引用表：各使用中条目的偏移处须为同号对象；返回 (问题, trailer 字典文本)。"""
+    pos = offset + len(b"xref")
+    while True:
+        subsection = _SUBSECTION_RE.match(data, pos)
+        if subsection is None:
+            break
+        first, count = int(subsection.group(1)), int(subsection.group(2))
+        pos = subsection.end()
+        for number in range(first, first + count):
+            entry = _ENTRY_RE.match(data, pos)
+            if entry is None:
+                return _("交叉引用表条目格式错误: ") + f"{number}", b""
+            pos = entry.end()
+            while pos < len(data) and data[pos] in b" \r\n":
+                pos += 1
+            if entry.group(3) == b"f":
+                continue
+            obj = _OBJ_RE.match(data, int(entry.group(1)))
+            if obj is None or int(obj.group(1)) != number:
+                return _("对象偏移错误: ") + f"{number} 0 R @ {int(entry.group(1))}", b""
+    trailer = _TRAILER_RE.match(data, pos)
+    if trailer is None:
+        return _("交叉引用表后缺少 trailer"), b""
+    end = data.find(b"startxref", trailer.end())
+    return None, data[trailer.end(): end if end != -1 else trailer.end() + 4096]
+
+
+def check_pdf_structure(path: str | Path) -> str | None:
+    """不解析页面内容的结构检查，返回发现的问题，结构完好时返回 None。
+
+    检查文件头、末尾的 startxref / %%EOF、沿 /Prev 链的每个交叉引用表（各使用中条目的偏移处须为同号对象）
+    与 trailer 中的 /Root；交叉引用流只检查流对象头与 /Root，不解码其中的条目。
+    """
+    with open(path, "rb") as fobj:
+        if os.fstat(fobj.fileno()).st_size == 0:
+            return _("空文件")
+        with mmap.mmap(fobj.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data.find(b"%PDF-", 0, HEADER_BYTES) == -1:
+                return _("缺少 %PDF 文件头")
+            startxrefs = list(_STARTXREF_RE.finditer(data, max(0, len(data) - TAIL_BYTES)))
+            if not startxrefs:
+                return _("文件末尾缺少 startxref 或 EOF 标记")
+            offset, seen, has_root = int(startxrefs[-1].group(1)), set(), False
+            while offset is not None:
+                if offset in seen or offset >= len(data):
+                    return _("交叉引用表偏移错误: ") + str(offset)
+                seen.add(offset)
+                if data[offset: offset + 4] == b"xref":
+                    problem, trailer = _check_xref_table(data, offset)
+                    if problem:
+                        return problem
+                elif _OBJ_RE.match(data, offset):
+                    end = data.find(b"stream", offset)
+                    trailer = data[offset: end if end != -1 else offset + 4096]
+                    if b"/XRef" not in trailer:
+                        return _("交叉引用流对象类型错误: ") + str(offset)
+                else:
+                    return _("交叉引用表偏移错误: ") + str(offset)
+                has_root = has_root or _ROOT_RE.search(trailer) is not None
+                prev = _PREV_RE.search(trailer)
+                offset = int(prev.group(1)) if prev else None
+            if not has_root:
+                return _("trailer 中缺少 /Root")
+    return None
+
+
+def rewrite_pdf(path: Path):
+    """用 pypdf 读取并重新写出 PDF（重建交叉引用表），先写临时文件再替换原文件。"""
+    from pypdf import PdfReader, PdfWriter  # pypdf 导入较重，仅在修复时加载
+
+    reader = PdfReader(path)
+    writer = PdfWriter()
+    for page in reader.pages:
+        writer.add_page(page)
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp_path, "wb") as fobj:
+            writer.write(fobj)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def _cache_entry(path: Path, digest: str) -> dict:
+    stat = path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+
+
+def repair_one(task: tuple[str, str | None]) -> tuple[str, str, dict | None, str]:
+    """进程池任务：检查一个 PDF，结构损坏时重写。
+
+    task 为 (路径, 检查缓存中的摘要)；返回 (路径, 状态, 新的缓存条目, 说明)，
+    状态为 cached（内容与缓存一致）/ ok / repaired / failed。
+    """
+    path, known_digest = task
+    file_path = Path(path)
+    try:
+        digest = file_digest(file_path)
+        if digest == known_digest:
+            return path, "cached", _cache_entry(file_path, digest), ""
+        problem = check_pdf_structure(file_path)
+        if problem is None:
+            return path, "ok", _cache_entry(file_path, digest), ""
+        rewrite_pdf(file_path)
+        remaining = check_pdf_structure(file_path)
+        if remaining is not None:
+            return path, "failed", None, remaining
+        return path, "repaired", _cache_entry(file_path, file_digest(file_path)), problem
+    except Exception as e:  # noqa: BLE001
+        return path, "failed", None, str(e)
+
+
+class PdfRepairCache:
+    """PDF 检查缓存：路径 → 确认完好时的 size / mtime_ns / sha256，size 与 mtime_ns 一致即视为未变化。"""
+
+    def __init__(self, cache_dir: str | None):
+        self.logger = logging.getLogger(__name__)
+        self.cache_path = Path(cache_dir) / REPAIR_CACHE_NAME if cache_dir else None
+
+    def load(self) -> dict[str, dict]:
+        if self.cache_path is None or not self.cache_path.exists():
+            return {}
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as fobj:
+                data = json.load(fobj)
+        except (OSError, ValueError) as e:
+            self.logger.warning(_("读取 PDF 检查缓存失败: ") + f"{self.cache_path} --> {e}")
+            return {}
+        if data.get("format") != REPAIR_CACHE_FORMAT:
+            return {}
+        return data.get("files", {})
+
+    def save(self, files: dict[str, dict]):
+        if self.cache_path is None:
+            return
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.cache_path, "w", encoding="utf-8") as fobj:
+                json.dump({"format": REPAIR_CACHE_FORMAT, "files": files}, fobj, ensure_ascii=False, indent=1)
+        except OSError as e:
+            self.logger.error(_("保存 PDF 检查缓存失败: ") + f"{self.cache_path} --> {e}")
+
 
 class PdfFileOperation:
     def __init__(self, viewer="default"):
@@ -21,6 +194,8 @@ class PdfFileOperation:
     def _preview_pdf_by_viewer(self, local_path: str):
         if self.viewer == "default" or not self.viewer:
             self.logger.info(_("未设置 PDF 查看器,使用默认 PDF 查看器"))
+            import webbrowser  # 仅预览时导入，避免拖慢启动
+
             webbrowser.open(local_path)
         elif self.viewer and self.viewer != "default":
             self.logger.info(_("设置 PDF 查看器: ") + f"{self.viewer}")
@@ -35,35 +210,126 @@ class PdfFileOperation:
         except Exception as e:  # noqa: BLE001
             self.logger.error(_("打开文件失败: ") + f"{pdf_name} -->{e}")
 
-    def pdf_repair(self, project_name: str, root_dir: str, excluded_folder: str):
-        root_dir = Path(root_dir)
+    def pdf_repair(
+        self, project_name: str, root_dir: str, excluded_folder: str,
+        cache_dir: str | None = None, jobs: int | None = None, force: bool = False,
+    ) -> dict[str, int]:
+        """检查根目录下的 PDF 文件（输出目录与主文件 PDF 除外），只重写结构损坏的文件；返回各状态的文件数。
+
+        cache_dir 为检查缓存所在目录（None 时不使用缓存），jobs 为进程数上限（默认 CPU 核数），
+        force 时忽略缓存重新检查全部文件。
+        """
+        excluded_dir = Path(excluded_folder).resolve()
         pdf_files = [
             path
-            for path in root_dir.rglob("*.pdf")
-            if ".git" not in path.parts
-            and ".github" not in path.parts
-            and path.is_file()
-            and path.name != f"{project_name}.pdf"
-            and path.parent.name != excluded_folder
+            for path in iter_matched_files(re.compile(r".*\.pdf$"), root_dir)
+            if path.name != f"{project_name}.pdf" and path.parent.resolve() != excluded_dir
         ]
 
         if not pdf_files:
             print(_("当前路径下没有 PDF 文件"))
-            return
+            return {}
 
         print(_("找到 PDF 文件数目: ") + f"[bold cyan]{len(pdf_files)}[/bold cyan]")
+        cache = PdfRepairCache(cache_dir)
+        known = {} if force else cache.load()
+        counts = {"cached": 0, "ok": 0, "repaired": 0, "failed": 0}
+        good = {}
+        tasks = []
         for pdf_file in pdf_files:
+            key = pdf_file.as_posix()
+            entry = known.get(key)
             try:
-                reader = PdfReader(pdf_file)
-                writer = PdfWriter()
+                stat = pdf_file.stat()
+            except OSError:
+                continue
+            if entry and stat.st_size == entry["size"] and stat.st_mtime_ns == entry["mtime_ns"]:
+                good[key] = entry
+                counts["cached"] += 1
+            else:
+                tasks.append((key, entry["sha256"] if entry else None))
+
+        jobs = max(1, min(jobs or os.cpu_count() or 1, len(tasks)))
+        if jobs > 1:
+            from concurrent.futures import ProcessPoolExecutor
 
-                for page in reader.pages:
-                    writer.add_page(page)
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                results = list(pool.map(repair_one, tasks, chunksize=max(1, len(tasks) // (jobs * 4))))
+        else:
+            results = [repair_one(task) for task in tasks]
 
-                with open(pdf_file, "wb") as f:
-                    writer.write(f)
+        for path, status, entry, detail in results:
+            counts[status] += 1
+            if entry is not None:
+                good[path] = entry
+            if status == "repaired":
+                self.logger.info(_("修复成功: ") + f"{path} ({detail})")
+            elif status == "failed":
+                self.logger.error(_("修复失败: ") + f"{path} --> {detail}")
+        cache.save(good)
 
-                self.logger.info(_("修复成功: ") + str(pdf_file))
-            except Exception as e:  # noqa: BLE001
-                self.logger.error(_("修复失败: ") + f"{pdf_file} --> {e}")
+        print(
+            _("已跳过 (检查缓存): %(cached)s, 结构完好: %(ok)s, 已修复: %(repaired)s, 修复失败: %(failed)s")
+            % counts
+        )
         print(_("[bold green]修复 PDF 结束[/bold green]"))
+        return counts
+
+    def pdf_optimize(
+        self, project_name: str, outdir: str, auxdir: str, linearize: bool = False, quiet: bool = True,
+    ) -> tuple[int, int] | None:
+        """优化输出目录中的主文件 PDF，返回 (优化前大小, 优化后大小)；PDF 不存在时返回 None。
+
+        中间文件写在辅助目录中；结果变小（或按要求完成线性化）时才替换原文件。
+        未找到 qpdf 时只做 pypdf 的优化，不生成对象流，也无法线性化。
+        """
+        pdf_path = Path(outdir) / f"{project_name}.pdf"
+        if not pdf_path.exists():
+            self.logger.warning(_("未找到输出 PDF 文件, 跳过优化: ") + str(pdf_path))
+            return None
+        from pypdf import PdfReader, PdfWriter  # pypdf 导入较重，仅在优化时加载
+
+        size_before = pdf_path.stat().st_size
+        work_dir = Path(auxdir)
+        work_dir.mkdir(parents=True, exist_ok=True)
+        stage_path = work_dir / f"{project_name}.optimize.pdf"
+        qpdf_path = work_dir / f"{project_name}.qpdf.pdf"
+        try:
+            writer = PdfWriter(clone_from=PdfReader(pdf_path))
+            for page in writer.pages:
+                page.compress_content_streams(level=OPTIMIZE_COMPRESSION_LEVEL)
+            writer.compress_identical_objects()  # 合并相同的对象并删除未引用的对象
+            with open(stage_path, "wb") as fobj:
+                writer.write(fobj)
+            result_path, linearized = stage_path, False
+
+            qpdf = shutil.which("qpdf")
+            if qpdf:
+                from pytexmk.subprocess_runner import MySubProcess, SubprocessFailedError
+
+                command = [
+                    qpdf, "--object-streams=generate", "--recompress-flate",
+                    f"--compression-level={OPTIMIZE_COMPRESSION_LEVEL}", "--warning-exit-0",
+                    *(["--linearize"] if linearize else []), str(stage_path), str(qpdf_path),
+                ]
+                try:
+                    MySubProcess(outdir, auxdir, project_name, quiet=quiet).run_command(command, [], [], "qpdf")
+                    result_path, linearized = qpdf_path, linearize
+                except SubprocessFailedError:
+                    self.logger.warning(_("qpdf 运行失败, 只保留 pypdf 的优化结果"))
+            elif linearize:
+                self.logger.warning(_("未找到 qpdf, 无法线性化 PDF 与生成对象流"))
+
+            size_after = result_path.stat().st_size
+            if size_after < size_before or linearized:
+                os.replace(result_path, pdf_path)
+            else:
+                self.logger.info(_("优化后的 PDF 没有变小, 保留原文件"))
+                size_after = size_before
+        finally:
+            stage_path.unlink(missing_ok=True)
+            qpdf_path.unlink(missing_ok=True)
+        self.logger.info(
+            _("PDF 优化完成: ") + f"{pdf_path} {size_before} -> {size_after} B"
+        )
+        return size_before, size_after
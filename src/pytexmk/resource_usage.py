@@ -0,0 +1,96 @@
+"""外部程序资源占用统计：记录经 MySubProcess 运行的每个程序的 CPU 时间、峰值内存与读写字节数。
+
+进程结束后先以 WNOWAIT 等待（不回收）并读取 /proc/<pid>/io，再由 os.wait4 回收并取得 rusage；
+不支持 wait4 的平台（Windows）只记录墙钟时长。记录按运行顺序收集，由 time_print 打印并可写出为 JSON。
+"""
+import dataclasses
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+
+USAGE_FORMAT = 1
+
+_records: list["ToolUsage"] = []
+_records_lock = threading.Lock()
+
+
+@dataclass
+class ToolUsage:
+    """单次外部程序运行的资源占用；无法获取的项为 None。read_bytes / write_bytes 为经 read / write 系统调用的字节数。"""
+
+    program: str
+    command: str
+    exit_code: int | None
+    wall_s: float
+    user_s: float | None = None
+    sys_s: float | None = None
+    max_rss_bytes: int | None = None
+    read_bytes: int | None = None
+    write_bytes: int | None = None
+
+
+def _read_proc_io(pid: int) -> dict[str, int]:
+    try:
+        with open(f"/proc/{pid}/io", "r", encoding="ascii") as fobj:
+            fields = dict(line.split(":", 1) for line in fobj if ":" in line)
+    except OSError:
+        return {}
+    return {key.strip(): int(value) for key, value in fields.items()}
+
+
+def wait_with_usage(process, program: str, command: list, start: float) -> ToolUsage:
+    """等待进程结束（设置 process.returncode）并返回其资源占用；start 为启动进程前的 time.monotonic()。"""
+    usage = ToolUsage(program, " ".join(map(str, command)), None, 0.0)
+    if hasattr(os, "wait4"):
+        try:
+            if hasattr(os, "waitid"):
+                os.waitid(os.P_PID, process.pid, os.WEXITED | os.WNOWAIT)
+            io_counters = _read_proc_io(process.pid)
+            _pid, status, rusage = os.wait4(process.pid, 0)
+        except ChildProcessError:
+            pass  # 已被回收，只记录墙钟时长
+        else:
+            process.returncode = os.waitstatus_to_exitcode(status)
+            usage.user_s = rusage.ru_utime
+            usage.sys_s = rusage.ru_stime
+            # ru_maxrss 在 Linux 下以 KiB 为单位，macOS 下以字节为单位
+            usage.max_rss_bytes = rusage.ru_maxrss if sys.platform == "darwin" else rusage.ru_maxrss * 1024
+            usage.read_bytes = io_counters.get("rchar")
+            usage.write_bytes = io_counters.get("wchar")
+    usage.exit_code = process.wait()
+    usage.wall_s = time.monotonic() - start
+    return usage
+
+
+def record_usage(usage: ToolUsage):
+    with _records_lock:
+        _records.append(usage)
+
+
+def take_usage_records() -> list[ToolUsage]:
+    """取出并清空已收集的记录（每次打印运行时长统计表时调用一次）。"""
+    with _records_lock:
+        records = _records[:]
+        _records.clear()
+    return records
+
+
+def write_usage_json(path: str, records: list[ToolUsage]):
+    """将资源占用记录写出为 JSON：{"format": 1, "tools": [{program, command, exit_code, wall_s, ...}]}。"""
+    data = {"format": USAGE_FORMAT, "tools": [dataclasses.asdict(record) for record in records]}
+    with open(path, "w", encoding="utf-8") as fobj:
+        json.dump(data, fobj, ensure_ascii=False, indent=1)
+
+
+def format_bytes(value: int | None) -> str:
+    """以 1024 为进制的紧凑字节数：980B / 2.0K / 512.0M / 1.25G。"""
+    if value is None:
+        return "-"
+    for unit in ("B", "K", "M"):
+        if value < 1024:
+            return f"{value:.0f}{unit}" if unit == "B" else f"{value:.1f}{unit}"
+        value /= 1024
+    return f"{value:.2f}G"
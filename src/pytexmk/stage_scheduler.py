@@ -0,0 +1,97 @@
+"""辅助工具阶段调度：根据各阶段读写的文件构建依赖 DAG，互不依赖的阶段（biber / bibtex、各个
+glossaries / nomencl / makeidx 的 makeindex）并发执行。
+
+每个阶段本身就是独立的外部进程，调度器用线程池同时启动并等待这些进程；同一批只有一个阶段时在当前
+线程内执行，保留实时状态显示。
+
+并发执行的限制：
+  - 同一批的阶段同时运行，编译产物清单（BuildManifest.track）的目录差异无法区分文件由哪个阶段创建，
+    新出现的文件可能记在同批的其他阶段名下；清除时按全部阶段的记录处理，不影响清除结果。
+  - 任一阶段失败（SystemExit）时取消同批中尚未开始的阶段；已在运行的外部进程无法中断，等其结束后再向上抛出。
+"""
+import logging
+import os
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable
+
+from pytexmk.language import set_language
+from pytexmk.timing import span, time_count
+from pytexmk.ui_messages import print_message
+
+_ = set_language("stage_scheduler")
+
+
+@dataclass
+class Stage:
+    """一个辅助工具阶段：run(show_status) 执行该阶段，inputs / outputs 用于推断阶段间依赖。"""
+
+    name: str
+    run: Callable[[bool], object]
+    inputs: list[str] = field(default_factory=list)
+    outputs: list[str] = field(default_factory=list)
+
+
+def build_stage_dag(stages: list[Stage]) -> dict[str, set[str]]:
+    """返回 {阶段名: 依赖的阶段名集合}：若阶段 B 读取了排在它之前的阶段 A 写出的文件，则 B 依赖 A。"""
+    dag = {}
+    for j, stage in enumerate(stages):
+        inputs = set(stage.inputs)
+        dag[stage.name] = {earlier.name for earlier in stages[:j] if inputs & set(earlier.outputs)}
+    return dag
+
+
+def stage_waves(stages: list[Stage]) -> list[list[Stage]]:
+    """按依赖关系将阶段分批：同一批内的阶段互不依赖，可同时执行。"""
+    dag = build_stage_dag(stages)
+    done: set[str] = set()
+    pending = list(stages)
+    waves = []
+    while pending:
+        wave = [stage for stage in pending if dag[stage.name] <= done]
+        waves.append(wave)
+        done.update(stage.name for stage in wave)
+        pending = [stage for stage in pending if stage.name not in done]
+    return waves
+
+
+def _run_stage(stage: Stage, show_status: bool):
+    with span(stage.name, cat="tool"):
+        return stage.run(show_status)
+
+
+def run_stages(stages: list[Stage], runtime_dict: dict, max_workers: int | None = None):
+    """按 DAG 分批执行阶段，每个阶段的耗时写入 runtime_dict（键为「<阶段名> 编译」，顺序与 stages 一致）。
+
+    任一阶段失败（SystemExit）时取消同批中尚未开始的阶段，等待已在运行的阶段结束后再向上抛出。
+    """
+    logger = logging.getLogger(__name__)
+    runtimes = {}
+    for wave in stage_waves(stages):
+        for stage in wave:
+            print_message(_("%(args)s 编译") % {"args": stage.name}, "running")
+        if len(wave) == 1:
+            runtimes[wave[0].name], _ret = time_count(_run_stage, wave[0], True)
+            continue
+
+        logger.info(_("并发执行互不依赖的阶段: ") + ", ".join(stage.name for stage in wave))
+        workers = min(len(wave), max_workers or os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {stage.name: pool.submit(time_count, _run_stage, stage, False) for stage in wave}
+            done, _pending = wait(futures.values(), return_when=FIRST_EXCEPTION)
+            if any(future.exception() is not None for future in done):
+                for future in futures.values():
+                    future.cancel()
+        failure = None
+        for name, future in futures.items():
+            if future.cancelled():
+                continue
+            try:
+                runtimes[name], _ret = future.result()
+            except SystemExit as e:
+                failure = failure or e
+        if failure is not None:
+            raise failure
+
+    for stage in stages:
+        runtime_dict[_("%(args)s 编译") % {"args": stage.name}] = runtimes[stage.name]
@@ -1,14 +1,34 @@
+import contextlib
 import logging
+import queue
 import subprocess
+import tempfile
+import threading
 import time
+from collections import deque
 from pathlib import Path
 
+from rich.text import Text
+
 from pytexmk.file_ops import FileMoveRemoveManager
 from pytexmk.language import set_language
+from pytexmk.resource_usage import record_usage, wait_with_usage
+from pytexmk.timing import span
 from pytexmk.ui_theme import console
 
 _ = set_language("subprocess_runner")
 
+# 并发阶段的输出整块打印，避免不同进程的输出行交错
+_output_lock = threading.Lock()
+# 环形缓冲保留的末尾输出行数（失败上下文），内存占用与命令输出总量无关
+OUTPUT_TAIL_LINES = 200
+# 命令失败且输出未显示过时打印的末尾行数
+FAILURE_CONTEXT_LINES = 20
+# 终端渲染间隔（秒）：期间到达的输出行合并为一次打印
+RENDER_INTERVAL = 0.1
+# 安静模式下失败时从输出文件末尾读取的最大字节数
+TAIL_READ_BYTES = 64 * 1024
+
 
 class SubprocessFailedError(Exception):
     def __init__(self, command, exit_code, stdout, stderr):
@@ -21,13 +41,88 @@ class SubprocessFailedError(Exception):
 
 
 
+class OutputPipeline:
+    """命令输出的逐行处理：环形缓冲保留末尾若干行，调用行观察者，并按 RENDER_INTERVAL 批量渲染到终端。
+
+    render=False 或标准输出不是终端时不渲染，输出只保留在环形缓冲中；事后打印时以 tail_text() 注明省略的行数。
+    """
+
+    def __init__(self, render: bool, line_observers: list | None = None):
+        self.tail: deque[str] = deque(maxlen=OUTPUT_TAIL_LINES)
+        self.observers = list(line_observers or ())
+        self.render = render and console.is_terminal
+        self.line_count = 0  # 读取到的总行数
+        self._batch: list[str] = []
+
+    def feed(self, line: str):
+        self.line_count += 1
+        self.tail.append(line)
+        for observer in self.observers:
+            observer(line)
+        if self.render:
+            self._batch.append(line.rstrip())
+
+    def tail_text(self, max_lines: int | None = None) -> str:
+        """环形缓冲中末尾至多 max_lines 行（默认全部）；更早的输出已丢弃时在开头注明省略的行数。"""
+        lines = list(self.tail)[-max_lines:] if max_lines else list(self.tail)
+        text = "".join(lines).rstrip()
+        omitted = self.line_count - len(lines)
+        if omitted > 0:
+            text = _("… 省略了前 %(n)s 行输出") % {"n": omitted} + "\n" + text
+        return text
+
+    def flush(self):
+        if self._batch:
+            console.print(Text("\n".join(self._batch), style="dim"))
+            self._batch.clear()
+
+    def consume(self, stream):
+        """读取命令输出直到结束；渲染时由后台线程读取，主线程每 RENDER_INTERVAL 合并打印一次。"""
+        if not self.render:
+            for line in stream:
+                self.feed(line)
+            return
+        lines: queue.SimpleQueue = queue.SimpleQueue()
+
+        def reader():
+            for line in stream:
+                lines.put(line)
+            lines.put(None)
+
+        threading.Thread(target=reader, daemon=True).start()
+        deadline = time.monotonic() + RENDER_INTERVAL
+        while True:
+            try:
+                line = lines.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                line = ""
+            if line is None:
+                break
+            if line:
+                self.feed(line)
+            if time.monotonic() >= deadline:
+                self.flush()
+                deadline = time.monotonic() + RENDER_INTERVAL
+        self.flush()
+
+
+def _read_tail(fobj, max_lines: int) -> list[str]:
+    """读取文件末尾至多 max_lines 行（只读取末尾 TAIL_READ_BYTES 字节）。"""
+    fobj.seek(0, 2)
+    size = fobj.tell()
+    fobj.seek(max(size - TAIL_READ_BYTES, 0))
+    data = fobj.read().decode("utf-8", errors="replace")
+    return data.splitlines(keepends=True)[-max_lines:]
+
+
 class MySubProcess:
     def __init__(
-        self, outdir, auxdir, project_name: str | None = None, latexdiff: bool = False
+        self, outdir, auxdir, project_name: str | None = None, latexdiff: bool = False, quiet: bool = False
     ):
         self.logger = logging.getLogger(__name__)
         self.project_name = project_name
         self.latexdiff = latexdiff
+        self.quiet = quiet  # 安静模式：命令输出直接写入临时文件，不经 Python 读取
         self.outdir = outdir
         self.auxdir = auxdir
         self.MRO = FileMoveRemoveManager()
@@ -44,55 +139,85 @@ class MySubProcess:
         aux_files: str,
         program_name: str = "执行命令",
         stdout_path: str | None = None,
+        show_status: bool = True,
+        line_observers: list | None = None,
+        cwd: str | None = None,
+        env: dict[str, str] | None = None,
     ) -> bool:
-        stdout_lines = []
+        """运行外部命令；show_status=False 时（多个阶段并发）不显示状态动画，输出在命令结束后整块打印。
+
+        line_observers 为逐行回调（参数为一行输出），在读取到命令的每一行输出时调用；
+        输出重定向到 stdout_path 或安静模式下不读取输出，也不调用。
+        cwd / env 为命令的工作目录与环境变量（原生目录模式下文献 / 索引工具在辅助目录中运行），默认沿用当前进程。
+        """
+        pipeline = OutputPipeline(render=show_status, line_observers=line_observers)
+        displayed = pipeline.render
         try:
-            console.print(_("[bold]运行命令: [/bold]") + f"[cyan]{' '.join(command)}")
+            if show_status:
+                console.print(_("[bold]运行命令: [/bold]") + f"[cyan]{' '.join(command)}")
             start_time = time.time()
-
-            if stdout_path is not None:
-                output_dir = Path(stdout_path).parent
-                if not output_dir.exists():
-                    output_dir.mkdir(parents=True, exist_ok=True)
-                with open(stdout_path, "w", encoding="utf-8") as stdout_file:
+            start = time.monotonic()
+            status = console.status(f"[status]正在{program_name}...") if show_status else contextlib.nullcontext()
+
+            with span(program_name, cat="process", command=" ".join(map(str, command))):
+                if stdout_path is not None:
+                    output_dir = Path(stdout_path).parent
+                    if not output_dir.exists():
+                        output_dir.mkdir(parents=True, exist_ok=True)
+                    with open(stdout_path, "w", encoding="utf-8") as stdout_file:
+                        process = subprocess.Popen(
+                            command,
+                            cwd=cwd,
+                            env=env,
+                            stdout=stdout_file,
+                            stderr=subprocess.STDOUT,
+                            text=True,
+                            bufsize=1,
+                            encoding="utf-8",
+                        )
+                        with status:
+                            usage = wait_with_usage(process, program_name, command, start)
+                elif self.quiet:
+                    with tempfile.TemporaryFile() as capture:
+                        process = subprocess.Popen(command, cwd=cwd, env=env, stdout=capture, stderr=subprocess.STDOUT)
+                        with status:
+                            usage = wait_with_usage(process, program_name, command, start)
+                        if process.returncode != 0:
+                            pipeline.tail.extend(_read_tail(capture, OUTPUT_TAIL_LINES))
+                    displayed = False
+                else:
                     process = subprocess.Popen(
                         command,
-                        stdout=stdout_file,
+                        cwd=cwd,
+                        env=env,
+                        stdout=subprocess.PIPE,
                         stderr=subprocess.STDOUT,
                         text=True,
-                        bufsize=1,
                         encoding="utf-8",
+                        errors="replace",
+                    )
+                    with status:
+                        pipeline.consume(process.stdout)
+                        usage = wait_with_usage(process, program_name, command, start)
+            record_usage(usage)
+
+            duration = self._format_duration(time.time() - start_time)
+            with _output_lock:
+                if not show_status:
+                    console.print(_("[bold]运行命令: [/bold]") + f"[cyan]{' '.join(command)}")
+                    if not self.quiet and console.is_terminal and pipeline.tail:
+                        console.print(Text(pipeline.tail_text(), style="dim"))
+                        displayed = True
+                if process.returncode == 0:
+                    console.print(
+                        f"[√] 运行 {program_name} 成功 [time](耗时: {duration})[/]",
+                        style="success",
                     )
-                    with console.status(f"[status]正在{program_name}..."):
-                        process.wait()
-            else:
-                process = subprocess.Popen(
-                    command,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT,
-                    text=True,
-                    bufsize=1,
-                    encoding="utf-8",
-                )
-                with console.status(f"[status]正在{program_name}..."):
-                    while True:
-                        output = process.stdout.readline()
-                        if not output and process.poll() is not None:
-                            break
-                        if output:
-                            stdout_lines.append(output)
-                            console.print(f"[dim]{output.strip()}[/]")
-
-            if process.returncode == 0:
-                console.print(
-                    f"[√] 运行 {program_name} 成功 "
-                    f"[time](耗时: {self._format_duration(time.time() - start_time)})[/]",
-                    style="success",
-                )
-                return True
-
-            else:
-                raise subprocess.CalledProcessError(process.returncode, command)
+                    return True
+                if not displayed and pipeline.tail:
+                    console.print(Text(pipeline.tail_text(FAILURE_CONTEXT_LINES), style="dim"))
+
+            raise subprocess.CalledProcessError(process.returncode, command)
 
         except subprocess.CalledProcessError as e:
             self.logger.error(
@@ -104,7 +229,7 @@ class MySubProcess:
             self.MRO.move_specific_files(aux_files, ".", self.auxdir)
             self.MRO.move_specific_files(out_files, ".", self.outdir)
 
-            stdout = "".join(stdout_lines)
+            stdout = "".join(pipeline.tail)
             raise SubprocessFailedError(
                 command=command,
                 exit_code=e.returncode,
@@ -10,6 +10,19 @@ from pytexmk.lifecycle import exit_pytexmk
 
 _ = set_language("tex_project")
 
+INPUT_TEX_PATTERN = re.compile(r"\\(?:input|include|subfile)\{([^}]+)\}")
+INPUT_BIB_PATTERN = re.compile(r"\\(?:bibliography|addbibresource)(?:\[[^\]]*\])?\{([^}]+)\}")
+INPUT_GRAPHICS_PATTERN = re.compile(r"\\includegraphics\*?(?:\[[^\]]*\])?\{([^}]+)\}")
+INPUT_PACKAGE_PATTERN = re.compile(r"\\(?:usepackage|RequirePackage|documentclass)(?:\[[^\]]*\])?\{([^}]+)\}")
+GRAPHICS_SUFFIXES = ("", ".pdf", ".png", ".jpg", ".jpeg", ".eps")
+
+
+def _strip_tex_comment(line: str) -> str:
+    for i, ch in enumerate(line):
+        if ch == "%" and (i == 0 or line[i - 1] != "\\"):
+            return line[:i]
+    return line
+
 
 class MainFileOperation:
     def __init__(self):
@@ -229,6 +242,53 @@ class MainFileOperation:
 
         return project_name
 
+    def find_input_files(self, project_name: str) -> list[str]:
+        """递归检索主文件引入的本地文件（子文件、参考文献库、图片、本地宏包与文档类）。"""
+        found: dict[str, None] = {}
+        pending = [Path(f"{project_name}.tex")]
+
+        while pending:
+            tex_path = pending.pop()
+            if tex_path.as_posix() in found or not tex_path.is_file():
+                continue
+            found[tex_path.as_posix()] = None
+            try:
+                content = tex_path.read_text(encoding="utf-8")
+            except (OSError, UnicodeDecodeError) as e:
+                self.logger.warning(_("打开文件失败: ") + f"{tex_path} --> {e}")
+                continue
+            content = "\n".join(_strip_tex_comment(line) for line in content.splitlines())
+
+            for match in INPUT_TEX_PATTERN.finditer(content):
+                sub_path = Path(match.group(1).strip())
+                pending.append(sub_path if sub_path.suffix == ".tex" else Path(f"{sub_path}.tex"))
+
+            for match in INPUT_BIB_PATTERN.finditer(content):
+                for bib_name in match.group(1).split(","):
+                    bib_path = Path(bib_name.strip())
+                    if bib_path.suffix != ".bib":
+                        bib_path = Path(f"{bib_path}.bib")
+                    if bib_path.is_file():
+                        found[bib_path.as_posix()] = None
+
+            for match in INPUT_GRAPHICS_PATTERN.finditer(content):
+                graphics_name = match.group(1).strip()
+                for suffix in GRAPHICS_SUFFIXES:
+                    graphics_path = Path(f"{graphics_name}{suffix}")
+                    if graphics_path.is_file():
+                        found[graphics_path.as_posix()] = None
+                        break
+
+            for match in INPUT_PACKAGE_PATTERN.finditer(content):
+                for package_name in match.group(1).split(","):
+                    for suffix in (".sty", ".cls"):
+                        package_path = Path(f"{package_name.strip()}{suffix}")
+                        if package_path.is_file():
+                            found[package_path.as_posix()] = None
+
+        self.logger.info(_("检索到主文件引入的本地文件数目: ") + str(len(found)))
+        return list(found)
+
     def draft_model(self, project_name: str, draft_run: bool, draft_judgement: bool):
         if not draft_run:
             self.logger.info(_("草稿模式未启用, 跳过处理."))
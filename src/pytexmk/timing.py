@@ -1,11 +1,17 @@
+import contextlib
 import datetime
+import json
 import logging
+import os
+import threading
+import time
 
 from rich import box, print
 from rich.table import Table
 from rich.text import Text
 
 from pytexmk.language import set_language
+from pytexmk.resource_usage import ToolUsage, format_bytes
 from pytexmk.ui_theme import console
 
 logger = logging.getLogger(__name__)
@@ -15,6 +21,79 @@ _ = set_language("timing")
 total_len = 78
 
 
+class Span:
+    """一个计时区间；退出 with 块后 seconds 为区间时长。"""
+
+    __slots__ = ("name", "start_ns", "end_ns")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns = self.start_ns
+
+    @property
+    def seconds(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e9
+
+
+class Tracer:
+    """基于 perf_counter_ns 的区间追踪：嵌套的 span 按线程记录，导出为 Chrome trace 事件格式（chrome://tracing、Perfetto）。
+
+    未调用 start() 时只计时不记录；并发阶段在各自线程中记录，在 trace 视图中显示为不同的行。
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.events: list[dict] = []
+        self._lock = threading.Lock()
+
+    def start(self, process_name: str = "pytexmk"):
+        """开始（重新）记录，清空已有事件；process_name 为 trace 视图中本进程的名称。"""
+        with self._lock:
+            self.events = [{
+                "name": "process_name", "ph": "M", "pid": os.getpid(), "tid": 0,
+                "args": {"name": f"{process_name} ({os.getpid()})"},
+            }]
+        self.enabled = True
+
+    @contextlib.contextmanager
+    def span(self, name: str, cat: str = "pytexmk", **args):
+        current = Span(name)
+        try:
+            yield current
+        finally:
+            current.end_ns = time.perf_counter_ns()
+            if self.enabled:
+                event = {
+                    "name": name,
+                    "cat": cat,
+                    "ph": "X",
+                    # perf_counter 在 Linux 下为系统级单调时钟，--all 各子进程的事件可直接合并
+                    "ts": current.start_ns / 1000,
+                    "dur": (current.end_ns - current.start_ns) / 1000,
+                    "pid": os.getpid(),
+                    "tid": threading.get_native_id(),
+                }
+                if args:
+                    event["args"] = args
+                with self._lock:
+                    self.events.append(event)
+
+    def take_events(self) -> list[dict]:
+        with self._lock:
+            events, self.events = self.events, []
+        return events
+
+    @staticmethod
+    def write(path, events: list[dict]):
+        with open(path, "w", encoding="utf-8") as fobj:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, fobj, ensure_ascii=False)
+
+
+tracer = Tracer()
+span = tracer.span
+
+
 def time_count(fun, *args, **kwargs):
     try:
         time_start = datetime.datetime.now()  # noqa: DTZ005
@@ -35,7 +114,44 @@ def get_text_len(text):
     return text_len
 
 
-def time_print(start_time, runtime_dict):
+def usage_table(usage_records: list[ToolUsage]) -> Table:
+    """外部程序资源占用统计表：每次运行一行，列出运行时长、CPU 用户态 / 内核态时间、峰值内存与读写字节数。"""
+    table = Table(
+        show_header=True,
+        header_style="bold dark_orange",
+        box=box.ASCII_DOUBLE_HEAD,
+        title=_("外部程序资源占用统计表"),
+    )
+    table.add_column(Text(_("运行程序"), justify="center"), style="cyan", justify="left", no_wrap=True)
+    for header in (_("时长"), _("用户态"), _("内核态")):
+        table.add_column(header, style="green", justify="right", no_wrap=True)
+    for header in (_("峰值内存"), _("读取"), _("写入")):
+        table.add_column(header, style="magenta", justify="right", no_wrap=True)
+
+    def seconds(value):
+        return "-" if value is None else f"{value:.2f}s"
+
+    for usage in usage_records:
+        name = Text(usage.program)
+        if usage.exit_code != 0:
+            name.append(f" ({usage.exit_code})", style="red")  # 非零退出码（负值为终止信号，如 -9 为 OOM 终止）
+        table.add_row(
+            name,
+            seconds(usage.wall_s),
+            seconds(usage.user_s),
+            seconds(usage.sys_s),
+            format_bytes(usage.max_rss_bytes),
+            format_bytes(usage.read_bytes),
+            format_bytes(usage.write_bytes),
+        )
+    return table
+
+
+def time_print(start_time, runtime_dict, summary=True, usage_records=None):
+    """打印运行时长统计表；summary=False 时（多个任务并行）不汇总 LaTeX / Python 时长，只给出总时长。
+
+    usage_records 为本次运行的外部程序资源占用记录（resource_usage.take_usage_records），非空时在统计表后打印资源占用表。
+    """
     try:
         end_time = datetime.datetime.now()  # noqa: DTZ005
         run_time = end_time - start_time
@@ -62,7 +178,9 @@ def time_print(start_time, runtime_dict):
             )
         ]
 
-        if time_LaTeX_list:
+        if not summary:
+            runtime_dict.update({_("PyTeXMK 运行时长"): time_pytexmk})
+        elif time_LaTeX_list:
             time_LaTeX = sum(time_LaTeX_list)
             time_python = total_seconds - time_LaTeX
             runtime_dict.update(
@@ -143,6 +261,8 @@ def time_print(start_time, runtime_dict):
 
         print("\n" + "=" * total_len + "\n")
         console.print(table)
+        if usage_records:
+            console.print(usage_table(usage_records))
 
         print(
             _("PyTeXMK 运行时长: ")
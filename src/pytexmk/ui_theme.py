@@ -12,3 +12,8 @@ custom_theme = Theme(
     }
 )
 console = Console(theme=custom_theme, legacy_windows=False)
+
+
+def reset_console():
+    """按当前环境变量（FORCE_COLOR / COLUMNS 等）重新初始化共享的 console（守护进程 worker 使用）。"""
+    console.__dict__ = Console(theme=custom_theme, legacy_windows=False).__dict__
@@ -0,0 +1,100 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import hashlib
+
+from pytexmk import aux_snapshot
+from pytexmk.aux_snapshot import AuxSnapshot, normalize_aux_like
+from pytexmk.detection import CompilationDetector
+
+MAIN_AUX = (
+    "\\relax\n"
+    "\\citation{knuth}\n"
+    "\\bibdata{refs}\n"
+    "\\@newglossary{main}{glg}{gls}{glo}\n"
+    "\\newlabel{sec:intro}{{1}{1}}\n"
+    "\\@input{chapters/ch1.aux}\n"
+    "\\@input{chapters/missing.aux}\n"
+)
+CHAPTER_AUX = "\\relax\n\\citation{knuth}\n\\citation{lamport}\n\\newlabel{fig:a}{{1.1}{2}}\n"
+
+
+def _make_aux(root: Path):
+    (root / "chapters").mkdir()
+    (root / "main.aux").write_text(MAIN_AUX, encoding="utf-8")
+    (root / "chapters" / "ch1.aux").write_text(CHAPTER_AUX, encoding="utf-8")
+
+
+def test_aux_snapshot_parses_main_and_child_aux(tmp_path, monkeypatch):
+    _make_aux(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    snapshot = AuxSnapshot.read("main.aux")
+    assert snapshot.exists
+    assert {name: dict(counter) for name, counter in snapshot.citations.items()} == {
+        "main.aux": {"knuth": 1},
+        "chapters/ch1.aux": {"knuth": 1, "lamport": 1},
+    }
+    assert snapshot.bibdata == "refs"
+    assert not snapshot.biber and not snapshot.bibcite
+    assert snapshot.glossaries == [("main", "gls", "glo")]
+    assert snapshot.labels == {"sec:intro": "{1}{1}", "fig:a": "{1.1}{2}"}
+    assert snapshot.missing == ["chapters/missing.aux"]
+
+    # 注释与 \relax 不影响摘要，子 .aux 中标签变化会改变摘要
+    (tmp_path / "main.aux").write_text("% comment\n" + MAIN_AUX, encoding="utf-8")
+    assert AuxSnapshot.read("main.aux").digest == snapshot.digest
+    (tmp_path / "chapters" / "ch1.aux").write_text(CHAPTER_AUX.replace("{2}", "{3}"), encoding="utf-8")
+    assert AuxSnapshot.read("main.aux").digest != snapshot.digest
+
+
+def test_aux_snapshot_fallback_dir_and_missing(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert not AuxSnapshot.read("main.aux").exists
+    (tmp_path / "Auxiliary").mkdir()
+    (tmp_path / "Auxiliary" / "main.aux").write_text("\\bibcite{a}{1}\n", encoding="utf-8")
+    snapshot = AuxSnapshot.read("main.aux", "Auxiliary/")
+    assert snapshot.exists and snapshot.bibcite
+
+
+def test_detector_judgments_share_one_snapshot(tmp_path, monkeypatch):
+    _make_aux(tmp_path)
+    (tmp_path / "refs.bib").write_text("@book{knuth}\n", encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    detector = CompilationDetector("main", "PdfLaTeX", [], [], "./Build/", "./Auxiliary/", False, None)
+    cite_counter, _toc, _index = detector.prepare_LaTeX_output_files()
+    aux_digest, _out = detector.prepare_aux_out_snapshots()
+
+    reads = []
+    monkeypatch.setattr(aux_snapshot, "open", lambda path, *a, **k: reads.append(Path(path).name) or open(path, *a, **k), raising=False)
+    dims, next_extra, bib_engine, _cmds, _times = detector.run_full_detection(
+        cite_counter_old=cite_counter, toc_file_old="", index_aux_content_old={},
+        aux_digest_old=aux_digest, out_content_old="",
+    )
+    assert reads == ["main.aux", "ch1.aux", "missing.aux"]  # 每个文件只读取一次
+    assert bib_engine == "bibtex" and dims["bib"] == 0 and dims["aux"] == 0
+    assert set(detector.dimension_times) == {"snapshot", "bib", "idx", "toc", "aux", "out", "log"}
+
+
+def test_streaming_parse_matches_whole_file_normalization(tmp_path, monkeypatch):
+    content = (
+        "\\relax\n"
+        "% generated\n"
+        "\\abx@aux@refcontext{nty/global//global/global}\n"
+        "\\abx@aux@cite{0}{knuth}\n"
+        "\\abx@aux@cite{0}{knuth}  % again\n"
+        "\\bibcite{lamport}{1}\n"
+        "\\newlabel{eq:100\\%}{{1}{2}}\n"
+        "\\bookmarksetup{startatroot}\n"
+        "\\gdef \\@abspage@last{3}\n"
+        "\n"
+    )
+    (tmp_path / "main.aux").write_text(content, encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    snapshot = AuxSnapshot.read("main.aux")
+    # 逐行流式计算的摘要与整文件规范化后的摘要一致
+    assert snapshot.file_digests["main.aux"] == hashlib.sha256(normalize_aux_like(content).encode("utf-8")).hexdigest()
+    assert dict(snapshot.citations["main.aux"]) == {"knuth": 2, "lamport": 1}
+    assert snapshot.biber and snapshot.bibcite
+    assert snapshot.labels == {"eq:100\\%": "{1}{2}"}
@@ -0,0 +1,57 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from pytexmk.build_history import BuildHistory, pass_distribution, percentile, regressions, stage_statistics
+
+
+def _record(history, seconds, passes=2, status="ok", project="main"):
+    rounds = [{"bib": 1, "idx": 0, "toc": 1, "aux": 0, "out": 0, "log": 0}] + [{}] * (passes - 1)
+    history.record(project, "XeLaTeX", status, seconds + 1.0, {"XeLaTeX 1st": seconds, "biber": 0.5}, rounds, "0.0")
+
+
+def test_runs_round_trip_per_directory_and_project(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    history = BuildHistory(tmp_path / "history.sqlite3")
+    _record(history, 1.0)
+    _record(history, 2.0, passes=3, status="failed")
+    _record(history, 3.0, project="letter")
+
+    runs = history.runs()
+    assert [run["stages"]["XeLaTeX 1st"] for run in runs] == [1.0, 2.0, 3.0]
+    assert runs[1]["status"] == "failed" and runs[1]["passes"] == 3
+    assert runs[0]["rounds"][0] == {"bib": 1, "idx": 0, "toc": 1, "aux": 0, "out": 0, "log": 0}
+    assert [run["project"] for run in history.runs("letter")] == ["letter"]
+    assert len(history.runs(limit=2)) == 2
+
+    other = tmp_path / "other"
+    other.mkdir()
+    monkeypatch.chdir(other)
+    assert history.runs() == []
+
+
+def test_statistics_and_regression_alerts(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    history = BuildHistory(tmp_path / "history.sqlite3")
+    for seconds in (1.0, 1.1, 0.9, 1.0, 1.05):
+        _record(history, seconds)
+    _record(history, 9.0, status="failed")  # 失败的编译不计入统计与基线
+    runs = history.runs()
+
+    stats = stage_statistics(runs)
+    assert stats["XeLaTeX 1st"]["count"] == 5
+    assert stats["XeLaTeX 1st"]["p50"] == 1.0 and stats["XeLaTeX 1st"]["p95"] == 1.1
+    assert pass_distribution(runs) == {2: 5}
+    assert regressions(runs) == []
+
+    _record(history, 1.6, passes=3)
+    alerts = regressions(history.runs())
+    assert [name for name, _baseline, _latest in alerts] == ["XeLaTeX 1st", "total"]
+    assert alerts[0][1:] == (1.0, 1.6)
+
+
+def test_percentile_nearest_rank():
+    assert percentile([3.0], 95) == 3.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.0
+    assert percentile(list(range(1, 101)), 95) == 95
@@ -0,0 +1,74 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from pytexmk.build_manifest import BuildManifest
+from pytexmk.file_ops import FileMoveRemoveManager
+
+
+def test_track_records_files_created_by_a_tool(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "main.tex").write_text("", encoding="utf-8")
+    (tmp_path / "main.aux").write_text("", encoding="utf-8")  # 编译前已存在（常规模式下移入根目录）
+    (tmp_path / "Auxiliary").mkdir()
+
+    manifest = BuildManifest("main")
+    with manifest.track("xelatex", [".", "Auxiliary"], reserved=["Build", "Auxiliary"]):
+        (tmp_path / "main.aux").write_text("\\relax\n", encoding="utf-8")
+        (tmp_path / "main.pyg").write_text("", encoding="utf-8")
+        (tmp_path / "_minted-main" / "default").mkdir(parents=True)
+        (tmp_path / "_minted-main" / "default" / "A1B2.pygtex").write_text("", encoding="utf-8")
+        (tmp_path / "Auxiliary" / "main.xdv").write_text("", encoding="utf-8")
+        (tmp_path / "notes.txt").write_text("", encoding="utf-8")  # 用户在编译期间保存的文件
+        (tmp_path / "main-notes.tex").write_text("", encoding="utf-8")  # 以主文件名开头的源文件
+        (tmp_path / "mainly.log").write_text("", encoding="utf-8")  # 主文件名后没有分隔符
+        (tmp_path / "Build").mkdir()  # 其他编译任务新建的输出目录
+        (tmp_path / "Build" / "letter.pdf").write_text("", encoding="utf-8")
+    manifest.record("xelatex", ["main.aux", "main.pdf"])  # .fls 中的输出文件
+
+    assert sorted(manifest.stages["xelatex"]) == sorted([
+        "_minted-main/", "_minted-main/default/", "_minted-main/default/A1B2.pygtex",
+        "main.pyg", "main.xdv", "main.aux", "main.pdf",
+    ])
+    assert "main.tex" not in manifest.files()
+    assert "main.pdf" not in manifest.files(exclude=["main.pdf"])
+    assert manifest.dirs() == ["_minted-main/default", "_minted-main"]
+
+
+def test_manifest_round_trip_and_clean(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manifest = BuildManifest("main")
+    manifest.record("xelatex", ["main.aux", "chapters/intro.aux", "_minted-main/", "_minted-main/x.pygtex"])
+    manifest.record("biber", ["main.bbl", "main.blg"])
+    manifest.save("Auxiliary/")
+    job = BuildManifest("letter")
+    job.record("pdflatex", ["letter.aux"])
+    job.save("Auxiliary/letter/")
+
+    loaded = BuildManifest.load("main", "Auxiliary/")
+    assert loaded.stages == manifest.stages
+    assert [(m.project_name, Path(d).as_posix()) for m, d in BuildManifest.find_all("Auxiliary/")] == [
+        ("main", "Auxiliary"), ("letter", "Auxiliary/letter"),
+    ]
+
+    # 按清单删除：只删除记录的文件，新建目录为空时一并删除
+    for name in ["main.aux", "main.bbl", "_minted-main/x.pygtex", "main.tex", "notes.aux"]:
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text("", encoding="utf-8")
+    mro = FileMoveRemoveManager()
+    mro.remove_specific_files(loaded.files(), ".")
+    mro.remove_empty_dirs(loaded.dirs(), ".")
+    assert sorted(p.name for p in tmp_path.iterdir() if p.is_file()) == ["main.tex", "notes.aux"]
+    assert not (tmp_path / "_minted-main").exists()
+
+
+def test_track_skips_reserved_dirs(tmp_path, monkeypatch):
+    # 输出目录与主文件同名前缀时同样不记录
+    monkeypatch.chdir(tmp_path)
+    manifest = BuildManifest("main")
+    with manifest.track("pdflatex", ["."], reserved=["main-output"]):
+        (tmp_path / "main-output").mkdir()
+        (tmp_path / "main-output" / "main.pdf").write_text("", encoding="utf-8")
+        (tmp_path / "main.log").write_text("", encoding="utf-8")
+    assert manifest.stages == {"pdflatex": ["main.log"]}
@@ -0,0 +1,103 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from pytexmk import build_state
+from pytexmk.build_state import BuildStateManager
+from pytexmk.tex_project import MainFileOperation
+
+OPTIONS = {"compiled_program": "XeLaTeX", "draft": False}
+
+
+def _make_project(root: Path):
+    (root / "chapters").mkdir()
+    (root / "main.tex").write_text(
+        "\\documentclass{article}\n"
+        "\\usepackage{mystyle}\n"
+        "\\addbibresource{refs.bib}\n"
+        "\\begin{document}\n"
+        "\\input{chapters/intro}\n"
+        "% \\input{chapters/commented}\n"
+        "\\includegraphics[width=3cm]{figure}\n"
+        "\\end{document}\n",
+        encoding="utf-8",
+    )
+    (root / "chapters" / "intro.tex").write_text("Intro \\cite{key}\n", encoding="utf-8")
+    (root / "chapters" / "commented.tex").write_text("never read\n", encoding="utf-8")
+    (root / "refs.bib").write_text("@book{key, title={T}}\n", encoding="utf-8")
+    (root / "mystyle.sty").write_text("\\relax\n", encoding="utf-8")
+    (root / "figure.pdf").write_bytes(b"%PDF-1.5\n")
+    (root / "Build").mkdir()
+    (root / "Build" / "main.pdf").write_bytes(b"%PDF-1.5\n")
+
+
+def test_find_input_files(tmp_path, monkeypatch):
+    _make_project(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    files = set(MainFileOperation().find_input_files("main"))
+    assert files == {"main.tex", "chapters/intro.tex", "refs.bib", "mystyle.sty", "figure.pdf"}
+
+
+def test_build_state_round_trip(tmp_path, monkeypatch):
+    _make_project(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    inputs = MainFileOperation().find_input_files("main")
+    bsm = BuildStateManager("main", "./Auxiliary/", "./Build/")
+
+    assert not bsm.is_up_to_date(OPTIONS, ["main.pdf"])
+    bsm.save(OPTIONS, bsm.snapshot(inputs))
+    assert bsm.is_up_to_date(OPTIONS, ["main.pdf"])
+
+    # 仅修改时间戳、内容不变时仍视为最新
+    intro = Path("chapters/intro.tex")
+    stat = intro.stat()
+    os.utime(intro, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert bsm.is_up_to_date(OPTIONS, ["main.pdf"])
+
+    assert not bsm.is_up_to_date({**OPTIONS, "draft": True}, ["main.pdf"])
+    assert not bsm.is_up_to_date(OPTIONS, ["main.pdf", "main.synctex.gz"])
+
+    Path("refs.bib").write_text("@book{key, title={Changed}}\n", encoding="utf-8")
+    assert not bsm.is_up_to_date(OPTIONS, ["main.pdf"])
+
+
+def test_build_state_keeps_pre_build_digest_of_files_edited_during_build(tmp_path, monkeypatch):
+    _make_project(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    bsm = BuildStateManager("main", "./Auxiliary/", "./Build/")
+    snapshot = bsm.snapshot(["main.tex", "chapters/intro.tex"])
+    Path("chapters/intro.tex").write_text("Edited while compiling\n", encoding="utf-8")
+    bsm.save(OPTIONS, snapshot)
+    assert not bsm.is_up_to_date(OPTIONS, ["main.pdf"])
+
+
+def test_build_state_hashes_only_changed_project_files(tmp_path, monkeypatch):
+    _make_project(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    system_file = tmp_path / "texmf" / "article.cls"  # 项目外的绝对路径，如 TeX 发行版中的类文件
+    system_file.parent.mkdir()
+    system_file.write_text("\\relax\n", encoding="utf-8")
+    files = ["main.tex", "chapters/intro.tex", str(system_file)]
+
+    hashed = []
+    digest = build_state.file_digest
+    monkeypatch.setattr(build_state, "file_digest", lambda path: hashed.append(str(path)) or digest(path))
+    bsm = BuildStateManager("main", "./Auxiliary/", "./Build/")
+    snapshot = bsm.snapshot(files)
+    assert "sha256" not in snapshot[str(system_file)]
+    bsm.save(OPTIONS, snapshot)
+    assert hashed == ["main.tex", "chapters/intro.tex"]  # 每个项目文件只计算一次，save() 沿用 snapshot() 的摘要
+
+    # 下一次编译只对变化的文件计算摘要
+    hashed.clear()
+    assert bsm.is_up_to_date(OPTIONS, ["main.pdf"])
+    Path("chapters/intro.tex").write_text("Changed\n", encoding="utf-8")
+    bsm.save(OPTIONS, bsm.snapshot(files))
+    assert hashed == ["chapters/intro.tex"]
+
+    # 项目外的文件按修改时间判定
+    stat = system_file.stat()
+    os.utime(system_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert not bsm.is_up_to_date(OPTIONS, ["main.pdf"])
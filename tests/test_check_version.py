@@ -0,0 +1,109 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from pytexmk.cli.check_version import UpdateChecker
+from pytexmk.config import ConfigParser
+
+
+@pytest.fixture
+def release_server():
+    """本地 GitHub API 替身：返回 tag_name，delay 秒后才响应，记录请求次数。"""
+    state = {"tag": "v99.0.0", "delay": 0.0, "requests": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            state["requests"] += 1
+            time.sleep(state["delay"])
+            body = json.dumps({"tag_name": state["tag"]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    state["url"] = f"http://127.0.0.1:{server.server_address[1]}/releases/latest"
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+def _checker(state, tmp_path, time_out=5):
+    checker = UpdateChecker(time_out, 6, api_url=state["url"])
+    checker.cache_file = tmp_path / "cache" / "version_cache.toml"
+    return checker
+
+
+def test_background_check_fetches_and_caches(release_server, tmp_path, capsys):
+    checker = _checker(release_server, tmp_path)
+    checker.start()
+    checker.finish(deadline=5)
+    assert "99.0.0" in capsys.readouterr().out
+    assert 'latest_version = "99.0.0"' in checker.cache_file.read_text(encoding="utf-8")
+
+    # 缓存有效期内不再联网
+    checker = _checker(release_server, tmp_path)
+    checker.start()
+    checker.finish(deadline=5)
+    assert release_server["requests"] == 1
+    assert "99.0.0" in capsys.readouterr().out
+
+
+def test_finish_gives_up_at_the_deadline(release_server, tmp_path, capsys):
+    release_server["delay"] = 2.0
+    checker = _checker(release_server, tmp_path)
+    checker.start()
+    start = time.perf_counter()
+    checker.finish(deadline=0.2)
+    assert time.perf_counter() - start < 1.0
+    assert "99.0.0" not in capsys.readouterr().out
+
+
+def test_update_check_switch(tmp_path):
+    parser = ConfigParser()
+    parser.user_config_path = tmp_path / ".pytexmkrc"
+    assert parser.update_check_enabled()  # 配置文件不存在时默认检查
+
+    default = (Path(__file__).parent.parent / "src" / "pytexmk" / "data" / "default_user_config.toml").read_text(encoding="utf-8")
+    parser.user_config_path.write_text(default, encoding="utf-8")
+    assert parser.update_check_enabled()
+    parser.user_config_path.write_text(default.replace("update_check = true", "update_check = false"), encoding="utf-8")
+    assert not parser.update_check_enabled()
+
+
+@pytest.mark.parametrize("flag", ["-ca", "-Ca"])
+def test_clean_any_reports_the_update_check(tmp_path, flag):
+    # -ca / -Ca 在解析主文件前提前返回，同样要收取后台版本检查的结果
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "main.tex").write_text("\\documentclass{article}\n\\begin{document}\n\\end{document}\n", encoding="utf-8")
+    (project / "main.aux").write_text("\\relax\n", encoding="utf-8")
+    cache = tmp_path / "cache" / "PyTeXMK"
+    cache.mkdir(parents=True)
+    (cache / "PyTeXMK_version_cache.toml").write_text('latest_version = "99.0.0"\n', encoding="utf-8")
+    env = {
+        **os.environ, "HOME": str(tmp_path), "USERPROFILE": str(tmp_path), "XDG_CACHE_HOME": str(tmp_path / "cache"),
+        "PYTHONPATH": os.pathsep.join([str(Path(__file__).parent.parent / "src"), os.environ.get("PYTHONPATH", "")]),
+    }
+    code = f"import sys; sys.argv = ['pytexmk', '{flag}']; from pytexmk.cli.__main__ import main; main()"
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=project, env=env, capture_output=True, text=True, encoding="utf-8", errors="replace",
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    assert not (project / "main.aux").exists()
+    assert "99.0.0" in result.stdout
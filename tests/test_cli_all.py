@@ -0,0 +1,93 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+SRC = ROOT / "src"
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+pytest.importorskip("pytexlogs")  # 编译流程依赖 pytexlogs 的日志分析
+
+import stub_tex  # noqa: E402
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="桩工具链以 /bin/sh 脚本安装")
+
+DOCUMENT = "\\documentclass{{article}}\n\\begin{{document}}\n{body}\n\\end{{document}}\n"
+
+
+def run_pytexmk(project: Path, tmp_path: Path, *argv: str) -> subprocess.CompletedProcess:
+    """在 project 中以桩工具链运行 pytexmk，用户配置关闭版本检查与 PDF 预览。"""
+    home = tmp_path / "home"
+    home.mkdir(exist_ok=True)
+    user_config = (SRC / "pytexmk" / "data" / "default_user_config.toml").read_text(encoding="utf-8")
+    (home / ".pytexmkrc").write_text(
+        user_config.replace("update_check = true", "update_check = false")
+        .replace("pdf_preview_status = true", "pdf_preview_status = false"),
+        encoding="utf-8",
+    )
+    env = {
+        **os.environ,
+        "PATH": f"{stub_tex.install(tmp_path / 'bin')}{os.pathsep}{os.environ.get('PATH', '')}",
+        "PYTHONPATH": os.pathsep.join([str(SRC), os.environ.get("PYTHONPATH", "")]),
+        "HOME": str(home), "USERPROFILE": str(home),
+        "XDG_CONFIG_HOME": str(home / ".config"), "XDG_CACHE_HOME": str(home / ".cache"),
+        "PYTEXMK_NO_DAEMON": "1", "STUB_TEX_LATENCY": "0.05", "STUB_TOOL_LATENCY": "0.01",
+    }
+    code = f"import sys; sys.argv = ['pytexmk', *{list(argv)!r}]; from pytexmk.cli.__main__ import main; main()"
+    return subprocess.run(
+        [sys.executable, "-c", code], cwd=project, env=env, capture_output=True, text=True,
+        encoding="utf-8", errors="replace", timeout=300,
+    )
+
+
+def write_documents(project: Path, bodies: dict[str, str]):
+    project.mkdir()
+    for name, body in bodies.items():
+        (project / f"{name}.tex").write_text(DOCUMENT.format(body=body), encoding="utf-8")
+
+
+def test_all_exits_nonzero_when_a_job_fails(tmp_path):
+    project = tmp_path / "project"
+    write_documents(project, {"good": "Hello.", "bad": "\\errmessage{Undefined control sequence}"})
+
+    result = run_pytexmk(project, tmp_path, "-a", "-j", "2")
+    assert result.returncode == 1, result.stdout[-3000:] + result.stderr[-3000:]
+    assert (project / "Build" / "good.pdf").exists()
+    assert "bad.tex" in result.stdout + result.stderr
+
+
+def test_parallel_jobs_keep_their_own_files(tmp_path):
+    # 同时编译的主文件互相看得到对方新建的文件与目录，编译产物清单不能把它们记到自己名下
+    project = tmp_path / "project"
+    write_documents(project, {name: f"Document {name}." for name in ("a", "b", "c")})
+
+    result = run_pytexmk(project, tmp_path, "-a", "-j", "3")
+    assert result.returncode == 0, result.stdout[-3000:] + result.stderr[-3000:]
+    for name in ("a", "b", "c"):
+        assert (project / "Build" / f"{name}.pdf").exists()
+        job_auxdir = project / "Auxiliary" / name
+        assert not (job_auxdir / "Build").exists() and not (job_auxdir / "Auxiliary").exists()
+        manifest = json.loads((job_auxdir / f"{name}.manifest.json").read_text(encoding="utf-8"))
+        recorded = [path for paths in manifest["stages"].values() for path in paths]
+        assert not [path for path in recorded if path.startswith(("Build", "Auxiliary"))], recorded
+
+
+def test_parallel_jobs_sharing_an_include_use_their_own_auxdir(tmp_path):
+    # 两个主文件 \include 同一章节：各任务的子 .aux 写入自己的辅助目录，不在根目录中互相覆盖
+    project = tmp_path / "project"
+    write_documents(project, {name: "\\include{chapters/shared}\nSee \\ref{sec:shared}." for name in ("a", "b")})
+    (project / "chapters").mkdir()
+    (project / "chapters" / "shared.tex").write_text("\\section{Shared}\\label{sec:shared}\n", encoding="utf-8")
+
+    result = run_pytexmk(project, tmp_path, "-a", "-j", "2")
+    assert result.returncode == 0, result.stdout[-3000:] + result.stderr[-3000:]
+    for name in ("a", "b"):
+        assert (project / "Build" / f"{name}.pdf").exists()
+        shared_aux = project / "Auxiliary" / name / "chapters" / "shared.aux"
+        assert "sec:shared" in shared_aux.read_text(encoding="utf-8")
+    assert sorted(p.name for p in (project / "chapters").iterdir()) == ["shared.tex"]
+    assert not list(project.glob("*.aux"))
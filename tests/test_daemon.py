@@ -0,0 +1,77 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+SRC = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+from pytexmk.cli import client
+from pytexmk.version import __version__
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="守护进程模式依赖 fork 与 Unix 套接字")
+
+
+@pytest.fixture
+def daemon(tmp_path, monkeypatch):
+    runtime_dir = tmp_path / "runtime"
+    runtime_dir.mkdir(mode=0o700)
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(runtime_dir))
+    monkeypatch.delenv("PYTEXMK_NO_DAEMON", raising=False)
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([str(SRC), os.environ.get("PYTHONPATH", "")])}
+    proc = subprocess.Popen(
+        [sys.executable, "-c", "from pytexmk.cli.daemon import serve; serve()"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while not os.path.exists(client.socket_path()):
+        assert proc.poll() is None and time.monotonic() < deadline
+        time.sleep(0.05)
+    yield proc
+    if proc.poll() is None:
+        proc.kill()
+    proc.wait()
+
+
+def test_client_forwards_to_daemon(daemon, capfd):
+    assert client.forward(["--version"]) == 0
+    assert __version__ in capfd.readouterr().out
+
+    # 需要终端交互的参数不转发
+    assert client.forward(["-d", "old", "new"]) is None
+
+    from pytexmk.cli.daemon import stop_daemon
+
+    stop_daemon()
+    assert daemon.wait(timeout=10) == 0
+    assert not os.path.exists(client.socket_path())
+    assert client.forward(["--version"]) is None
+
+
+def test_client_ignores_untrusted_socket(tmp_path, monkeypatch):
+    import socket
+
+    runtime_dir = tmp_path / "shared"
+    runtime_dir.mkdir()
+    runtime_dir.chmod(0o777)  # 其他用户可写的目录中的套接字可能是他人抢先创建的
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(runtime_dir))
+    monkeypatch.delenv("PYTEXMK_NO_DAEMON", raising=False)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(client.socket_path())
+        server.listen(1)
+        server.settimeout(0.2)
+        assert client.forward(["--version"]) is None
+        with pytest.raises(TimeoutError):
+            server.accept()  # 客户端没有连接，也就没有发送环境变量
+
+    runtime_dir.chmod(0o700)
+    assert client.socket_trusted(client.socket_path())
+
+
+def test_socket_dir_without_xdg_runtime_dir_is_private(monkeypatch):
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    assert client.socket_dir() == f"/tmp/pytexmk-{os.getuid()}"
+    assert client.socket_path().startswith(client.socket_dir() + "/")
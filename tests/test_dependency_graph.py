@@ -0,0 +1,100 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from pytexmk.dependency_graph import DependencyGraph, index_command_files, parse_fls
+
+
+def test_parse_fls(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    Path("main.fls").write_text(
+        f"PWD {tmp_path.as_posix()}\n"
+        "INPUT /usr/share/texmf/tex/latex/base/article.cls\n"
+        "INPUT main.tex\n"
+        f"INPUT {tmp_path.as_posix()}/chapters/intro.tex\n"
+        "INPUT ./main.aux\n"
+        "OUTPUT main.aux\n"
+        "INPUT main.tex\n"
+        "OUTPUT main.log\n"
+        "OUTPUT main.synctex.gz(busy)\n",
+        encoding="utf-8",
+    )
+    inputs, outputs = parse_fls("main.fls")
+    assert inputs == [
+        "/usr/share/texmf/tex/latex/base/article.cls",
+        "main.tex",
+        "chapters/intro.tex",
+        "main.aux",
+    ]
+    assert outputs == ["main.aux", "main.log"]
+
+
+def test_record_fls_relative_to_build_dir(tmp_path, monkeypatch):
+    # 原生目录模式：引擎在根目录运行，生成文件写入 -output-directory，记录为相对该目录的路径
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "Auxiliary").mkdir()
+    (tmp_path / "Auxiliary" / "main.fls").write_text(
+        f"PWD {tmp_path.as_posix()}\n"
+        "INPUT main.tex\n"
+        "INPUT ./Auxiliary/main.aux\n"
+        "INPUT ./Auxiliary/main-xelatex.fmt\n"
+        "OUTPUT ./Auxiliary/main.aux\n"
+        "OUTPUT ./Auxiliary/chapters/intro.aux\n",
+        encoding="utf-8",
+    )
+    graph = DependencyGraph("main")
+    assert graph.record_fls(
+        "xelatex", Path("./Auxiliary/") / "main.fls",
+        exclude_inputs=["./Auxiliary/main-xelatex.fmt"], build_dir="./Auxiliary/",
+    )
+    assert graph.stages["xelatex"] == {
+        "inputs": ["main.tex", "main.aux"],
+        "outputs": ["main.aux", "chapters/intro.aux", "main.fls"],
+    }
+    assert graph.source_inputs() == ["main.tex"]
+
+
+def test_index_command_files():
+    inputs, outputs = index_command_files("makeindex -s main.ist -o main.gls main.glo")
+    assert inputs == ["main.ist", "main.glo"]
+    assert outputs == ["main.gls", "main.ilg"]
+    assert index_command_files("makeindex main.idx") == (["main.idx"], ["main.ind", "main.ilg"])
+
+
+def test_dependency_graph_round_trip(tmp_path):
+    graph = DependencyGraph("main")
+    graph.record_stage(
+        "xelatex",
+        ["main.tex", "main.aux", "main.bbl", "/usr/share/texmf/article.cls"],
+        ["main.aux", "main.log", "main.xdv", "chapters/intro.aux"],
+    )
+    graph.record_stage("biber", ["main.bcf", "refs.bib"], ["main.bbl", "main.blg"])
+    graph.record_stage("dvipdfmx", ["main.xdv"], ["main.pdf"])
+    graph.save(str(tmp_path))
+
+    loaded = DependencyGraph.load("main", str(tmp_path))
+    assert loaded.stages == graph.stages
+    assert loaded.source_inputs() == ["main.tex", "/usr/share/texmf/article.cls", "main.bcf", "refs.bib"]
+    assert loaded.generated_files(exclude=["main.pdf"]) == [
+        "main.aux", "main.log", "main.xdv", "chapters/intro.aux", "main.bbl", "main.blg",
+    ]
+    assert loaded.stages_reading("refs.bib") == ["biber"]
+    assert DependencyGraph.load("other", str(tmp_path)) is None
+
+
+def test_tool_stages_for():
+    graph = DependencyGraph("main")
+    graph.record_stage("xelatex", ["main.tex", "chapters/intro.tex", "main.bbl"], ["main.aux", "main.xdv"])
+    graph.record_stage("biber", ["main.bcf", "refs.bib"], ["main.bbl", "main.blg"])
+    graph.record_stage(
+        "glossaries main", ["main.ist", "main.glo"], ["main.gls", "main.ilg"],
+        command="makeindex -s main.ist -o main.gls main.glo",
+    )
+    assert graph.tool_stages_for(["refs.bib"]) == [("biber", None)]
+    assert graph.tool_stages_for(["main.ist"]) == [
+        ("glossaries main", "makeindex -s main.ist -o main.gls main.glo"),
+    ]
+    assert graph.tool_stages_for(["chapters/intro.tex"]) is None
+    assert graph.tool_stages_for(["refs.bib", "chapters/intro.tex"]) is None
+    assert graph.tool_stages_for(["new_chapter.tex"]) is None
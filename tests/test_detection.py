@@ -0,0 +1,103 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from pytexmk.detection import CompilationDetector, EngineOutputWatcher, RoundHistory
+from pytexmk.subprocess_runner import MySubProcess
+
+
+def _detector():
+    return CompilationDetector("main", "XeLaTeX", [], [], "./Build/", "./Auxiliary/", False, None)
+
+
+def test_state_digests_ignore_aux_noise(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "main.aux").write_text("\\relax\n\\newlabel{a}{{1}{1}}\n", encoding="utf-8")
+    (tmp_path / "main.toc").write_text("\\contentsline{section}{1}{1}\n", encoding="utf-8")
+    detector = _detector()
+    state = detector.state_digests(["main.aux", "main.toc", "main.bbl"])
+    assert state["main.bbl"] == ""
+
+    (tmp_path / "main.aux").write_text("\\relax\n% comment\n\\newlabel{a}{{1}{1}}\n\\gdef \\@abspage@last{3}\n", encoding="utf-8")
+    assert detector.state_digests(["main.aux", "main.toc", "main.bbl"]) == state
+
+    (tmp_path / "main.toc").write_text("\\contentsline{section}{1}{2}\n", encoding="utf-8")
+    assert detector.state_digests(["main.aux", "main.toc", "main.bbl"]) != state
+
+
+def test_round_history_fixpoint_and_cycle():
+    history = RoundHistory()
+    assert history.record({"main.aux": "a", "main.toc": "t"}) == (None, [])
+    assert history.record({"main.aux": "a", "main.toc": "t"}) == ("fixpoint", [])
+
+    history = RoundHistory()
+    assert history.record({"main.aux": "a1", "main.toc": "t", "ch1.aux": "c"}) == (None, [])
+    assert history.record({"main.aux": "a2", "main.toc": "t", "ch1.aux": "c"}) == (None, [])
+    assert history.record({"main.aux": "a3", "main.toc": "t", "ch1.aux": "d"}) == (None, [])
+    # 第 4 轮回到第 2 轮的状态：main.aux 与 ch1.aux 在 a2 / a3 间振荡
+    assert history.record({"main.aux": "a2", "main.toc": "t", "ch1.aux": "c"}) == ("cycle", ["ch1.aux", "main.aux"])
+
+
+ENGINE_OUTPUT = (
+    "(./main.tex\n"
+    "No file main.bbl.\n"
+    # 79 个字符处折行的警告
+    "LaTeX Warning: Citation `knuth-art-of-computer-programming-vo1' on page 1 undef\n"
+    "ined on input line 5.\n"
+    "LaTeX Warning: Label(s) may have changed. Rerun to get cross-references right.\n"
+    ")\n"
+    "Output written on main.pdf (1 page).\n"
+    "Transcript written on main.log.\n"
+)
+
+
+def test_engine_output_watcher_observes_run_command(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    detector = _detector()
+    script = f"import sys; sys.stdout.write({ENGINE_OUTPUT!r})"
+    MySubProcess("./Build/", "./Auxiliary/", "main").run_command(
+        [sys.executable, "-c", script], [], [], "engine", line_observers=[detector.output_watcher]
+    )
+    watcher = detector.output_watcher
+    assert watcher.complete and watcher.rerun and watcher.undefined_citations
+    assert watcher.missing_files == {"main.bbl"}
+    # 终端输出完整时不再读取 .log
+    (tmp_path / "main.log").write_text("", encoding="utf-8")
+    assert detector.log_has_rerun_warnings()
+
+
+def test_log_scan_fallback_without_engine_output(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "Auxiliary").mkdir()
+    (tmp_path / "Auxiliary" / "main.log").write_text("LaTeX Warning: There were undefined references.\n", encoding="utf-8")
+    detector = _detector()
+    assert detector.log_has_rerun_warnings()
+    assert not detector.log_has_rerun_warnings(tmp_path / "missing.log")
+
+    watcher = EngineOutputWatcher()
+    watcher("No file main.ind.\n")
+    assert watcher.missing_files == {"main.ind"} and not watcher.complete
+
+
+def test_native_dirs_reads_generated_files_from_auxdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    aux = tmp_path / "Auxiliary"
+    (aux / "chapters").mkdir(parents=True)
+    (aux / "main.aux").write_text("\\relax\n\\@input{chapters/intro.aux}\n\\citation{knuth}\n", encoding="utf-8")
+    (aux / "chapters" / "intro.aux").write_text("\\newlabel{a}{{1}{1}}\n", encoding="utf-8")
+    (aux / "main.toc").write_text("\\contentsline{section}{1}{1}\n", encoding="utf-8")
+    (aux / "main.log").write_text("LaTeX Warning: There were undefined references.\n", encoding="utf-8")
+    # 根目录中残留的旧文件（常规模式的中断编译）不能被读取
+    (tmp_path / "main.aux").write_text("\\relax\n", encoding="utf-8")
+    (tmp_path / "main.log").write_text("", encoding="utf-8")
+
+    detector = CompilationDetector("main", "XeLaTeX", [], [], "./Build/", "./Auxiliary/", False, None, native_dirs=True)
+    cite_counter, toc_file, _index = detector.prepare_LaTeX_output_files()
+    assert cite_counter["main.aux"] == {"knuth": 1}
+    assert "chapters/intro.aux" in detector.aux_snapshot.file_digests
+    assert toc_file == "\\contentsline{section}{1}{1}\n"
+    assert detector.log_has_rerun_warnings()
+
+    state = detector.state_digests(["main.toc", "chapters/intro.aux", "main.bbl"])
+    assert state["main.toc"] and state["chapters/intro.aux"] and state["main.bbl"] == ""
@@ -0,0 +1,60 @@
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from pytexmk import file_ops
+from pytexmk.file_ops import FileMoveRemoveManager, combine_patterns
+
+PATTERNS = [f".*\\{suffix}" for suffix in (".log", ".aux", ".synctex.gz", ".run.xml")]
+
+
+def _tree(root: Path):
+    files = [
+        "main.tex", "main.aux", "main.log", "main.synctex.gz", "main.run.xml", "notes.log.txt",
+        "chapters/intro.tex", "chapters/intro.aux", "deep/a/b/c.aux",
+        ".git/objects/x.log", ".github/workflows/ci.log", "docs/.git/y.aux",
+    ]
+    for name in files:
+        (root / name).parent.mkdir(parents=True, exist_ok=True)
+        (root / name).write_text("", encoding="utf-8")
+
+
+def test_combined_pattern_matches_like_each_pattern():
+    combined = combine_patterns(PATTERNS)
+    compiled = [re.compile(pattern) for pattern in PATTERNS]
+    for name in ("main.aux", "main.log.txt", "main.tex", "main.synctex.gz", "a.run.xml", "x.xml", "aux", ".log"):
+        assert bool(combined.match(name)) == any(pattern.match(name) for pattern in compiled)
+    assert combine_patterns([r"main\.aux", r".*\.log"]).match("main.aux")
+    assert not combine_patterns([]).match("main.aux")
+
+
+def test_remove_matched_files_single_walk(tmp_path, monkeypatch):
+    _tree(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    mro = FileMoveRemoveManager()
+
+    would_remove = mro.remove_matched_files(PATTERNS, ".", dry_run=True)
+    expected = sorted(Path(name) for name in (
+        "main.aux", "main.log", "main.synctex.gz", "main.run.xml", "notes.log.txt", "chapters/intro.aux", "deep/a/b/c.aux",
+    ))
+    assert would_remove == expected
+    assert all(path.exists() for path in expected)  # 试运行不删除
+
+    monkeypatch.setattr(file_ops, "PARALLEL_UNLINK_MIN", 2)  # 走线程池删除路径
+    assert sorted(mro.remove_matched_files(PATTERNS, ".", jobs=3)) == expected
+    assert not any(path.exists() for path in expected)
+    # 版本库目录不进入
+    assert (tmp_path / ".git/objects/x.log").exists() and (tmp_path / "docs/.git/y.aux").exists()
+    assert (tmp_path / ".github/workflows/ci.log").exists()
+    assert (tmp_path / "main.tex").exists()
+
+
+def test_remove_specific_files_dry_run(tmp_path):
+    (tmp_path / "main.aux").write_text("", encoding="utf-8")
+    mro = FileMoveRemoveManager()
+    assert mro.remove_specific_files(["main.aux", "main.toc"], str(tmp_path), dry_run=True) == [tmp_path / "main.aux"]
+    assert (tmp_path / "main.aux").exists()
+    assert mro.remove_specific_files(["main.aux", "main.toc"], str(tmp_path)) == [tmp_path / "main.aux"]
+    assert not (tmp_path / "main.aux").exists()
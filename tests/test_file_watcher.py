@@ -0,0 +1,44 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from pytexmk import file_watcher
+from pytexmk.file_watcher import FileWatcher
+
+
+def _save_later(path: Path, delays: list[float]):
+    def _write():
+        for i, delay in enumerate(delays):
+            time.sleep(delay)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(f"version {i}\n", encoding="utf-8")
+            tmp.replace(path)  # 编辑器常见的「写临时文件再重命名」式保存
+    thread = threading.Thread(target=_write)
+    thread.start()
+    return thread
+
+
+def _check_watcher(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    Path("chapters").mkdir()
+    Path("main.tex").write_text("main\n", encoding="utf-8")
+    Path("chapters/intro.tex").write_text("intro\n", encoding="utf-8")
+    watcher = FileWatcher(["main.tex", "chapters/intro.tex"], interval=0.05, debounce=0.2)
+    try:
+        thread = _save_later(Path("chapters/intro.tex"), [0.1, 0.05, 0.05])
+        assert watcher.wait_for_changes() == ["chapters/intro.tex"]
+        thread.join()
+    finally:
+        watcher.close()
+
+
+def test_file_watcher(tmp_path, monkeypatch):
+    _check_watcher(tmp_path, monkeypatch)
+
+
+def test_file_watcher_polling_fallback(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_watcher.sys, "platform", "polling-only")
+    _check_watcher(tmp_path, monkeypatch)
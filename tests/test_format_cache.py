@@ -0,0 +1,98 @@
+import os
+import stat
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from pytexmk.format_cache import FormatCache, read_preamble
+from pytexmk.resource_usage import take_usage_records
+
+# 模拟 ini 引擎：记录每次调用的参数，写出 .fls 与 .fmt（输出目录与任务名取自命令行参数）
+FAKE_ENGINE = """#!/bin/sh
+echo "$@" >> "$PWD/engine_calls"
+for arg in "$@"; do
+  case "$arg" in
+    -jobname=*) job="${arg#-jobname=}" ;;
+    -output-directory=*) out="${arg#-output-directory=}" ;;
+  esac
+done
+printf 'PWD %s\\nINPUT main.tex\\nINPUT mystyle.sty\\nOUTPUT %s/%s.fmt\\n' "$PWD" "$out" "$job" > "$out/$job.fls"
+[ -e fail ] && exit 1
+echo fmt > "$out/$job.fmt"
+"""
+
+
+def _make_project(root: Path, monkeypatch):
+    bindir = root / "bin"
+    bindir.mkdir()
+    for engine in ("pdftex", "xetex"):
+        (bindir / engine).write_text(FAKE_ENGINE, encoding="utf-8")
+        (bindir / engine).chmod(stat.S_IRWXU)
+    monkeypatch.setenv("PATH", f"{bindir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.chdir(root)
+    (root / "main.tex").write_text(
+        "\\documentclass{article}\n\\usepackage{mystyle} % \\begin{document}\n"
+        "\\begin{document}\nBody\n\\end{document}\n",
+        encoding="utf-8",
+    )
+    (root / "mystyle.sty").write_text("\\relax\n", encoding="utf-8")
+
+
+def _calls(root: Path) -> int:
+    calls = root / "engine_calls"
+    return len(calls.read_text().splitlines()) if calls.exists() else 0
+
+
+def test_read_preamble(tmp_path):
+    tex = tmp_path / "main.tex"
+    tex.write_text("\\documentclass{article}\n\\usepackage{a}\\csname endofdump\\endcsname\n\\makeindex\n", encoding="utf-8")
+    assert read_preamble(tex) == ("\\documentclass{article}\n\\usepackage{a}", True)
+    tex.write_text("\\documentclass{article}\n% \\begin{document}\n\\begin{document}\n", encoding="utf-8")
+    assert read_preamble(tex) == ("\\documentclass{article}\n\n", False)
+    tex.write_text("\\documentclass{article}\n", encoding="utf-8")
+    assert read_preamble(tex) is None
+
+
+def test_format_cache_reuse_and_rebuild(tmp_path, monkeypatch):
+    _make_project(tmp_path, monkeypatch)
+    take_usage_records()
+    cache = FormatCache("main", "PdfLaTeX", "Auxiliary/")
+    assert cache.prepare() == (tmp_path / "Auxiliary" / "main-pdflatex").resolve()
+    assert cache.inputs == ["mystyle.sty"]
+    assert _calls(tmp_path) == 1
+    # dump 不启用 shell-escape，并与其他外部程序一样记录资源占用
+    assert "-shell-escape" not in (tmp_path / "engine_calls").read_text()
+    assert [usage.command.split()[0] for usage in take_usage_records()] == ["pdftex"]
+
+    # 正文修改不影响格式
+    (tmp_path / "main.tex").write_text(
+        (tmp_path / "main.tex").read_text(encoding="utf-8").replace("Body", "New body"), encoding="utf-8"
+    )
+    assert FormatCache("main", "PdfLaTeX", "Auxiliary/").prepare() is not None
+    assert _calls(tmp_path) == 1
+
+    # 导言区引入的宏包变化时重新生成
+    (tmp_path / "mystyle.sty").write_text("\\def\\x{1}\n", encoding="utf-8")
+    assert FormatCache("main", "PdfLaTeX", "Auxiliary/").prepare() is not None
+    assert _calls(tmp_path) == 2
+
+    # 不同引擎分别缓存
+    assert FormatCache("main", "XeLaTeX", "Auxiliary/").prepare() is not None
+    assert _calls(tmp_path) == 3
+    assert (tmp_path / "Auxiliary" / "main-xelatex.fmt").exists()
+
+
+def test_format_cache_failure_and_unsafe_preamble(tmp_path, monkeypatch):
+    _make_project(tmp_path, monkeypatch)
+    (tmp_path / "fail").touch()
+    assert FormatCache("main", "XeLaTeX", "Auxiliary/").prepare() is None
+    # 导言区未变化时不再重试
+    assert FormatCache("main", "XeLaTeX", "Auxiliary/").prepare() is None
+    assert _calls(tmp_path) == 1
+
+    (tmp_path / "main.tex").write_text(
+        "\\documentclass{article}\n\\makeindex\n\\begin{document}\n\\end{document}\n", encoding="utf-8"
+    )
+    assert FormatCache("main", "PdfLaTeX", "Auxiliary/").prepare() is None
+    assert _calls(tmp_path) == 1
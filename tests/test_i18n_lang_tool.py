@@ -218,6 +218,7 @@ def test_set_language_zh_returns_null(monkeypatch):
     import pytexmk.language as langmod
 
     monkeypatch.setattr(langmod.locale, "getdefaultlocale", lambda: ("zh_CN", "cp936"))
+    langmod.reset_translations()  # 区域设置按进程缓存，切换后需重新解析
     translator = langmod.set_language("cli_workflow")
     assert callable(translator)
     # NullTranslations.gettext 直接原样返回
@@ -227,3 +228,5 @@ def test_set_language_zh_returns_null(monkeypatch):
     # （通过 fallback 链：language.py 里 zh 分支直接 new NullTranslations）
     t_class = type(translator.__self__ if hasattr(translator, "__self__") else langmod.gettext.NullTranslations())
     assert issubclass(t_class, gettext.NullTranslations)
+    assert langmod._locale_settings()[1] == ()  # zh 不加载任何 .mo
+    langmod.reset_translations()
@@ -0,0 +1,84 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).parent.parent / "src"
+
+# 启动导入预算（毫秒，-X importtime 统计的 pytexmk.cli.__main__ 累计导入时间），CI 较慢时可用环境变量放宽
+IMPORT_BUDGET_MS = float(os.environ.get("PYTEXMK_IMPORT_BUDGET_MS", "75"))
+
+# 只有编译、LaTeXDiff、PDF 修复等命令路径才需要的模块，-c 不能导入
+COMPILE_MODULES = {
+    "pypdf", "pytexlogs", "sqlite3", "webbrowser", "pytexmk.compile_engine", "pytexmk.latexdiff", "pytexmk.build_history",
+}
+# 启动与 -v 还不能导入版本检查（联网）与输出渲染相关的模块
+STARTUP_MODULES = COMPILE_MODULES | {
+    "urllib.request", "http.client", "ssl", "rich.console",
+    "pytexmk.cli.check_version", "pytexmk.cli.cli_workflow", "pytexmk.pdf_tools", "pytexmk.ui_messages",
+}
+
+
+def _importtime(code, cwd=None, env=None):
+    """以 -X importtime 运行代码，返回 {模块名: 累计导入微秒} 与进程结果。"""
+    env = {
+        **os.environ, **(env or {}),
+        "PYTHONPATH": os.pathsep.join([str(SRC), os.environ.get("PYTHONPATH", "")]),
+    }
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=cwd, env=env, capture_output=True, text=True, encoding="utf-8", errors="replace",
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and not line.endswith("| imported package"):
+            _self, cumulative, name = line[len("import time:"):].split("|")
+            modules[name.strip()] = int(cumulative)
+    return modules, result
+
+
+def test_startup_import_budget():
+    # 取三次中最快的一次，减少冷缓存与机器抖动的影响
+    best = min(_importtime("import pytexmk.cli.__main__")[0]["pytexmk.cli.__main__"] for _ in range(3))
+    assert best / 1000 < IMPORT_BUDGET_MS
+
+
+def test_startup_skips_optional_subsystems():
+    modules, _result = _importtime("import pytexmk.cli.__main__")
+    assert "pytexmk.cli.__main__" in modules
+    assert STARTUP_MODULES.isdisjoint(modules)
+
+
+def test_version_flag_stays_light():
+    modules, result = _importtime("import sys; sys.argv = ['pytexmk', '-v']; from pytexmk.cli.__main__ import main; main()")
+    assert result.returncode == 0
+    assert "version" in result.stdout
+    assert STARTUP_MODULES.isdisjoint(modules)
+
+
+def test_clean_skips_compile_subsystems(tmp_path):
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "main.tex").write_text("\\documentclass{article}\n\\begin{document}\n\\end{document}\n", encoding="utf-8")
+    (project / "main.aux").write_text("\\relax\n", encoding="utf-8")
+    # 版本缓存有效时后台版本检查不联网（macOS / Windows 上 platformdirs 不读 XDG 变量，可能仍会联网）
+    cache = tmp_path / "cache" / "PyTeXMK"
+    cache.mkdir(parents=True)
+    (cache / "PyTeXMK_version_cache.toml").write_text('latest_version = "0.0.0"\n', encoding="utf-8")
+    env = {"HOME": str(tmp_path), "USERPROFILE": str(tmp_path), "XDG_CACHE_HOME": str(tmp_path / "cache")}
+    code = "import sys; sys.argv = ['pytexmk', '-c']; from pytexmk.cli.__main__ import main; main()"
+
+    modules, result = _importtime(code, cwd=project, env=env)
+    assert result.returncode == 0, result.stderr[-2000:]
+    assert not (project / "main.aux").exists()
+    assert "pytexmk.cli.cli_workflow" in modules
+    assert COMPILE_MODULES.isdisjoint(modules)
+
+    # 用户配置 update_check = false 时彻底不做版本检查
+    user_config = tmp_path / ".pytexmkrc"
+    user_config.write_text(
+        user_config.read_text(encoding="utf-8").replace("update_check = true", "update_check = false"), encoding="utf-8",
+    )
+    modules, result = _importtime(code, cwd=project, env=env)
+    assert result.returncode == 0, result.stderr[-2000:]
+    assert "pytexmk.cli.check_version" not in modules
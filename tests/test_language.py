@@ -0,0 +1,45 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from pytexmk import language
+
+
+@pytest.fixture
+def counted(monkeypatch):
+    """强制英文区域设置，并统计区域设置解析与 .mo 加载次数。"""
+    calls = {"locale": 0, "translation": []}
+    real_translation = language.gettext.translation
+
+    def getdefaultlocale():
+        calls["locale"] += 1
+        return ("en_US", "UTF-8")
+
+    def translation(domain, **kwargs):
+        calls["translation"].append(domain)
+        return real_translation(domain, **kwargs)
+
+    monkeypatch.setattr(language.locale, "getdefaultlocale", getdefaultlocale)
+    monkeypatch.setattr(language.gettext, "translation", translation)
+    language.reset_translations()
+    yield calls
+    language.reset_translations()
+
+
+def test_registry_hands_out_one_cached_callable_per_domain(counted):
+    first = language.set_language("detection")
+    assert language.set_language("detection") is first
+    assert language.set_language("compile") is not first
+    assert counted["locale"] == 0 and counted["translation"] == []  # 取得翻译函数时不解析、不加载
+
+
+def test_catalog_loads_lazily_once_per_domain(counted):
+    _ = language.set_language("detection")
+    for _i in range(20):
+        assert _("源码中文") == "源码中文"  # 目录中没有的字符串原样返回
+        language.set_language("compile")("编译")
+    assert counted["locale"] == 1
+    assert counted["translation"] == ["detection", "compile"]
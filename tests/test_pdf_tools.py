@@ -0,0 +1,118 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+pypdf = pytest.importorskip("pypdf")
+
+from pytexmk import pdf_tools
+from pytexmk.pdf_tools import REPAIR_CACHE_NAME, PdfFileOperation, check_pdf_structure
+
+
+def write_report(path: Path, pages: int, pixels: bytes):
+    """每页单独嵌入同一张未压缩图片（同一插图被多次包含），内容流未压缩。"""
+    from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject, NumberObject
+
+    writer = pypdf.PdfWriter()
+    for _i in range(pages):
+        page = writer.add_blank_page(width=200, height=200)
+        image = DecodedStreamObject()
+        image.set_data(pixels)
+        image.update({
+            NameObject("/Type"): NameObject("/XObject"), NameObject("/Subtype"): NameObject("/Image"),
+            NameObject("/Width"): NumberObject(32), NameObject("/Height"): NumberObject(32),
+            NameObject("/ColorSpace"): NameObject("/DeviceRGB"), NameObject("/BitsPerComponent"): NumberObject(8),
+        })
+        xobjects = DictionaryObject({NameObject("/Im0"): writer._add_object(image)})
+        page[NameObject("/Resources")] = DictionaryObject({NameObject("/XObject"): xobjects})
+        content = DecodedStreamObject()
+        content.set_data(b"q 100 0 0 100 0 0 cm /Im0 Do Q\n" + b"0 0 m 10 10 l S\n" * 200)
+        page[NameObject("/Contents")] = writer._add_object(content)
+    with open(path, "wb") as fobj:
+        writer.write(fobj)
+
+
+def write_pdf(path: Path, pages: int = 2):
+    writer = pypdf.PdfWriter()
+    for _i in range(pages):
+        writer.add_blank_page(width=72, height=72)
+    with open(path, "wb") as fobj:
+        writer.write(fobj)
+
+
+def break_offsets(path: Path):
+    """在文件头后插入注释行，使交叉引用表中的全部偏移错位（类似 invalid X X R object 的来源）。"""
+    data = path.read_bytes()
+    header_end = data.index(b"\n") + 1
+    path.write_bytes(data[:header_end] + b"%" + b"x" * 40 + b"\n" + data[header_end:])
+
+
+def test_structure_check(tmp_path):
+    pdf = tmp_path / "fig.pdf"
+    write_pdf(pdf)
+    assert check_pdf_structure(pdf) is None
+
+    break_offsets(pdf)
+    assert check_pdf_structure(pdf) is not None
+
+    (tmp_path / "empty.pdf").write_bytes(b"")
+    assert check_pdf_structure(tmp_path / "empty.pdf") is not None
+    (tmp_path / "cut.pdf").write_bytes(pdf.read_bytes()[:-200])
+    assert check_pdf_structure(tmp_path / "cut.pdf") is not None
+
+
+def test_repair_rewrites_only_broken_files_and_caches_good_ones(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "figures").mkdir()
+    (tmp_path / "Build").mkdir()
+    for name in ("a", "b", "c"):
+        write_pdf(tmp_path / "figures" / f"{name}.pdf")
+    break_offsets(tmp_path / "figures" / "b.pdf")
+    write_pdf(tmp_path / "main.pdf")
+    break_offsets(tmp_path / "main.pdf")  # 主文件 PDF 与输出目录不检查
+    (tmp_path / "Build" / "out.pdf").write_bytes(b"")
+    good = tmp_path / "figures" / "a.pdf"
+    good_stat = good.stat()
+
+    pfo = PdfFileOperation()
+    counts = pfo.pdf_repair("main", ".", "./Build/", cache_dir="Auxiliary", jobs=1)
+    assert counts == {"cached": 0, "ok": 2, "repaired": 1, "failed": 0}
+    assert check_pdf_structure(tmp_path / "figures" / "b.pdf") is None
+    assert good.stat().st_mtime_ns == good_stat.st_mtime_ns  # 完好的文件不重写
+    assert check_pdf_structure(tmp_path / "main.pdf") is not None
+    assert (tmp_path / "Auxiliary" / REPAIR_CACHE_NAME).exists()
+
+    # 再次运行时全部由缓存跳过，不再检查结构
+    def fail(*_args):
+        raise AssertionError("structure check on a cached file")
+
+    monkeypatch.setattr(pdf_tools, "check_pdf_structure", fail)
+    assert pfo.pdf_repair("main", ".", "./Build/", cache_dir="Auxiliary", jobs=1)["cached"] == 3
+
+    # 仅 mtime 变化、内容未变时按摘要确认，仍不检查结构
+    os.utime(good, ns=(good_stat.st_atime_ns, good_stat.st_mtime_ns + 10**9))
+    counts = pfo.pdf_repair("main", ".", "./Build/", cache_dir="Auxiliary", jobs=1)
+    assert counts["cached"] == 3
+
+
+def test_optimize_dedupes_images_and_compresses_contents(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_tools.shutil, "which", lambda _name: None)  # 只测试 pypdf 的优化
+    (tmp_path / "Build").mkdir()
+    pdf = tmp_path / "Build" / "main.pdf"
+    pixels = os.urandom(32 * 32 * 3)
+    write_report(pdf, 4, pixels)
+    size = pdf.stat().st_size
+
+    before, after = PdfFileOperation().pdf_optimize("main", str(tmp_path / "Build"), str(tmp_path / "Auxiliary"))
+    assert before == size and after == pdf.stat().st_size
+    assert after < before - len(pixels) * 3 + len(pixels) // 2  # 四份相同的图片只保留一份
+    assert check_pdf_structure(pdf) is None
+    reader = pypdf.PdfReader(pdf)
+    assert len(reader.pages) == 4
+    assert len({page["/Resources"]["/XObject"].raw_get("/Im0").idnum for page in reader.pages}) == 1
+    assert list((tmp_path / "Auxiliary").iterdir()) == []  # 中间文件已删除
+
+    assert PdfFileOperation().pdf_optimize("missing", str(tmp_path / "Build"), str(tmp_path / "Auxiliary")) is None
@@ -0,0 +1,35 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from pytexmk.resource_usage import take_usage_records, write_usage_json
+from pytexmk.subprocess_runner import MySubProcess, SubprocessFailedError
+
+WORKLOAD = "import sys\ndata = bytearray(64 * 1024 * 1024)\nopen('out.bin', 'wb').write(data[: 4 * 1024 * 1024])\nsys.exit(int(sys.argv[1]))"
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="/proc/<pid>/io 仅 Linux 可用")
+def test_run_command_records_tool_usage(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    take_usage_records()
+    msp = MySubProcess("./Build/", "./Auxiliary/", "main", quiet=True)
+    msp.run_command([sys.executable, "-c", WORKLOAD, "0"], [], [], "lualatex")
+    with pytest.raises(SubprocessFailedError):
+        msp.run_command([sys.executable, "-c", WORKLOAD, "3"], [], [], "biber")
+
+    ok, failed = take_usage_records()
+    assert (ok.program, ok.exit_code, failed.program, failed.exit_code) == ("lualatex", 0, "biber", 3)
+    assert ok.max_rss_bytes >= 64 * 1024 * 1024
+    assert ok.write_bytes >= 4 * 1024 * 1024
+    assert ok.user_s is not None and ok.wall_s > 0
+    assert take_usage_records() == []
+
+    write_usage_json(tmp_path / "usage.json", [ok, failed])
+    data = json.loads((tmp_path / "usage.json").read_text(encoding="utf-8"))
+    assert data["format"] == 1
+    assert [tool["program"] for tool in data["tools"]] == ["lualatex", "biber"]
+    assert data["tools"][0]["max_rss_bytes"] == ok.max_rss_bytes
@@ -0,0 +1,77 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from pytexmk.stage_scheduler import Stage, build_stage_dag, run_stages, stage_waves
+from pytexmk.timing import tracer
+
+
+def _sleep_stage(name, inputs, outputs, seconds, log):
+    def run(show_status):
+        log.append((name, show_status, threading.current_thread().name))
+        time.sleep(seconds)
+    return Stage(name, run, inputs, outputs)
+
+
+def test_stage_dag_from_files():
+    stages = [
+        Stage("biber", print, ["main.bcf", "refs.bib"], ["main.bbl", "main.blg"]),
+        Stage("glossaries main", print, ["main.glo"], ["main.gls", "main.glg"]),
+        Stage("nomencl", print, ["main.nlo"], ["main.nls", "main.ilg"]),
+        Stage("uses bbl", print, ["main.bbl"], ["x.out"]),
+    ]
+    assert build_stage_dag(stages) == {
+        "biber": set(), "glossaries main": set(), "nomencl": set(), "uses bbl": {"biber"},
+    }
+    assert [[s.name for s in wave] for wave in stage_waves(stages)] == [
+        ["biber", "glossaries main", "nomencl"], ["uses bbl"],
+    ]
+
+
+def test_run_stages_in_parallel_keeps_runtime_order():
+    log = []
+    stages = [_sleep_stage(f"glossary{i}", [f"g{i}.glo"], [f"g{i}.gls"], 0.3, log) for i in range(5)]
+    runtime = {}
+    tracer.start()
+    start = time.monotonic()
+    run_stages(stages, runtime, max_workers=5)
+    assert time.monotonic() - start < 1.0  # 串行执行需要 1.5 s
+    assert list(runtime) == [f"glossary{i} 编译" for i in range(5)]
+    assert all(not show_status for _name, show_status, _thread in log)
+    # 每个并发阶段在 trace 中各占一行（线程）
+    spans = [event for event in tracer.take_events() if event.get("cat") == "tool"]
+    tracer.enabled = False
+    assert sorted(event["name"] for event in spans) == [f"glossary{i}" for i in range(5)]
+    assert len({event["tid"] for event in spans}) == 5
+
+
+def test_single_stage_runs_inline_and_failures_propagate():
+    log = []
+    runtime = {}
+    run_stages([_sleep_stage("biber", [], [], 0, log)], runtime)
+    assert log == [("biber", True, threading.current_thread().name)]
+
+    def fail(show_status):
+        time.sleep(0.05)
+        sys.exit()
+
+    with pytest.raises(SystemExit):
+        run_stages([Stage("bibtex", fail), _sleep_stage("nomencl", [], [], 0.1, log)], {})
+    assert log[-1][0] == "nomencl"  # 同批已在运行的阶段仍执行完毕
+
+
+def test_failure_cancels_stages_not_yet_started():
+    log = []
+
+    def fail(show_status):
+        sys.exit()
+
+    stages = [Stage("bibtex", fail), *(_sleep_stage(f"glossary{i}", [], [], 0, log) for i in range(3))]
+    with pytest.raises(SystemExit):
+        run_stages(stages, {}, max_workers=1)
+    assert log == []  # 并发数为 1 时其余阶段仍在排队，失败后不再执行
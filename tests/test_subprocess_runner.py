@@ -0,0 +1,78 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from pytexmk import subprocess_runner
+from pytexmk.subprocess_runner import MySubProcess, OutputPipeline, SubprocessFailedError
+
+
+def _script(lines: int, exit_code: int = 0) -> list[str]:
+    return [sys.executable, "-c", f"import sys\nfor i in range({lines}): print('line', i)\nsys.exit({exit_code})"]
+
+
+def test_output_tail_is_bounded_and_observed(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(subprocess_runner, "OUTPUT_TAIL_LINES", 5)
+    seen = []
+    msp = MySubProcess("./Build/", "./Auxiliary/", "main")
+    with pytest.raises(SubprocessFailedError) as excinfo:
+        msp.run_command(_script(1000, 1), [], [], "engine", line_observers=[seen.append])
+    assert len(seen) == 1000
+    assert excinfo.value.stdout.splitlines() == [f"line {i}" for i in range(995, 1000)]
+
+
+def test_quiet_mode_keeps_only_failure_tail(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    msp = MySubProcess("./Build/", "./Auxiliary/", "main", quiet=True)
+    seen = []
+    assert msp.run_command(_script(50), [], [], "engine", line_observers=[seen.append])
+    assert seen == []  # 安静模式下输出不经 Python 读取
+    assert "line 49" not in capsys.readouterr().out
+
+    with pytest.raises(SubprocessFailedError) as excinfo:
+        msp.run_command(_script(50, 2), [], [], "engine")
+    assert excinfo.value.exit_code == 2
+    assert excinfo.value.stdout.splitlines()[-1] == "line 49"
+    # 失败时打印末尾若干行作为上下文
+    out = capsys.readouterr().out
+    assert "line 49" in out and f"line {49 - subprocess_runner.FAILURE_CONTEXT_LINES}\n" not in out
+
+
+def test_pipeline_does_not_render_without_terminal(capsys):
+    pipeline = OutputPipeline(render=True)
+    assert not pipeline.render  # pytest 捕获输出时标准输出不是终端
+    pipeline.consume(iter(["a\n", "b\n"]))
+    assert list(pipeline.tail) == ["a\n", "b\n"]
+    assert capsys.readouterr().out == ""
+
+
+def test_run_command_in_build_dir(tmp_path, monkeypatch):
+    # 原生目录模式下文献 / 索引工具在辅助目录中运行，根目录通过搜索路径环境变量传入
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "Auxiliary").mkdir()
+    script = "import os; open('main.bbl', 'w').write(os.environ['BIBINPUTS'])"
+    msp = MySubProcess("./Build/", "./Auxiliary/", "main", quiet=True)
+    assert msp.run_command(
+        [sys.executable, "-c", script], [], [], "bibtex", cwd="./Auxiliary/", env={**os.environ, "BIBINPUTS": "root:"},
+    )
+    assert (tmp_path / "Auxiliary" / "main.bbl").read_text() == "root:"
+    assert not (tmp_path / "main.bbl").exists()
+
+
+def test_concurrent_stage_output_notes_omitted_lines(tmp_path, monkeypatch, capsys):
+    # 并发阶段（show_status=False）事后打印时，环形缓冲之前的输出注明省略的行数
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(subprocess_runner, "OUTPUT_TAIL_LINES", 5)
+    msp = MySubProcess("./Build/", "./Auxiliary/", "main")
+    with pytest.raises(SubprocessFailedError):
+        msp.run_command(_script(1000, 1), [], [], "biber", show_status=False)
+    out = capsys.readouterr().out
+    assert "995" in out and "line 999" in out and "line 994" not in out
+
+    pipeline = OutputPipeline(render=False)
+    pipeline.consume(iter(["a\n", "b\n"]))
+    assert pipeline.tail_text() == "a\nb"
@@ -0,0 +1,63 @@
+import datetime
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from pytexmk.timing import time_print
+
+
+def test_time_print_summary(capsys):
+    start = datetime.datetime.now() - datetime.timedelta(seconds=2)  # noqa: DTZ005
+    runtime = {"XeLaTeX 1st": 1.5, "XeLaTeX 2nd": 0.25}
+    time_print(start, runtime)
+    assert len(runtime) == 5  # 2 项 + LaTeX / Python / PyTeXMK 运行时长
+    assert "XeLaTeX 1st" in capsys.readouterr().out
+
+
+def test_time_print_without_summary_for_parallel_jobs():
+    start = datetime.datetime.now() - datetime.timedelta(seconds=2)  # noqa: DTZ005
+    runtime = {"paper: XeLaTeX 1st": 1.5, "letter: XeLaTeX 1st": 1.5}
+    time_print(start, runtime, summary=False)
+    # 并行任务的 LaTeX 时长之和超过总时长, 不再推算 Python 运行时长
+    assert len(runtime) == 3
+
+
+def test_time_print_usage_table(capsys):
+    from pytexmk.resource_usage import ToolUsage
+
+    start = datetime.datetime.now() - datetime.timedelta(seconds=2)  # noqa: DTZ005
+    usage = [
+        ToolUsage("LuaLaTeX", "lualatex main.tex", 0, 1.5, 1.2, 0.1, 512 * 1024 * 1024, 2048, 4096),
+        ToolUsage("biber", "biber main", -9, 0.5),
+    ]
+    time_print(start, {"LuaLaTeX 1st": 1.5}, usage_records=usage)
+    out = capsys.readouterr().out
+    assert "512.0M" in out and "biber (-9)" in out
+
+
+def test_tracer_writes_nested_chrome_trace_events(tmp_path):
+    import json
+
+    from pytexmk.timing import Tracer
+
+    tracer = Tracer()
+    with tracer.span("not recorded"):
+        pass
+    assert tracer.events == []
+
+    tracer.start("pytexmk main")
+    with tracer.span("XeLaTeX 1st", cat="pass") as outer:
+        with tracer.span("xelatex", cat="process", command="xelatex main.tex"):
+            pass
+    assert outer.seconds > 0
+
+    tracer.write(tmp_path / "trace.json", tracer.take_events())
+    events = json.loads((tmp_path / "trace.json").read_text(encoding="utf-8"))["traceEvents"]
+    assert events[0]["ph"] == "M" and events[0]["args"]["name"].startswith("pytexmk main")
+    inner, outer_event = events[1:]
+    assert (inner["name"], outer_event["name"]) == ("xelatex", "XeLaTeX 1st")
+    assert inner["args"] == {"command": "xelatex main.tex"}
+    # 子区间完全包含在父区间内，trace 视图据此显示嵌套
+    assert outer_event["ts"] <= inner["ts"] and inner["ts"] + inner["dur"] <= outer_event["ts"] + outer_event["dur"]
+    assert tracer.events == []